@@ -0,0 +1,16 @@
+"""Generic tools shared by data_analysis and analytical_calculations, with no
+physics in them.
+
+    cache: user_cache_dir, where cached data is kept, outside the packages.
+    figures: FigureExporter, which renders matplotlib figures on a background
+        process pool and skips figures that did not change.
+    matcache: read_mat_cached, a memory-mapped binary cache of .mat files.
+    sweeps: SweepCollection, a lazy index of a directory of .mat sweeps.
+    preprocess: SweepPipeline, lazy preprocessing of the fields of a sweep.
+    parameter_sweep: sweep, evaluation of a model over a parameter grid in
+        parallel chunks, with a SweepCache of evaluated points.
+    smoothing: SmoothingSplineBank, GCV smoothing splines of many curves on
+        a common grid (frequency scans, band structures).
+
+matcache, sweeps and preprocess need the "data" extra (pymatreader, h5py).
+"""
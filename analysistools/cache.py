@@ -0,0 +1,17 @@
+import os
+
+# Overrides the cache directory, e.g. on machines with a small home directory
+CACHE_ENV = "FKPHYSICS_CACHE_DIR"
+
+
+def user_cache_dir(*parts: str) -> str:
+    """Directory for cached data below FKPHYSICS_CACHE_DIR, or below
+    $XDG_CACHE_HOME/fkphysics (~/.cache/fkphysics) if it is not set. The
+    directory is not created."""
+    root = os.environ.get(CACHE_ENV)
+    if not root:
+        xdg_cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        root = os.path.join(xdg_cache, "fkphysics")
+    return os.path.join(root, *parts)
@@ -0,0 +1,291 @@
+import atexit
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import pickle
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import matplotlib as mpl
+from matplotlib.cbook import CallbackRegistry
+from matplotlib.figure import Figure
+from matplotlib.transforms import TransformNode
+
+from .cache import user_cache_dir
+
+# Keys of the figures of every output directory, one JSON file per directory
+# named after the hash of its path, so nothing is written next to the figures
+KEYS_DIR = user_cache_dir("figure_keys")
+DPI = 300
+
+
+def _file_mode() -> int:
+    # Mode of a newly created file under the current umask. mkstemp creates
+    # files with mode 0600, which os.replace would carry over to the output.
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+_FILE_MODE = _file_mode()
+
+
+class _StatePickler(pickle.Pickler):
+    # Pickles the state of a figure reproducibly: callback registries count
+    # their connections, transforms refer to their parents by id() and pyplot
+    # numbers its figures, so all of these are left out. The output is only
+    # hashed, never loaded.
+    def persistent_id(self, obj: object) -> str | None:
+        if isinstance(obj, CallbackRegistry):
+            return "callbacks"
+        return None
+
+    def reducer_override(self, obj: object) -> object:
+        if isinstance(obj, TransformNode):
+            unstable = "_parents"
+        elif isinstance(obj, Figure):
+            unstable = "_number"
+        else:
+            return NotImplemented
+        state = obj.__getstate__()
+        return type(obj), (), {k: v for k, v in state.items() if k != unstable}
+
+
+def _rc_params() -> dict:
+    return {key: value for key, value in mpl.rcParams.items() if key != "backend"}
+
+
+def figure_key(fig: Figure, path: str, tight: bool, rc: dict) -> str | None:
+    """Hash of everything that determines the output of a figure, computed
+    without rendering it. None if the figure cannot be pickled, e.g. if it
+    holds a lambda FuncFormatter."""
+    buffer = io.BytesIO()
+    try:
+        _StatePickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(fig)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+    settings = (os.path.splitext(path)[1], DPI, tight, mpl.__version__)
+    sha1 = hashlib.sha1(buffer.getvalue())
+    sha1.update(repr((settings, sorted(rc.items()))).encode())
+    return sha1.hexdigest()
+
+
+def _keys_path(directory: str) -> str:
+    directory_hash = hashlib.sha1(os.path.abspath(directory).encode()).hexdigest()
+    return os.path.join(KEYS_DIR, f"{directory_hash[:16]}.json")
+
+
+def _read_keys(directory: str) -> dict[str, str]:
+    try:
+        with open(_keys_path(directory)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _is_unchanged(path: str, key: str) -> bool:
+    directory, name = os.path.split(path)
+    return os.path.exists(path) and _read_keys(directory).get(name) == key
+
+
+def _record_key(path: str, key: str | None) -> None:
+    # A None key forgets the output, it is rendered again next time
+    directory, name = os.path.split(path)
+    keys = _read_keys(directory)
+    if key is None:
+        if name not in keys:
+            return
+        del keys[name]
+    else:
+        keys[name] = key
+    keys_path = _keys_path(directory)
+    os.makedirs(KEYS_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=KEYS_DIR, prefix=".keys.")
+    with os.fdopen(fd, "w") as f:
+        json.dump(keys, f, indent=1, sort_keys=True)
+    os.chmod(tmp_path, _FILE_MODE)
+    os.replace(tmp_path, keys_path)
+
+
+def _render_to_temp(fig: Figure, path: str, tight: bool, rc: dict) -> str:
+    # Render next to path under a unique name, so concurrent renders of the
+    # same path never share a file. Metadata is deterministic.
+    directory, name = os.path.split(path)
+    fmt = os.path.splitext(path)[1][1:]
+    kwargs = {"dpi": DPI, "format": fmt}
+    if tight:
+        kwargs["bbox_inches"] = "tight"
+    if fmt == "svg":
+        kwargs["metadata"] = {"Date": None}
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory or None, prefix=f".{name}.")
+    try:
+        with mpl.rc_context({**rc, "svg.hashsalt": "savefig"}):
+            with os.fdopen(fd, "wb") as f:
+                fig.savefig(f, **kwargs)
+        os.chmod(tmp_path, _FILE_MODE)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path
+
+
+def _render_pickled(fig_bytes: bytes, path: str, tight: bool, rc: dict) -> str:
+    return _render_to_temp(pickle.loads(fig_bytes), path, tight, rc)
+
+
+class FigureExporter:
+    """Renders figures on a background process pool.
+
+    Figures are pickled when submitted, so later changes to the figure do not
+    affect the output. A figure whose state and export settings (format, dpi,
+    rcParams) hash to the key recorded for its output is not rendered again;
+    the keys are kept in KEYS_DIR, a user cache directory, not next to the
+    figures.
+
+    Figures that cannot be pickled (e.g. with a lambda FuncFormatter) are
+    rendered synchronously instead, and always rendered.
+
+    Every submission for a path starts a new generation of that path. A
+    pending render of an older generation is cancelled; one that is already
+    running finishes into its own temporary file, which is discarded, so
+    only the latest generation ever replaces the output. Errors of all
+    renders, superseded ones included, are raised by flush(). Pending exports
+    are flushed at exit.
+    """
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self.max_workers = max_workers
+        self._pool = None
+        self._lock = threading.Lock()
+        self._finished = threading.Condition(self._lock)
+        self._generations: dict[str, int] = {}
+        self._pending: dict[str, Future] = {}
+        self._n_running = 0
+        self._written: list[str] = []
+        self._errors: list[BaseException] = []
+        atexit.register(self.flush)
+
+    def _next_generation(self, path: str) -> int:
+        with self._lock:
+            generation = self._generations.get(path, 0) + 1
+            self._generations[path] = generation
+            return generation
+
+    def _cancel(self, path: str) -> None:
+        # Outside the lock, cancelling runs _finish
+        with self._lock:
+            future = self._pending.pop(path, None)
+        if future is not None:
+            future.cancel()
+
+    def _replace(
+        self, tmp_path: str, path: str, generation: int, key: str | None
+    ) -> bool:
+        # Move a finished render into place if it is still the latest one
+        with self._lock:
+            if self._generations[path] != generation:
+                os.remove(tmp_path)
+                return False
+            os.replace(tmp_path, path)
+            _record_key(path, key)
+            self._written.append(path)
+            return True
+
+    def _finish(self, future: Future, path: str, generation: int, key: str) -> None:
+        try:
+            if not future.cancelled():
+                if future.exception() is None:
+                    self._replace(future.result(), path, generation, key)
+                else:
+                    with self._lock:
+                        self._errors.append(future.exception())
+        except Exception as error:
+            with self._lock:
+                self._errors.append(error)
+        finally:
+            with self._lock:
+                self._n_running -= 1
+                self._finished.notify_all()
+
+    def submit(self, path: str, fig: Figure, tight: bool = True) -> Future:
+        """Render fig to path in the background. The returned future is
+        cancelled if superseded before it starts, flush() reports which
+        outputs were written."""
+        rc = _rc_params()
+        key = figure_key(fig, path, tight, rc)
+        if key is None:
+            self._save(path, fig, tight, rc, key)
+            future = Future()
+            future.set_result(None)
+            return future
+        generation = self._next_generation(path)
+        self._cancel(path)
+        if _is_unchanged(path, key):
+            future = Future()
+            future.set_result(None)
+            return future
+
+        if self._pool is None:
+            mp_context = None
+            if "fork" in multiprocessing.get_all_start_methods():
+                mp_context = multiprocessing.get_context("fork")
+            self._pool = ProcessPoolExecutor(self.max_workers, mp_context=mp_context)
+        with self._lock:
+            self._n_running += 1
+        try:
+            fig_bytes = pickle.dumps(fig)
+            future = self._pool.submit(_render_pickled, fig_bytes, path, tight, rc)
+        except BaseException:
+            with self._finished:
+                self._n_running -= 1
+                self._finished.notify_all()
+            raise
+        with self._lock:
+            self._pending[path] = future
+        future.add_done_callback(
+            lambda future: self._finish(future, path, generation, key)
+        )
+        return future
+
+    def save(self, path: str, fig: Figure, tight: bool = True) -> bool:
+        """Render fig to path now, in this process, without pickling it.
+        Supersedes pending renders of path.
+
+        Return:
+            written: False if fig was unchanged and the file left as it was.
+        """
+        rc = _rc_params()
+        return self._save(path, fig, tight, rc, figure_key(fig, path, tight, rc))
+
+    def _save(
+        self, path: str, fig: Figure, tight: bool, rc: dict, key: str | None
+    ) -> bool:
+        generation = self._next_generation(path)
+        self._cancel(path)
+        if key is not None and _is_unchanged(path, key):
+            return False
+        tmp_path = _render_to_temp(fig, path, tight, rc)
+        return self._replace(tmp_path, path, generation, key)
+
+    def flush(self) -> list[str]:
+        """Wait for all pending exports.
+
+        Return:
+            written: Paths that were (re)written since the last flush,
+                unchanged outputs are left out.
+        """
+        with self._finished:
+            self._finished.wait_for(lambda: self._n_running == 0)
+            written, errors = self._written, self._errors
+            self._written, self._errors = [], []
+            self._pending = {}
+        if errors:
+            raise errors[0]
+        return written
+
+
+EXPORTER = FigureExporter()
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from pymatreader import read_mat
+
+from .cache import user_cache_dir
+
+CACHEDIR = user_cache_dir("mat")
+MANIFEST = "manifest.json"
+
+
+def _file_sha1(path: str) -> str:
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def _cache_path(path: str, cache_dir: str) -> str:
+    path_hash = hashlib.sha1(path.encode()).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}_{path_hash}")
+
+
+def _flatten(data: dict, prefix: str = "") -> dict[str, object]:
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name))
+        else:
+            flat[name] = value
+    return flat
+
+
+def _unflatten(flat: dict[str, object]) -> dict:
+    data = {}
+    for name, value in flat.items():
+        *parents, key = name.split("/")
+        node = data
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[key] = value
+    return data
+
+
+def _write_cache(path: str, cache_path: str, source: dict) -> None:
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = tempfile.mkdtemp(dir=os.path.dirname(cache_path))
+
+    fields = {}
+    for idx, (name, value) in enumerate(_flatten(read_mat(path)).items()):
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            fname = f"{idx}.npy"
+            np.save(os.path.join(tmp_path, fname), np.ascontiguousarray(value))
+            fields[name] = {"kind": "array", "file": fname}
+        elif isinstance(value, (np.generic, int, float, bool, str)):
+            fields[name] = {"kind": "value", "value": np.asarray(value).item()}
+        else:
+            fname = f"{idx}.npy"
+            wrapped = np.empty((), dtype=object)
+            wrapped[()] = value
+            np.save(os.path.join(tmp_path, fname), wrapped, allow_pickle=True)
+            fields[name] = {"kind": "object", "file": fname}
+
+    with open(os.path.join(tmp_path, MANIFEST), "w") as f:
+        json.dump({"source": source, "fields": fields}, f, indent=1)
+
+    if os.path.exists(cache_path):
+        shutil.rmtree(cache_path)
+    os.replace(tmp_path, cache_path)
+
+
+def _read_manifest(cache_path: str) -> dict | None:
+    try:
+        with open(os.path.join(cache_path, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_mat_cached(path: str, cache_dir: str = CACHEDIR) -> dict:
+    """Drop-in replacement for pymatreader.read_mat that converts the .mat
+    file once into one .npy per field plus a JSON manifest.
+
+    The cache is validated against the source file: if size and mtime match
+    it is used directly, if only the mtime changed the SHA1 of the source
+    decides. Later loads return read-only memory-mapped arrays, so nothing is
+    copied until the data is actually used.
+
+    Args:
+        path: Path to the .mat file.
+        cache_dir: Directory holding the converted files.
+
+    Return:
+        data: Nested dict with the same structure as read_mat(path).
+    """
+    path = os.path.abspath(path)
+    cache_path = _cache_path(path, cache_dir)
+    stat = os.stat(path)
+    manifest = _read_manifest(cache_path)
+
+    source = {"path": path, "size": stat.st_size, "mtime": stat.st_mtime}
+    valid = (
+        manifest is not None
+        and manifest["source"]["size"] == stat.st_size
+        and manifest["source"]["mtime"] == stat.st_mtime
+    )
+    if not valid:
+        source["sha1"] = _file_sha1(path)
+        if manifest is not None and manifest["source"].get("sha1") == source["sha1"]:
+            # Touched but unchanged, only refresh the mtime
+            manifest["source"] = source
+            with open(os.path.join(cache_path, MANIFEST), "w") as f:
+                json.dump(manifest, f, indent=1)
+        else:
+            _write_cache(path, cache_path, source)
+            manifest = _read_manifest(cache_path)
+
+    flat = {}
+    for name, field in manifest["fields"].items():
+        if field["kind"] == "array":
+            flat[name] = np.load(os.path.join(cache_path, field["file"]), mmap_mode="r")
+        elif field["kind"] == "object":
+            flat[name] = np.load(
+                os.path.join(cache_path, field["file"]), allow_pickle=True
+            )[()]
+        else:
+            flat[name] = field["value"]
+    return _unflatten(flat)
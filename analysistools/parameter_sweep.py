@@ -0,0 +1,264 @@
+import functools
+import hashlib
+import inspect
+import itertools
+import marshal
+import multiprocessing
+import os
+import pickle
+import types
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+# Model and points of the running sweep. Forked workers inherit these, so the
+# model does not need to be picklable (e.g. lambdas or closures).
+_SWEEP_JOB: tuple[Callable, list[dict[str, float]]] | None = None
+
+
+def _evaluate_chunk(chunk: range) -> list[np.ndarray]:
+    model, points = _SWEEP_JOB
+    return [np.asarray(model(**points[idx])) for idx in chunk]
+
+
+def _code_names(code: types.CodeType) -> set[str]:
+    # Global names used by code and the functions and classes nested in it
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def model_key(model: Callable) -> str:
+    """Hash of everything a model computes its output from besides its
+    arguments: its code, defaults, closure variables and the module globals it
+    uses, also through functions and instances defined in the same module.
+    Functions, classes and modules imported from elsewhere are identified by
+    name, so library code is assumed not to change within a session.
+    """
+    sha1 = hashlib.sha1()
+    # Visited objects, kept alive so that their ids are not reused
+    seen: dict[int, object] = {}
+    module = getattr(inspect.unwrap(model), "__module__", None)
+
+    def update(value: object) -> None:
+        if id(value) in seen:
+            sha1.update(b"<seen>")
+            return
+        seen[id(value)] = value
+        if isinstance(value, types.ModuleType):
+            sha1.update(f"<module {value.__name__}>".encode())
+        elif isinstance(value, functools.partial):
+            for item in (value.func, value.args, value.keywords):
+                update(item)
+        elif isinstance(value, types.MethodType):
+            update(value.__func__)
+            update(value.__self__)
+        elif isinstance(value, (types.FunctionType, type)) and (
+            value.__module__ != module
+        ):
+            sha1.update(f"<{value.__module__}.{value.__qualname__}>".encode())
+        elif isinstance(value, types.FunctionType):
+            code = value.__code__
+            sha1.update(marshal.dumps(code))
+            update(value.__defaults__)
+            update(value.__kwdefaults__)
+            for cell in value.__closure__ or ():
+                update(cell.cell_contents)
+            for name in sorted(_code_names(code)):
+                if name in value.__globals__:
+                    sha1.update(name.encode())
+                    update(value.__globals__[name])
+        elif isinstance(value, type):
+            sha1.update(value.__qualname__.encode())
+            for name, attribute in sorted(vars(value).items()):
+                if isinstance(attribute, (types.FunctionType, staticmethod)):
+                    sha1.update(name.encode())
+                    update(getattr(value, name))
+        elif isinstance(value, np.ndarray):
+            sha1.update(repr((value.dtype, value.shape)).encode())
+            sha1.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, (tuple, list)):
+            sha1.update(f"<{type(value).__name__} {len(value)}>".encode())
+            for item in value:
+                update(item)
+        elif isinstance(value, dict):
+            sha1.update(f"<dict {len(value)}>".encode())
+            for key, item in value.items():
+                update(key)
+                update(item)
+        elif getattr(type(value), "__module__", None) == module and hasattr(
+            value, "__dict__"
+        ):
+            # Instances of classes of the model's module, e.g. a callable
+            # model object with parameters as attributes
+            update(type(value))
+            update(vars(value))
+        else:
+            try:
+                sha1.update(pickle.dumps(value))
+            except Exception:
+                sha1.update(repr(value).encode())
+
+    update(model)
+    return sha1.hexdigest()
+
+
+class SweepCache:
+    """Least recently used cache of sweep results, by model_key and point.
+
+    Pass the same cache to related sweeps (e.g. one per script or notebook)
+    so repeated points are only computed once. Entries are keyed on the
+    model's inputs rather than on the model object, so a closure or a model
+    whose globals changed is evaluated again, and at most maxsize results
+    are kept.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self._results: OrderedDict[tuple, np.ndarray] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._results
+
+    def get(self, key: tuple) -> np.ndarray | None:
+        if key not in self._results:
+            return None
+        self._results.move_to_end(key)
+        return self._results[key]
+
+    def put(self, key: tuple, value: np.ndarray) -> None:
+        self._results[key] = value
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    def clear(self) -> None:
+        self._results.clear()
+
+
+@dataclass
+class SweepResult:
+    values: np.ndarray
+    dims: tuple[str, ...]
+    coords: dict[str, np.ndarray]
+
+    def sel(self, **selection: float | str) -> "SweepResult":
+        # Select single coordinate values, dropping the selected dimensions
+        index = []
+        for dim in self.dims:
+            if dim in selection:
+                coord = self.coords[dim]
+                if coord.dtype.kind in "fc":
+                    matches = np.flatnonzero(np.isclose(coord, selection[dim]))
+                else:
+                    matches = np.flatnonzero(coord == selection[dim])
+                if matches.size == 0:
+                    raise KeyError(f"{selection[dim]} is not a coordinate of {dim}.")
+                index.append(matches[0])
+            else:
+                index.append(slice(None))
+        dims = tuple(dim for dim in self.dims if dim not in selection)
+        return SweepResult(
+            self.values[tuple(index)], dims, {dim: self.coords[dim] for dim in dims}
+        )
+
+    def squeeze(self) -> "SweepResult":
+        dims = tuple(dim for dim in self.dims if len(self.coords[dim]) != 1)
+        return SweepResult(
+            self.values.reshape([len(self.coords[dim]) for dim in dims]),
+            dims,
+            {dim: self.coords[dim] for dim in dims},
+        )
+
+
+def sweep(
+    model: Callable,
+    grid: dict[str, np.ndarray | list[float]],
+    output_dims: dict[str, np.ndarray] | None = None,
+    n_workers: int | None = None,
+    chunksize: int | None = None,
+    cache: SweepCache | None = None,
+) -> SweepResult:
+    """Evaluate a model on the full product of a parameter grid.
+
+    Points that were already evaluated for the same model inputs (also in
+    earlier sweeps sharing the cache) are taken from the cache, the remaining
+    unique points are evaluated in parallel chunks (on platforms with fork,
+    serially otherwise).
+
+    Args:
+        model: Called as model(**point) for every grid point, returns an array
+            (or scalar) of the same shape for all points.
+        grid: Coordinates of every sweep axis, by model keyword.
+        output_dims: Names and coordinates of the axes of the model output.
+        n_workers: Number of processes, defaults to the number of cores.
+        chunksize: Number of points per task.
+        cache: Results of earlier sweeps, updated with the new points. Only
+            duplicates within this sweep are reused if None.
+
+    Return:
+        sweep_result: Values with shape (*grid axes, *output axes) and the
+            coordinates of all axes.
+    """
+    global _SWEEP_JOB
+    output_dims = output_dims or {}
+    coords = {name: np.atleast_1d(np.asarray(values)) for name, values in grid.items()}
+    points = [
+        dict(zip(coords, values))
+        for values in itertools.product(*[coord.tolist() for coord in coords.values()])
+    ]
+    inputs = model_key(model)
+    keys = [(inputs, tuple(point.items())) for point in points]
+
+    found = {}
+    todo = {}
+    for key, point in zip(keys, points):
+        if key in found or key in todo:
+            continue
+        value = None if cache is None else cache.get(key)
+        if value is None:
+            todo[key] = point
+        else:
+            found[key] = value
+    todo_points = list(todo.values())
+
+    n_workers = n_workers or os.cpu_count() or 1
+    can_fork = "fork" in multiprocessing.get_all_start_methods()
+    if can_fork and n_workers > 1 and len(todo_points) > 1:
+        chunksize = chunksize or max(1, len(todo_points) // (4 * n_workers))
+        chunks = [
+            range(start, min(start + chunksize, len(todo_points)))
+            for start in range(0, len(todo_points), chunksize)
+        ]
+        _SWEEP_JOB = (model, todo_points)
+        try:
+            with ProcessPoolExecutor(
+                n_workers, mp_context=multiprocessing.get_context("fork")
+            ) as pool:
+                results = [
+                    value for chunk in pool.map(_evaluate_chunk, chunks) for value in chunk
+                ]
+        finally:
+            _SWEEP_JOB = None
+    else:
+        results = [np.asarray(model(**point)) for point in todo_points]
+
+    found.update(zip(todo, results))
+    if cache is not None:
+        for key in todo:
+            cache.put(key, found[key])
+
+    values = np.array([found[key] for key in keys])
+    shape = [len(coord) for coord in coords.values()] + list(values.shape[1:])
+    coords.update({name: np.asarray(coord) for name, coord in output_dims.items()})
+    for axis, length in enumerate(values.shape[1 + len(output_dims) :]):
+        coords[f"dim_{axis}"] = np.arange(length)
+    return SweepResult(values.reshape(shape), tuple(coords), coords)
@@ -0,0 +1,177 @@
+import os
+from dataclasses import dataclass
+from typing import Iterator
+
+import numpy as np
+
+from .matcache import CACHEDIR, read_mat_cached
+from .sweeps import SweepCollection, SweepFile
+
+# Speed of light in nm THz, wavelength [nm] = C_NM_THZ / frequency [THz]
+C_NM_THZ = 2.99792458e5
+
+
+@dataclass(frozen=True)
+class Stage:
+    # op is one of "select", "subtract", "divide", "scale", "wavelength".
+    # operand is an index for select, a field name or a value otherwise.
+    op: str
+    field: str
+    operand: object = None
+    # Axis of field along which a 1-D operand runs
+    axis: int | None = None
+    # Output field, for stages that create a new field
+    name: str | None = None
+
+
+class SweepPipeline:
+    """Lazy, composable preprocessing of the Data fields of a .mat sweep.
+
+    Building a pipeline only records stages, e.g.
+
+        pipeline = (
+            SweepPipeline()
+            .select(np.s_[:, :-6:5], "MeasureCounts", "MeasureCurrent")
+            .subtract_dark("MeasureCounts", "DarkCounts")
+            .normalize_power("MeasureCounts", "MeasuredPower", axis=0)
+            .scale("MeasureCurrent", 1e6)
+            .to_wavelength("FreqList")
+        )
+
+    and every method returns a new pipeline, so a common base can be
+    extended per notebook. Nothing is read until the pipeline is applied to
+    a sweep (a path, a SweepFile or the Data dict of read_mat_cached).
+
+    Selections with basic indexing are views into the memory-mapped cache.
+    Every field changed by the arithmetic stages gets exactly one output
+    buffer of its selected size, written by the first stage and updated in
+    place by the following ones, so a sweep is never copied more than once.
+    With out_dir the buffers are .npy memory maps there, for sweeps that do
+    not fit in memory. Selections should come before the arithmetic stages
+    of a field, otherwise the buffer is allocated at full size.
+    """
+
+    def __init__(self, stages: tuple[Stage, ...] = ()) -> None:
+        self.stages = stages
+
+    def _then(self, *stages: Stage) -> "SweepPipeline":
+        return SweepPipeline(self.stages + stages)
+
+    def select(self, index: object, *fields: str) -> "SweepPipeline":
+        """Index fields, e.g. np.s_[:, :-6:5] to decimate the voltages."""
+        return self._then(*(Stage("select", field, index) for field in fields))
+
+    def subtract_dark(
+        self, field: str, dark: str | float = "DarkCounts", axis: int | None = None
+    ) -> "SweepPipeline":
+        return self._then(Stage("subtract", field, dark, axis))
+
+    def normalize_power(
+        self, field: str, power: str | float = "MeasuredPower", axis: int | None = 0
+    ) -> "SweepPipeline":
+        """Divide field by the measured power, which runs along axis."""
+        return self._then(Stage("divide", field, power, axis))
+
+    def scale(self, field: str, factor: float) -> "SweepPipeline":
+        return self._then(Stage("scale", field, factor))
+
+    def to_wavelength(
+        self, field: str = "FreqList", name: str = "wavelength"
+    ) -> "SweepPipeline":
+        """Add the wavelength in nm of a frequency field in THz as name."""
+        return self._then(Stage("wavelength", field, name=name))
+
+    @property
+    def fields(self) -> list[str]:
+        # Every field the pipeline reads or creates, in order of first use
+        names = []
+        for stage in self.stages:
+            operand = stage.operand if stage.op in ("subtract", "divide") else None
+            for name in (stage.field, operand, stage.name):
+                if isinstance(name, str) and name not in names:
+                    names.append(name)
+        return names
+
+    def __call__(
+        self, data: dict, out_dir: str | None = None
+    ) -> dict[str, np.ndarray | float]:
+        """Apply all stages to the Data dict of a sweep.
+
+        Args:
+            data: Fields of the sweep, e.g. read_mat_cached(path)["Data"].
+            out_dir: Directory for memory-mapped output buffers, in memory
+                if None.
+
+        Return:
+            fields: Every field used by the pipeline, after all stages.
+        """
+        if out_dir is not None:
+            os.makedirs(out_dir, exist_ok=True)
+        created = {stage.name for stage in self.stages if stage.name}
+        missing = [
+            name for name in self.fields if name not in data and name not in created
+        ]
+        if missing:
+            raise KeyError(f"Sweep has no fields {missing}.")
+        fields = {name: data[name] for name in self.fields if name in data}
+        buffers: set[str] = set()
+
+        def allocate(name: str, shape: tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+            buffers.add(name)
+            if out_dir is None:
+                return np.empty(shape, dtype)
+            path = os.path.join(out_dir, f"{name}.npy")
+            return np.lib.format.open_memmap(path, "w+", dtype, shape)
+
+        def operand(stage: Stage) -> np.ndarray | float:
+            value = stage.operand
+            value = np.asarray(fields[value] if isinstance(value, str) else value)
+            field_ndim = np.ndim(fields[stage.field])
+            if stage.axis is not None and value.ndim == 1 and field_ndim > 1:
+                # Broadcast e.g. the power list along the power axis
+                shape = [1] * field_ndim
+                shape[stage.axis] = -1
+                value = value.reshape(shape)
+            return value
+
+        ufuncs = {"subtract": np.subtract, "divide": np.divide, "scale": np.multiply}
+        for stage in self.stages:
+            if stage.op == "select":
+                fields[stage.field] = fields[stage.field][stage.operand]
+            elif stage.op == "wavelength":
+                frequency = np.asarray(fields[stage.field])
+                dtype = np.result_type(frequency, float)
+                out = allocate(stage.name, frequency.shape, dtype)
+                fields[stage.name] = np.divide(C_NM_THZ, frequency, out=out)
+            else:
+                value = operand(stage)
+                source = fields[stage.field]
+                if stage.field in buffers:
+                    out = source
+                else:
+                    shape = np.broadcast_shapes(np.shape(source), np.shape(value))
+                    dtype = np.result_type(source, value, float)
+                    out = allocate(stage.field, shape, dtype)
+                fields[stage.field] = ufuncs[stage.op](source, value, out=out)
+        return fields
+
+    def run(
+        self,
+        sweep: str | SweepFile,
+        cache_dir: str = CACHEDIR,
+        out_dir: str | None = None,
+    ) -> dict[str, np.ndarray | float]:
+        path = sweep.path if isinstance(sweep, SweepFile) else sweep
+        return self(read_mat_cached(path, cache_dir)["Data"], out_dir)
+
+    def iter_collection(
+        self, collection: SweepCollection, out_dir: str | None = None
+    ) -> Iterator[tuple[SweepFile, dict[str, np.ndarray | float]]]:
+        """Apply the pipeline to every sweep of a collection. With out_dir,
+        the buffers of each sweep go to a subdirectory named after its file."""
+        for sweep_file in collection:
+            sweep_dir = None
+            if out_dir is not None:
+                stem = os.path.splitext(os.path.basename(sweep_file.path))[0]
+                sweep_dir = os.path.join(out_dir, stem)
+            yield sweep_file, self.run(sweep_file, collection.cache_dir, sweep_dir)
@@ -0,0 +1,159 @@
+import numpy as np
+from scipy.linalg import eigh
+
+# Golden ratio step of the GCV minimum search
+_GOLDEN = (np.sqrt(5) - 1) / 2
+
+
+class SmoothingSplineBank:
+    """Cubic smoothing splines of many curves sampled on a common x-grid,
+    e.g. hundreds of frequency scans or the bands of a band structure.
+
+    Every spline minimizes sum(w * (y - f(x))**2) + lam * integral(f''**2),
+    as scipy.interpolate.make_smoothing_spline, with lam chosen per curve by
+    generalized cross-validation unless given.
+
+    The penalized system is decomposed once per grid (a generalized
+    eigendecomposition of the Reinsch form, O(n**3) for n grid points), after
+    which smoothing a curve costs O(n**2) for any lam. The GCV criterion of
+    all curves is evaluated on a shared lam grid and refined per curve with
+    a vectorized golden-section search, and all splines are evaluated
+    together on new points.
+
+    Usage:
+        bank = SmoothingSplineBank(k)
+        bank.fit(bands)  # shape (n_bands, len(k))
+        values = bank(k_linspace)  # shape (n_bands, len(k_linspace))
+    """
+
+    def __init__(self, x: np.ndarray, w: np.ndarray | None = None) -> None:
+        x = np.asarray(x, dtype=float)
+        if x.ndim != 1 or len(x) < 3:
+            raise ValueError("x must be one dimensional with at least 3 points.")
+        # Decreasing grids (e.g. wavelengths of a frequency sweep) are sorted
+        self.order = np.argsort(x)
+        self.x = x[self.order]
+        h = np.diff(self.x)
+        if np.any(h <= 0):
+            raise ValueError("x must not contain duplicates.")
+        self.w = (
+            np.ones(len(x)) if w is None else np.asarray(w, dtype=float)[self.order]
+        )
+
+        # Reinsch form: the natural spline with values g at the knots and
+        # second derivatives gamma at the inner knots has Q^T g = R gamma
+        n = len(self.x)
+        Q = np.zeros((n, n - 2))
+        inner = np.arange(n - 2)
+        Q[inner, inner] = 1 / h[:-1]
+        Q[inner + 1, inner] = -1 / h[:-1] - 1 / h[1:]
+        Q[inner + 2, inner] = 1 / h[1:]
+        R = (
+            np.diag((h[:-1] + h[1:]) / 3)
+            + np.diag(h[1:-1] / 6, 1)
+            + np.diag(h[1:-1] / 6, -1)
+        )
+
+        # V^T R V = 1 and V^T Q^T W^-1 Q V = diag(mu), so the penalized
+        # system R + lam Q^T W^-1 Q is diagonal in V for every lam
+        self.mu, self.V = eigh(Q.T @ (Q / self.w[:, None]), R)
+        self.Q = Q
+        self.lam = None
+        self.gcv = None
+        self.values = None
+        self.deriv2 = None
+
+    def _gcv(self, lam: np.ndarray, C2: np.ndarray) -> np.ndarray:
+        # GCV = n * weighted RSS / tr(1 - S)**2 for lam of shape (k, m) and
+        # the squared coefficients C2 of shape (m, n - 2), shape (k, m)
+        lam_mu = lam[..., None] * self.mu
+        shrink = lam_mu / (1 + lam_mu)
+        rss = np.sum(shrink**2 * C2 / self.mu, axis=-1)
+        return len(self.x) * rss / np.sum(shrink, axis=-1) ** 2
+
+    def _select_lam(
+        self, C2: np.ndarray, n_grid: int = 100, n_iter: int = 40
+    ) -> np.ndarray:
+        log_lam = np.linspace(
+            -np.log(self.mu[-1]) - 5, -np.log(self.mu[0]) + 5, n_grid
+        )
+        gcv = self._gcv(np.exp(log_lam)[:, None] * np.ones(len(C2)), C2)
+        best = np.argmin(gcv, axis=0)
+        lower = log_lam[np.maximum(best - 1, 0)]
+        upper = log_lam[np.minimum(best + 1, n_grid - 1)]
+
+        # Golden-section search in log(lam) for all curves at once
+        left = upper - _GOLDEN * (upper - lower)
+        right = lower + _GOLDEN * (upper - lower)
+        gcv_left = self._gcv(np.exp(left), C2)
+        gcv_right = self._gcv(np.exp(right), C2)
+        for _ in range(n_iter):
+            go_left = gcv_left < gcv_right
+            upper = np.where(go_left, right, upper)
+            lower = np.where(go_left, lower, left)
+            left, right = (
+                upper - _GOLDEN * (upper - lower),
+                lower + _GOLDEN * (upper - lower),
+            )
+            gcv_new = self._gcv(np.exp(np.where(go_left, left, right)), C2)
+            gcv_left, gcv_right = (
+                np.where(go_left, gcv_new, gcv_right),
+                np.where(go_left, gcv_left, gcv_new),
+            )
+        return np.exp((lower + upper) / 2)
+
+    def fit(
+        self, Y: np.ndarray, lam: float | np.ndarray | None = None
+    ) -> "SmoothingSplineBank":
+        """Smooth every curve along the last axis of Y, shape (..., len(x)).
+
+        Args:
+            Y: Ordinates of the curves, in the order of the x given to the bank.
+            lam: Smoothing parameter, a scalar or one per curve (shape
+                Y.shape[:-1]), chosen by GCV if None.
+
+        Return:
+            self, with lam, gcv, values (the smoothed values at the sorted
+            x) and deriv2 (their second derivatives) per curve.
+        """
+        Y = np.asarray(Y, dtype=float)
+        batch_shape = Y.shape[:-1]
+        Y = Y.reshape(-1, Y.shape[-1])[:, self.order]
+        C = (Y @ self.Q) @ self.V
+        C2 = C**2
+
+        if lam is None:
+            lam = self._select_lam(C2)
+        else:
+            lam = np.broadcast_to(np.asarray(lam, dtype=float), batch_shape).ravel()
+            if np.any(lam < 0):
+                raise ValueError("lam must be non-negative.")
+
+        gamma = (C / (1 + lam[:, None] * self.mu)) @ self.V.T
+        values = Y - lam[:, None] * (gamma @ self.Q.T) / self.w
+        deriv2 = np.zeros_like(values)
+        deriv2[:, 1:-1] = gamma
+
+        self.lam = lam.reshape(batch_shape)
+        self.gcv = self._gcv(lam, C2).reshape(batch_shape)
+        self.values = values.reshape(batch_shape + (len(self.x),))
+        self.deriv2 = deriv2.reshape(batch_shape + (len(self.x),))
+        return self
+
+    def __call__(self, x_new: np.ndarray) -> np.ndarray:
+        """All splines at x_new, shape (..., *x_new.shape). Outside the grid
+        the end pieces are continued, as make_smoothing_spline does."""
+        if self.values is None:
+            raise ValueError("fit() must be called first.")
+        x_new = np.asarray(x_new, dtype=float)
+        idx = np.clip(np.searchsorted(self.x, x_new) - 1, 0, len(self.x) - 2)
+        h = self.x[idx + 1] - self.x[idx]
+        b = (x_new - self.x[idx]) / h
+        a = 1 - b
+        lower, upper = self.deriv2[..., idx], self.deriv2[..., idx + 1]
+        curvature = (a**3 - a) * lower + (b**3 - b) * upper
+        return (
+            a * self.values[..., idx]
+            + b * self.values[..., idx + 1]
+            + curvature * h**2 / 6
+        )
@@ -0,0 +1,185 @@
+import os
+import re
+import warnings
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+import numpy as np
+from scipy.io import whosmat
+
+from .matcache import CACHEDIR, read_mat_cached
+
+# e.g. ..._CTL_CW_0p02uW_200uW_0V_-5V.mat
+POWER_RANGE_RE = re.compile(r"(-?\d+(?:p\d+)?)uW_(-?\d+(?:p\d+)?)uW")
+VOLTAGE_RANGE_RE = re.compile(r"(-?\d+(?:p\d+)?)V_(-?\d+(?:p\d+)?)V(?:_|$)")
+
+
+def _parse_number(number: str) -> float:
+    return float(number.replace("p", "."))
+
+
+@dataclass
+class SweepFile:
+    path: str
+    resistance: float | None
+    frequency: float | None  # THz
+    wavelength: float | None  # nm
+    power_range: tuple[float, float] | None  # muW
+    voltage_range: tuple[float, float] | None  # V
+    # Whether the Data header was read, otherwise only the file name was parsed
+    header_read: bool = False
+
+
+def mat_variables(path: str) -> list[str]:
+    # Top-level variable names of a .mat file, without reading any data
+    try:
+        return [name for name, _, _ in whosmat(path)]
+    except NotImplementedError:
+        # v7.3 files are HDF5
+        import h5py
+
+        with h5py.File(path, "r") as f:
+            return [name for name in f.keys() if not name.startswith("#")]
+
+
+def read_sweep_header(sweep_file: SweepFile, cache_dir: str = CACHEDIR) -> None:
+    """Update sweep_file in place from its Data header, which takes precedence
+    over the file name. This converts the file into the cache on first use;
+    arrays are memory-mapped, so only the scanned lists are actually read."""
+    if sweep_file.header_read:
+        return
+    data = read_mat_cached(sweep_file.path, cache_dir).get("Data")
+    if not isinstance(data, dict):
+        raise ValueError(f"{sweep_file.path} is not a sweep file (no Data struct).")
+    if "Resistance" in data:
+        sweep_file.resistance = float(data["Resistance"])
+    if "M_freq" in data:
+        sweep_file.frequency = float(np.mean(data["M_freq"]))
+        sweep_file.wavelength = 2.99792458e5 / sweep_file.frequency
+    if "PowerList" in data:
+        sweep_file.power_range = (
+            float(data["PowerList"][0]) * 1e6,
+            float(data["PowerList"][-1]) * 1e6,
+        )
+    if "VoltageList" in data:
+        sweep_file.voltage_range = (
+            float(data["VoltageList"][0]),
+            float(data["VoltageList"][-1]),
+        )
+    sweep_file.header_read = True
+
+
+def index_sweep_file(
+    path: str, cache_dir: str = CACHEDIR, read_header: bool = True
+) -> SweepFile:
+    stem = os.path.splitext(os.path.basename(path))[0]
+
+    power_match = POWER_RANGE_RE.search(stem)
+    voltage_match = VOLTAGE_RANGE_RE.search(stem)
+    power_range = (
+        tuple(map(_parse_number, power_match.groups())) if power_match else None
+    )
+    voltage_range = (
+        tuple(map(_parse_number, voltage_match.groups())) if voltage_match else None
+    )
+
+    sweep_file = SweepFile(path, None, None, None, power_range, voltage_range)
+    if read_header:
+        read_sweep_header(sweep_file, cache_dir)
+    return sweep_file
+
+
+class SweepCollection:
+    """Lazy index over the .mat files of a measurement directory.
+
+    Files are indexed by resistance, frequency/wavelength and power/voltage
+    ranges (from the file name and the Data header). Measurement fields are
+    only read when requested, through read_mat_cached, so memory scales with
+    the data that is actually used rather than with the size of the campaign.
+
+    Scanning a directory only lists the variables of every file: files
+    without a Data struct (e.g. IV curves) are skipped with a warning and
+    listed in skipped. A file's header is read, converting it into the
+    cache, the first time the file is accessed, selected or sorted on.
+    """
+
+    def __init__(
+        self,
+        data_dir: str | None = None,
+        cache_dir: str = CACHEDIR,
+        sweep_files: list[SweepFile] | None = None,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.skipped: list[str] = []
+        if sweep_files is None:
+            fnames = sorted(
+                fname for fname in os.listdir(data_dir) if fname.endswith(".mat")
+            )
+            sweep_files = []
+            for fname in fnames:
+                path = os.path.join(data_dir, fname)
+                if "Data" in mat_variables(path):
+                    sweep_files.append(index_sweep_file(path, cache_dir, False))
+                else:
+                    self.skipped.append(path)
+            if self.skipped:
+                warnings.warn(
+                    f"Skipped {len(self.skipped)} .mat files without a Data "
+                    f"struct in {data_dir}: "
+                    + ", ".join(os.path.basename(path) for path in self.skipped)
+                )
+        self.sweep_files = sweep_files
+
+    def __len__(self) -> int:
+        return len(self.sweep_files)
+
+    def _header(self, sweep_file: SweepFile) -> SweepFile:
+        read_sweep_header(sweep_file, self.cache_dir)
+        return sweep_file
+
+    def __iter__(self) -> Iterator[SweepFile]:
+        return (self._header(sweep_file) for sweep_file in self.sweep_files)
+
+    def __getitem__(self, idx: int) -> SweepFile:
+        return self._header(self.sweep_files[idx])
+
+    def select(self, **criteria: object | Callable) -> "SweepCollection":
+        """Sub-collection of the files matching all criteria.
+
+        A criterion is either a value compared to the SweepFile attribute
+        (floats with np.isclose) or a predicate on the attribute, e.g.
+        select(resistance=677000, wavelength=lambda wl: wl > 930).
+        """
+
+        def matches(sweep_file: SweepFile) -> bool:
+            for name, criterion in criteria.items():
+                value = getattr(self._header(sweep_file), name)
+                if callable(criterion):
+                    if value is None or not criterion(value):
+                        return False
+                elif value is None or not np.allclose(value, criterion):
+                    return False
+            return True
+
+        return SweepCollection(
+            cache_dir=self.cache_dir,
+            sweep_files=[sf for sf in self.sweep_files if matches(sf)],
+        )
+
+    def sorted_by(self, name: str) -> "SweepCollection":
+        return SweepCollection(
+            cache_dir=self.cache_dir,
+            sweep_files=sorted(
+                self.sweep_files, key=lambda sf: getattr(self._header(sf), name)
+            ),
+        )
+
+    def load(self, sweep_file: SweepFile, *fields: str) -> dict[str, np.ndarray]:
+        data = read_mat_cached(sweep_file.path, self.cache_dir)["Data"]
+        return {field: data[field] for field in fields}
+
+    def iter_fields(
+        self, *fields: str
+    ) -> Iterator[tuple[SweepFile, dict[str, np.ndarray]]]:
+        for sweep_file in self:
+            yield sweep_file, self.load(sweep_file, *fields)
@@ -13,37 +13,8 @@
 
 # Constants
 
-from calc_gaas_index import gaas_index
-from scipy import special
 import numpy as np
-
-# Here, k is the "kind" of the airy function
-def airy(k: int, z: float) -> float:
-    if not isinstance(k, int) or k not in [0, 1, 2, 3]:
-        raise ValueError("k must be an integer between 0 and 3.")
-    else:
-        return special.airy(z)[k]
-
-def FK_absorption(lam: float, x: float, T: float, F:float) -> float:
-    n = gaas_index(lam,x,T) # GaAs refractive index (constant)
-    mh1 = 0.087 # Light-hole effective mass
-    mh2 = 0.45 # Heavy-hole effective mass
-    mu1 = 0.0377   
-    mu2 = 0.0579
-    fkcoeff = 0.58 # Experimental coefficient
-
-    Eg = 1.519-5.405e-4*T**2/(T+204) # Temperature-dependent gap 
-    Eph = 1239.84/lam
-
-    beta1 = 1.1e5*(Eg-Eph)*(2*mu1)**(1/3)*F**(-2/3)
-    beta2 = 1.1e5*(Eg-Eph)*(2*mu2)**(1/3)*F**(-2/3)
-
-    a1 = (1+1/mh1)*(2*mu1)**(4/3)*(np.abs(airy(1,beta1))**2- beta1*np.abs(airy(0, beta1))**2)
-    a2 = (1+1/mh2)*(2*mu2)**(4/3)*(np.abs(airy(1,beta2))**2- beta2*np.abs(airy(0, beta2))**2)
-
-    FKa = (a1+a2)*F**(1/3)*1e4/n
-    alpha = fkcoeff*FKa
-    return alpha
+from fkphysics.absorption import airy, FK_absorption
 
 if __name__ == "__main__":
     import matplotlib.pyplot as plt
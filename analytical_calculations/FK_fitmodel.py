@@ -5,9 +5,12 @@
 # x=u(:,2)
 
 import numpy as np
-from FK_absorption import FK_absorption
-from scipy.optimize import root_scalar, fsolve
 import matplotlib.pyplot as plt
+from fkphysics.absorption import FK_fit
+from fkphysics.selfconsistent import FK_fit_power
+
+# Imported by plot_FK_absorption.py and plot_fk_transmission.py
+__all__ = ["FK_fit", "FK_fit_power"]
 
 
 # def FK_fit(lam: float, x: float, T: float, V_d: float, a: float, b: float) -> float:
@@ -24,20 +27,6 @@ import matplotlib.pyplot as plt
 #     return a * FK_absorption(lam, x, T, -(V_d - 1.4) / depletion_width) + b
 
 
-def FK_fit(lam: float, x: float, T: float, V_d: float) -> float:
-    # Na=1e25
-    # Nd=2e24
-    # eps0 = 8.85e-12
-    # er = 12
-    # q = 1.6e-19
-    # d0 = 100e-9
-    # xd = 1e2*sqrt(d0**2+2*er*eps0/q*(Na+Nd)/(Na*Nd)*(1.4-x))
-    # We do things in nanometers first then convert to centimeters
-    # to avoid floating point issues. 795.5 is in units nm²/V
-    depletion_width = 1e-7 * np.sqrt(1e4 + 795.5 * (1.4 - V_d))
-    return FK_absorption(lam, x, T, -(V_d - 1.4) / depletion_width)
-
-
 # def FK_fit_power(
 #     P_in: float,
 #     eta: float,
@@ -66,36 +55,6 @@ def FK_fit(lam: float, x: float, T: float, V_d: float) -> float:
 #     return P_in * np.exp(-L * alphas), alphas
 
 
-def FK_fit_power(
-    P_in: float,
-    eta: float,
-    R: float,
-    L: float,
-    lam: float,
-    x: float,
-    T: float,
-    V_app: float,
-    alpha_0: float,
-):
-    alphas = []
-    for idx, power in enumerate(P_in):
-        func = (
-            lambda alpha: FK_fit(
-                lam, x, T, V_app + power * eta / 1.24 * (lam / 1000) * R * (1 - np.exp(-alpha * L))
-            )
-            + alpha_0
-            - alpha
-        )
-        if idx == 0:
-            alpha = fsolve(func, 1000)[0]
-        else:
-            alpha = fsolve(func, alphas[-1])[0]
-        alphas.append(alpha)
-
-    alphas = np.array(alphas)
-    return P_in * np.exp(-L * alphas), alphas
-
-
 if __name__ == "__main__":
     p_in_vals = np.linspace(0, 100, 500)
     # Power in muW, eta in A/W, R in Mohm, L in cm, lambda in nm, T in K, V_app in V
@@ -5,6 +5,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import scienceplots
 from FK_fitmodel import FK_fit_power
+from analysistools.parameter_sweep import SweepCache, sweep
 from utilities import savefig
 
 plt.style.use("science")
@@ -26,46 +27,53 @@ def plot_transmission(xdata, ydatas, labels):
 
 p_in_vals = np.linspace(0, 100, 500)
 wavelengths = np.linspace(900, 1000, 200)
+
+
 # Power in muW, eta in unitless, R in Mohm, L in cm, lambda in nm, T in K, V_app in V
-fk_transmission = lambda lam, voltage, L, R: FK_fit_power(
-    p_in_vals, 1, R, L, lam, 0, 298, voltage, 0
-)[0]
+def fk_model(lam, voltage, L, R):
+    return np.array(FK_fit_power(p_in_vals, 1, R, L, lam, 0, 298, voltage, 0))
+
+
+output_dims = {"quantity": np.array(["transmission", "absorption"]), "P_in": p_in_vals}
 
-fk_absorption = lambda lam, voltage, L, R: FK_fit_power(
-    p_in_vals, 1, R, L, lam, 0, 298, voltage, 0
-)[1]
 
-fk_transmissions_wavelengths = []
+sweep_cache = SweepCache()
 
-for wavelength in wavelengths:
-    fk_transmissions_wavelengths.append(fk_transmission(wavelength, -4, 3.5e-3, 0.1))
 
-fk_transmissions_wavelengths = np.array(fk_transmissions_wavelengths)
+def fk_sweep(lam, voltage, L, R):
+    grid = {"lam": lam, "voltage": voltage, "L": L, "R": R}
+    return sweep(fk_model, grid, output_dims, cache=sweep_cache)
+
+
+# The repeated 930 nm, -4 V, 35 mum, 100 kOhm point is only computed once
+wavelength_sweep = fk_sweep(wavelengths, -4, 3.5e-3, 0.1)
+fk_transmissions_wavelengths = (
+    wavelength_sweep.sel(quantity="transmission").squeeze().values
+)
+
+wl_sweep = fk_sweep([900, 930, 980], -4, 3.5e-3, 0.1).squeeze()
+resistance_sweep = fk_sweep(930, -4, 3.5e-3, [0.01, 0.1, 1.0]).squeeze()
+voltage_sweep = fk_sweep(930, [-0.1, -2, -4], 3.5e-3, 0.1).squeeze()
+length_sweep = fk_sweep(930, -1, [1.0e-3, 5.0e-3, 30e-3], 0.1).squeeze()
 
-fk_absorption_900nm = fk_absorption(900, -4, 3.5e-3, 0.1)
+fk_absorption_900nm = wl_sweep.sel(lam=900, quantity="absorption").values
 fk_voltage_900nm = -4 + p_in_vals * 0.1 * (1 - np.exp(-3.5e-3 * (fk_absorption_900nm)))
 
-fk_absorption_930nm = fk_absorption(930, -4, 3.5e-3, 0.1)
+fk_absorption_930nm = wl_sweep.sel(lam=930, quantity="absorption").values
 fk_voltage_930nm = -4 + p_in_vals * 0.1 * (1 - np.exp(-3.5e-3 * (fk_absorption_930nm)))
 
-fk_absorption_980nm = fk_absorption(980, -4, 3.5e-3, 0.1)
+fk_absorption_980nm = wl_sweep.sel(lam=980, quantity="absorption").values
 fk_voltage_980nm = -4 + p_in_vals * 0.1 * (1 - np.exp(-3.5e-3 * (fk_absorption_980nm)))
 
-trans_900nm = fk_transmission(900, -4, 3.5e-3, 0.1)
-trans_930nm = fk_transmission(930, -4, 3.5e-3, 0.1)
-trans_980nm = fk_transmission(980, -4, 3.5e-3, 0.1)
+trans_900nm, trans_930nm, trans_980nm = wl_sweep.sel(quantity="transmission").values
 
-trans_10k = fk_transmission(930, -4, 3.5e-3, 0.01)
-trans_100k = fk_transmission(930, -4, 3.5e-3, 0.1)
-trans_1m = fk_transmission(930, -4, 3.5e-3, 1.0)
+trans_10k, trans_100k, trans_1m = resistance_sweep.sel(quantity="transmission").values
 
-trans_m01V = fk_transmission(930, -0.1, 3.5e-3, 0.1)
-trans_m2V = fk_transmission(930, -2, 3.5e-3, 0.1)
-trans_m4V = fk_transmission(930, -4, 3.5e-3, 0.1)
+trans_m01V, trans_m2V, trans_m4V = voltage_sweep.sel(quantity="transmission").values
 
-trans_10mum = fk_transmission(930, -1, 1.0e-3, 0.1)
-trans_100mum = fk_transmission(930, -1, 5.0e-3, 0.1)
-trans_500mum = fk_transmission(930, -1, 30e-3, 0.1)
+trans_10mum, trans_100mum, trans_500mum = length_sweep.sel(
+    quantity="transmission"
+).values
 
 fig, ax = plot_transmission(
     p_in_vals,
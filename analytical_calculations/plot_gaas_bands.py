@@ -2,7 +2,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
 import os
-from scipy.interpolate import make_smoothing_spline
+from analysistools.smoothing import SmoothingSplineBank
 import scienceplots
 from utilities import savefig
 
@@ -26,11 +26,9 @@ ticks = [kmin, (0.61 + kmin) / 2, 0.61, (0.61 + kmax) / 2, kmax]
 
 L, lam, gamma, delta, X = ticks
 
-for band in range(12, 25):
-    if band > 17:
-        bands[band, :] += 1.4
-    spl = make_smoothing_spline(k, bands[band, :])
-    plt.plot(k_linspace, spl(k_linspace), linewidth=1.3, color="k")
+bands[18:25, :] += 1.4
+spl_vals = SmoothingSplineBank(k).fit(bands[12:25, :])(k_linspace)
+plt.plot(k_linspace, spl_vals.T, linewidth=1.3, color="k")
 
 plt.xlim(kmin, kmax)
 plt.ylim(Emin, Emax)
@@ -1,11 +1,14 @@
 import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
 import os
+from analysistools.figures import EXPORTER
 
 FIGDIR = os.path.join(os.path.dirname(__file__), "figures")
 
 
-def savefig(FNAME: str, fig_name: str, fig: Figure, tight=True, svg=False):
+def savefig(
+    FNAME: str, fig_name: str, fig: Figure, tight=True, svg=False, background=True
+):
 
     SAVEFIG_DIR = os.path.join(FIGDIR, FNAME)
 
@@ -17,7 +20,7 @@ def savefig(FNAME: str, fig_name: str, fig: Figure, tight=True, svg=False):
     if not os.path.exists(SAVEFIG_DIR):
         os.mkdir(SAVEFIG_DIR)
 
-    if tight:
-        fig.savefig(FIGPATH, dpi=300, bbox_inches="tight")
+    if background:
+        EXPORTER.submit(FIGPATH, fig, tight)
     else:
-        fig.savefig(FIGPATH, dpi=300)
+        EXPORTER.save(FIGPATH, fig, tight)
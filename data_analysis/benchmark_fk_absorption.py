@@ -0,0 +1,36 @@
+import sys
+import timeit
+from functools import partial
+
+import numpy as np
+
+from utilities import FK_absorption, FK_absorption_kernel
+
+# Benchmark of the fused FK_absorption_kernel against FK_absorption.
+# Usage: python benchmark_fk_absorption.py [max number of points]
+
+if __name__ == "__main__":
+    max_points = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10_000_000
+    sizes = [size for size in (10_000, 100_000, 1_000_000, 10_000_000) if size <= max_points]
+    x, T = 0.0, 298
+
+    print(f"{'points':>10} {'FK_absorption':>15} {'kernel':>10} {'kernel, out=':>13} {'speedup':>8}")
+    for size in sizes:
+        # (wavelength, field) grid as in the sweeps and FKAbsorptionTable
+        lam = np.linspace(900, 1000, size // 100)[:, None]
+        F = np.logspace(3, 6, 100)
+        out = np.empty((size // 100, 100))
+        number = max(1, 100_000 // size)
+
+        def best(stmt) -> float:
+            return min(timeit.repeat(stmt, number=number, repeat=3)) / number
+
+        # partial binds the arrays of this size, a lambda would look them up
+        # when called
+        t_ref = best(partial(FK_absorption, lam, x, T, F))
+        t_kernel = best(partial(FK_absorption_kernel, lam, x, T, F))
+        t_out = best(partial(FK_absorption_kernel, lam, x, T, F, out=out))
+        print(
+            f"{size:>10} {t_ref * 1e3:>12.2f} ms {t_kernel * 1e3:>7.2f} ms "
+            f"{t_out * 1e3:>10.2f} ms {t_ref / t_out:>7.2f}x"
+        )
@@ -1,14 +1,35 @@
 from matplotlib.figure import Figure
 import os
+import multiprocessing
+import warnings
 import numpy as np
-from scipy import special
-from scipy.optimize import fsolve
-from dataclasses import dataclass
-from typing import Callable
+from dataclasses import dataclass, field, replace
+from typing import Callable, Iterator
+import weakref
+from concurrent.futures import ProcessPoolExecutor
 import inspect
 from iminuit import Minuit
-from iminuit.cost import LeastSquares, BinnedNLL, UnbinnedNLL
+from iminuit.cost import LeastSquares, UnbinnedNLL, poisson_chi2
 from scipy.stats import chi2
+from analysistools.figures import EXPORTER
+from fkphysics.index import (
+    gaas_index,
+    gaas_index_coefficients,
+    gaas_index_cache_info,
+    gaas_index_cache_clear,
+)
+from fkphysics.absorption import (
+    airy,
+    FK_absorption,
+    FK_absorption_kernel,
+    FK_field,
+    FK_fit,
+    FK_absorption_grad,
+    FK_field_grad,
+    FK_fit_grad,
+)
+from fkphysics.table import FKAbsorptionTable
+from fkphysics.selfconsistent import solve_FK_alpha, solve_FK_alpha_continuation
 
 FIGDIR = os.path.join(os.path.dirname(__file__), "figures")
 
@@ -46,7 +67,159 @@ def num_err_to_latex_str(number: float, err: float) -> str:
     return latex_string
 
 
-def savefig(nb_name: str, fig_name: str, fig: Figure, tight=True, svg=False):
+def _format_fixed(numbers: np.ndarray, n_decimals: np.ndarray) -> np.ndarray:
+    # f"{number:.{n}f}" for every element, built from the rounded integer
+    # digits with numpy string operations instead of formatting one by one.
+    # Python rounds the exact binary value (4.65 is slightly above, so 4.7),
+    # the scaled product may land on the tie (46.5, rounded to even), so
+    # elements within rounding error of a tie are formatted by Python.
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = np.abs(numbers) * 10.0**n_decimals
+        digits = np.round(scaled)
+        near_tie = np.abs(np.abs(scaled - digits) - 0.5) <= 1e-9 * np.maximum(
+            scaled, 1
+        )
+    exact = (digits < 2**53) & ~near_tie  # False for NaN and inf
+    digits = np.where(exact, digits, 0).astype(np.int64).astype(str)
+    digits = np.strings.zfill(digits, n_decimals + 1)
+    split = np.strings.str_len(digits) - n_decimals
+    strings = np.strings.add(
+        np.where(np.signbit(numbers), "-", ""), np.strings.slice(digits, 0, split)
+    )
+    decimals = np.strings.add(".", np.strings.slice(digits, split, None))
+    strings = np.where(n_decimals > 0, np.strings.add(strings, decimals), strings)
+    if not np.all(exact):
+        strings = strings.astype(object)
+        for idx in zip(*np.nonzero(~exact)):
+            strings[idx] = f"{numbers[idx]:.{n_decimals[idx]}f}"
+        strings = strings.astype(str)
+    return strings
+
+
+def nums_errs_to_latex_strs(
+    numbers: np.ndarray, errs: np.ndarray | None = None, n_significant: int = 3
+) -> np.ndarray:
+    """Vectorized num_err_to_latex_str: all powers of ten and numbers of
+    decimals are computed in one pass over the arrays, and the strings are
+    assembled with numpy string operations.
+
+    Zero numbers are written without a power of ten, and the number of
+    decimals is never negative. Without errors, the numbers alone are written
+    with n_significant significant digits.
+
+    Args:
+        numbers: Numbers to be formatted.
+        errs: The errors on the numbers (same shape as numbers), or None.
+        n_significant: Significant digits of numbers without errors.
+
+    Return:
+        latex_strings: Array of formatted latex-strings with the shape of numbers.
+    """
+    numbers = np.asarray(numbers, dtype=float)
+    if errs is not None:
+        numbers, errs = np.broadcast_arrays(numbers, np.asarray(errs, dtype=float))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        powers_of_ten = np.floor(np.log10(np.abs(numbers)))
+        powers_of_ten = np.where(np.isfinite(powers_of_ten), powers_of_ten, 0).astype(int)
+        use_power = np.abs(powers_of_ten) > 2
+        scale = np.where(use_power, 10.0**powers_of_ten, 1.0)
+        nums_scaled = numbers / scale
+        if errs is None:
+            errs_scaled = None
+            leading = np.floor(np.log10(np.abs(nums_scaled)))
+            n_decimals = n_significant - 1 - np.where(np.isfinite(leading), leading, 0)
+        else:
+            errs_scaled = errs / scale
+            n_decimals = -np.floor(np.log10(np.abs(errs_scaled)))
+    n_decimals = np.where(np.isfinite(n_decimals), n_decimals, 0).clip(min=0).astype(int)
+
+    add = np.strings.add
+    strings = _format_fixed(nums_scaled, n_decimals)
+    mantissas = strings
+    if errs_scaled is not None:
+        strings = add(add(strings, r" \pm "), _format_fixed(errs_scaled, n_decimals))
+        mantissas = add(add("(", strings), ")")
+    powers = add(add(r"\times 10^{", powers_of_ten.astype(str)), "}")
+    strings = np.where(use_power, add(mantissas, powers), strings)
+    return add(add("$", strings), "$")
+
+
+def _is_fit_results(values: object) -> bool:
+    return (
+        isinstance(values, (list, tuple))
+        and len(values) > 0
+        and all(hasattr(value, "parameter_errors") for value in values)
+    )
+
+
+def results_table(
+    values: "np.ndarray | FitResultTable | list[FitResult]",
+    errors: np.ndarray | None = None,
+    columns: list[str] | None = None,
+    rows: list[str] | None = None,
+    fmt: str = "latex",
+) -> str:
+    """Format a table of (value, error) pairs, e.g. the parameters of many
+    fits, as a LaTeX tabular or a Markdown table in one call.
+
+    Args:
+        values: Array of shape (n_rows, n_columns), or a FitResultTable or
+            list of FitResults (one row per fit, one column per parameter).
+        errors: Errors with the shape of values. Taken from the fit results
+            if values is a FitResultTable or a list of FitResults, values
+            are written without errors if None otherwise.
+        columns: Column headers.
+        rows: Row labels, leave out for no label column.
+        fmt: "latex" or "markdown".
+
+    Return:
+        table: The formatted table.
+    """
+    if _is_fit_results(values):
+        values = FitResultTable.from_results(values)
+    if isinstance(values, FitResultTable):
+        if errors is None:
+            errors = values.parameter_errors
+        values = values.parameters
+    if errors is not None:
+        errors = np.atleast_2d(errors)
+    cells = nums_errs_to_latex_strs(np.atleast_2d(values), errors)
+    n_columns = cells.shape[1]
+    if columns is None:
+        columns = [""] * n_columns
+    if len(columns) != n_columns or (rows is not None and len(rows) != len(cells)):
+        raise ValueError("columns/rows must match the shape of values.")
+
+    header = list(columns)
+    lines = [list(row) for row in cells]
+    if rows is not None:
+        header = [""] + header
+        lines = [[label] + line for label, line in zip(rows, lines)]
+
+    if fmt == "latex":
+        table = [
+            rf"\begin{{tabular}}{{{'l' * (rows is not None) + 'c' * n_columns}}}",
+            r"\toprule",
+            " & ".join(header) + r" \\",
+            r"\midrule",
+            *[" & ".join(line) + r" \\" for line in lines],
+            r"\bottomrule",
+            r"\end{tabular}",
+        ]
+    elif fmt == "markdown":
+        table = [
+            "| " + " | ".join(header) + " |",
+            "|" + "---|" * len(header),
+            *["| " + " | ".join(line) + " |" for line in lines],
+        ]
+    else:
+        raise ValueError('fmt must be "latex" or "markdown".')
+    return "\n".join(table)
+
+
+def savefig(
+    nb_name: str, fig_name: str, fig: Figure, tight=True, svg=False, background=True
+):
 
     SAVEFIG_DIR = os.path.join(FIGDIR, nb_name)
 
@@ -58,113 +231,100 @@ def savefig(nb_name: str, fig_name: str, fig: Figure, tight=True, svg=False):
     if not os.path.exists(SAVEFIG_DIR):
         os.mkdir(SAVEFIG_DIR)
 
-    if tight:
-        fig.savefig(FIGPATH, dpi=300, bbox_inches="tight")
+    if background:
+        EXPORTER.submit(FIGPATH, fig, tight)
     else:
-        fig.savefig(FIGPATH, dpi=300)
-
-
-def gaas_index(lam: float, x: float, T: float) -> float:
-    lam = lam / 1000
-
-    E = 1.0 / lam
-
-    # Gehrsitz et al., Eq. (11) and below Eq. (11):
-    E_Gamma_0 = 1.5192 / 1.239856  # OK
-    E_Deb = 15.9e-3 / 1.239856  # OK
-    E_TO = 33.6e-3 / 1.239856  # OK
-    S = 1.8  # OK
-    S_TO = 1.1  # OK
-    kB = 0.0861708e-3 / 1.239856  # OK
-    E_Gamma_GaAs = (
-        E_Gamma_0
-        + S * E_Deb * (1 - 1 / np.tanh(E_Deb / (2 * kB * T)))
-        + S_TO * E_TO * (1 - 1 / np.tanh(E_TO / (2 * kB * T)))
-    )  # OK, but cot rather than coth in original code!!!!!!!!
-
-    # Gehrsitz et al., Table II, GaAs Fit 2 (Have not tried with Fit1...):
-    a0 = 5.9613  # OK
-    a1 = 7.178 * 1e-4  # OK
-    a2 = -0.953 * 1e-6  # OK
-    e0 = 4.7171  # OK
-    e1 = -3.237 * 1e-4  # OK
-    e2 = -1.358 * 1e-6  # OK
-
-    # Gehrsitz et al., Page 7830, column 1:
-    A0 = a0 + a1 * T + a2 * T**2  # OK
-    E120 = e0 + e1 * T + e2 * T**2  # OK
-
-    # Gehrsitz et al., Table IV:
-    A = (
-        A0 - 16.159 * x + 43.511 * x**2 - 71.317 * x**3 + 57.535 * x**4 - 17.451 * x**5
-    )  # OK
-    C1 = 21.5647 + 113.74 * x - 122.5 * x**2 + 108.401 * x**3 - 47.318 * x**4  # OK
-    E12 = E120 + 11.006 * x - 3.08 * x**2  # OK
-    invC0 = (
-        50.535 - 150.7 * x - 62.209 * x**2 + 797.16 * x**3 - 1125 * x**4 + 503.79 * x**5
-    )  # OK but sign ERROR in original code
-    E0 = E_Gamma_GaAs + 1.1308 * x + 0.1436 * x**2  # OK
-    # E0 = E_Gamma_GaAs + 1.136*x + 0.22*x**2#Also OK? Eq. (14).
-    C0 = 1 / invC0
-
-    C2_GaAs = 1.55 * 1e-3  # OK
-    C2_AlAs = 2.61 * 1e-3  # OK
-    E22_GaAs = 0.724 * 1e-3  # OK
-    E22_AlAs = 1.331 * 1e-3  # OK
-    E22 = E22_GaAs  # OK
-    C2 = C2_GaAs  # OK
-
-    E32 = E22_AlAs  # OK
-    C3 = C2_AlAs  # OK
-    R = (1 - x) * C2 / (E22 - E**2) + x * C3 / (E32 - E**2)  # OK
-    eps = A + C0 / (E0**2 - E**2) + C1 / (E12 - E**2) + R  # OK
-    n = np.sqrt(eps)  # OK
-    return n
-
-
-# Here, k is the "kind" of the airy function
-def airy(k: int, z: float) -> float:
-    if not isinstance(k, int) or k not in [0, 1, 2, 3]:
-        raise ValueError("k must be an integer between 0 and 3.")
-    else:
-        return special.airy(z)[k]
+        EXPORTER.save(FIGPATH, fig, tight)
 
 
-def FK_absorption(lam: float, x: float, T: float, F: float) -> float:
-    n = gaas_index(lam, x, T)  # GaAs refractive index (constant)
-    mh1 = 0.087  # Light-hole effective mass
-    mh2 = 0.45  # Heavy-hole effective mass
-    mu1 = 0.0377
-    mu2 = 0.0579
-    fkcoeff = 0.58  # Experimental coefficient
+class SolutionCache:
+    """Fixed-size cache of self-consistent solutions keyed by operating point
+    (power, V_app, lam), used to warm start the FK solvers.
 
-    Eg = 1.519 - 5.405e-4 * T**2 / (T + 204)  # Temperature-dependent gap
-    Eph = 1239.84 / lam
+    The cached values are only starting guesses: they are not keyed on the
+    model parameters, and solve_FK_alpha converges to the same root to within
+    its tolerance whatever the guess, so model outputs do not depend on which
+    points were evaluated before.
 
-    beta1 = 1.1e5 * (Eg - Eph) * (2 * mu1) ** (1 / 3) * F ** (-2 / 3)
-    beta2 = 1.1e5 * (Eg - Eph) * (2 * mu2) ** (1 / 3) * F ** (-2 / 3)
+    Keys and values live in preallocated arrays, once full the oldest entries
+    are overwritten, so memory stays constant however many model calls a fit
+    campaign makes. Storing an operating point that is already cached updates
+    it in place. Lookups return the solution at the same operating point if
+    cached, otherwise that of the nearest cached point, with distances
+    measured relative to the spread of the cached keys.
+    """
 
-    a1 = (
-        (1 + 1 / mh1)
-        * (2 * mu1) ** (4 / 3)
-        * (np.abs(airy(1, beta1)) ** 2 - beta1 * np.abs(airy(0, beta1)) ** 2)
-    )
-    a2 = (
-        (1 + 1 / mh2)
-        * (2 * mu2) ** (4 / 3)
-        * (np.abs(airy(1, beta2)) ** 2 - beta2 * np.abs(airy(0, beta2)) ** 2)
-    )
+    def __init__(self, capacity: int = 4096) -> None:
+        self.capacity = capacity
+        self.keys = np.empty((capacity, 3))
+        self.values = np.empty(capacity)
+        self.size = 0
+        self._next = 0
+        self._slots: dict[tuple[float, float, float], int] = {}
+
+    def __len__(self) -> int:
+        return self.size
 
-    FKa = (a1 + a2) * F ** (1 / 3) * 1e4 / n
-    alpha = fkcoeff * FKa
-    return alpha
+    def clear(self) -> None:
+        self.size = 0
+        self._next = 0
+        self._slots = {}
 
+    @staticmethod
+    def _keys(*arrays: float | np.ndarray) -> tuple[np.ndarray, tuple[int, ...]]:
+        arrays = np.broadcast_arrays(*[np.asarray(arr, dtype=float) for arr in arrays])
+        return np.stack([arr.ravel() for arr in arrays], axis=-1), arrays[0].shape
+
+    def store(
+        self,
+        power: float | np.ndarray,
+        V_app: float | np.ndarray,
+        lam: float | np.ndarray,
+        alpha: float | np.ndarray,
+    ) -> None:
+        keys, shape = self._keys(power, V_app, lam)
+        alpha = np.broadcast_to(np.asarray(alpha, dtype=float), shape).ravel()
+        for key, value in zip(map(tuple, keys.tolist()), alpha.tolist()):
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._next
+                if self.size == self.capacity:
+                    # Evict the oldest entry
+                    del self._slots[tuple(self.keys[slot].tolist())]
+                else:
+                    self.size += 1
+                self._next = (self._next + 1) % self.capacity
+                self.keys[slot] = key
+                self._slots[key] = slot
+            self.values[slot] = value
+
+    def nearest(
+        self,
+        power: float | np.ndarray,
+        V_app: float | np.ndarray,
+        lam: float | np.ndarray,
+    ) -> np.ndarray | None:
+        """Cached solution at the nearest operating point, broadcast to the
+        shape of the inputs, or None if the cache is empty."""
+        if self.size == 0:
+            return None
+        query, shape = self._keys(power, V_app, lam)
+        slots = np.array(
+            [self._slots.get(key, -1) for key in map(tuple, query.tolist())], dtype=int
+        )
 
-def FK_fit(lam: float, x: float, T: float, V_d: float) -> float:
-    # We do things in nanometers first then convert to centimeters
-    # to avoid floating point issues. 795.5 is in units nm²/V
-    depletion_width = 1e-7 * np.sqrt(1e4 + 795.5 * (1.4 - V_d))
-    return FK_absorption(lam, x, T, -(V_d - 1.4) / depletion_width)
+        missing = np.flatnonzero(slots < 0)
+        if missing.size:
+            keys = self.keys[: self.size]
+            scale = np.ptp(keys, axis=0)
+            scale[scale == 0] = 1.0
+            # Chunked so the distance matrix stays small for large queries
+            chunk = max(1, (1 << 20) // self.size)
+            for start in range(0, missing.size, chunk):
+                idx = missing[start : start + chunk]
+                diff = (query[idx, None, :] - keys[None]) / scale
+                slots[idx] = np.argmin(np.einsum("ijk,ijk->ij", diff, diff), axis=1)
+        return self.values[slots].reshape(shape)
 
 
 class FKFit:
@@ -177,6 +337,10 @@ class FKFit:
         x: float,
         T: float,
         V_app: float,
+        absorption: Callable = FK_fit,
+        absorption_grad: Callable = FK_fit_grad,
+        cache_size: int = 4096,
+        continuation: bool = False,
     ) -> None:
         self.P_in = P_in
         self.R = R
@@ -185,7 +349,12 @@ class FKFit:
         self.x = x
         self.T = T
         self.V_app = V_app
-        self.alphas = []
+        self.absorption = absorption
+        self.absorption_grad = absorption_grad
+        self.alphas = SolutionCache(cache_size)
+        # Follow every (lam, V_app, R) slice through increasing power, so in
+        # bistable regions the model keeps the branch of a power sweep
+        self.continuation = continuation
 
     def FK_fit_power_unscaled(
         self,
@@ -197,35 +366,11 @@ class FKFit:
         gamma: float,
         alpha_0: float,
     ) -> float:
-        # func = (
-        #     lambda alpha: FK_fit(
-        #         lam,
-        #         self.x,
-        #         self.T,
-        #         V_app + power * eta * R * (1 - np.exp(-alpha * self.L)),
-        #     )
-        #     + alpha_0
-        #     - alpha
-        # )
-
-        func = (
-            lambda alpha: FK_fit(
-                lam,
-                self.x,
-                self.T,
-                # Responsivity = eta * lam(mu m) / 1.24
-                V_app
-                + power * eta / 1.24 * (lam / 1000) * R
-                * (1 - np.exp(-(gamma * alpha + alpha_0) * self.L)),
-            )
-            - alpha
+        # Scalar version of FK_fit_power_unscaled_array, through the same
+        # bracketed solver so the result does not depend on earlier calls
+        P_out = self.FK_fit_power_unscaled_array(
+            power, lam, V_app, R, eta, gamma, alpha_0
         )
-        if len(self.alphas) == 0:
-            alpha = fsolve(func, 1000)[0]
-        else:
-            alpha = fsolve(func, self.alphas[-1])[0]
-        self.alphas.append(alpha)
-        P_out = power * np.exp(-self.L * (gamma * alpha + alpha_0))
         return float(P_out)
 
     def FK_fit_current(
@@ -238,34 +383,8 @@ class FKFit:
         gamma: float,
         alpha_0: float,
     ) -> float:
-        # func = (
-        #     lambda alpha: FK_fit(
-        #         lam,
-        #         self.x,
-        #         self.T,
-        #         V_app + power * eta * R * (1 - np.exp(-alpha * self.L)),
-        #     )
-        #     + alpha_0
-        #     - alpha
-        # )
         # L_n = #2.5e-4 #0.01477
-        func = (
-            lambda alpha: FK_fit(
-                lam,
-                self.x,
-                self.T,
-                # Responsivity = eta * lam(mu m) / 1.24
-                V_app
-                + power * eta / 1.24 * (lam / 1000) * R * (1 - np.exp(-self.L * (gamma * alpha + alpha_0))),
-                # + power * eta / 1.24 * (lam / 1000) * R * (1 - np.exp(-self.L * (gamma * alpha + alpha_0)) / (1 + L_n * (gamma * alpha + alpha_0))),
-            )
-            - alpha
-        )
-        if len(self.alphas) == 0:
-            alpha = fsolve(func, 1000)[0]
-        else:
-            alpha = fsolve(func, self.alphas[-1])[0]
-        self.alphas.append(alpha)
+        alpha = self.FK_fit_alpha_array(power, lam, V_app, R, eta, gamma, alpha_0)
         current = (
             power
             * eta
@@ -276,19 +395,157 @@ class FKFit:
         )
         return float(current)
 
-    def FK_fit_current_array(
-        self, power: np.ndarray, eta: float, gamma: float, alpha_0: float
-    ) -> float:
-        current = np.array(
+    def FK_fit_alpha_array(
+        self,
+        power: np.ndarray,
+        lam: float | np.ndarray,
+        V_app: float | np.ndarray,
+        R: float | np.ndarray,
+        eta: float,
+        gamma: float,
+        alpha_0: float,
+    ) -> np.ndarray:
+        if self.continuation:
+            return solve_FK_alpha_continuation(
+                power,
+                lam,
+                V_app,
+                R,
+                eta,
+                gamma,
+                alpha_0,
+                self.L,
+                self.x,
+                self.T,
+                absorption=self.absorption,
+            )
+        alphas = solve_FK_alpha(
+            power,
+            lam,
+            V_app,
+            R,
+            eta,
+            gamma,
+            alpha_0,
+            self.L,
+            self.x,
+            self.T,
+            alpha_init=self.alphas.nearest(power, V_app, lam),
+            absorption=self.absorption,
+        )
+        self.alphas.store(power, V_app, lam, alphas)
+        return alphas
+
+    def FK_fit_power_unscaled_array(
+        self,
+        power: np.ndarray,
+        lam: float | np.ndarray,
+        V_app: float | np.ndarray,
+        R: float | np.ndarray,
+        eta: float,
+        gamma: float,
+        alpha_0: float,
+    ) -> np.ndarray:
+        alphas = self.FK_fit_alpha_array(power, lam, V_app, R, eta, gamma, alpha_0)
+        return power * np.exp(-self.L * (gamma * alphas + alpha_0))
+
+    def FK_fit_alpha_array_grad(
+        self,
+        power: np.ndarray,
+        lam: float | np.ndarray,
+        V_app: float | np.ndarray,
+        R: float | np.ndarray,
+        eta: float,
+        gamma: float,
+        alpha_0: float,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # Implicit differentiation of alpha = A(V(alpha, eta, gamma, alpha_0)).
+        # Returns the alphas and d alpha / d(eta, gamma, alpha_0), shape (3, N).
+        alphas = self.FK_fit_alpha_array(power, lam, V_app, R, eta, gamma, alpha_0)
+        resp_R = power / 1.24 * (lam / 1000) * R
+        absorbed = np.exp(-self.L * (gamma * alphas + alpha_0))
+        V_d = V_app + eta * resp_R * (1 - absorbed)
+        # Past the built-in voltage the solver clips to zero field, where
+        # the absorption no longer depends on the voltage
+        forward = V_d >= 1.4 - 1e-6
+        dA_dV = np.where(
+            forward,
+            0.0,
+            self.absorption_grad(lam, self.x, self.T, np.minimum(V_d, 1.4 - 1e-6)),
+        )
+        dV = np.array(
             [
-                self.FK_fit_current(
-                    pow1, self.lam, self.V_app, self.R, eta, gamma, alpha_0
-                )
-                for pow1 in power
+                resp_R * (1 - absorbed),
+                eta * resp_R * self.L * alphas * absorbed,
+                eta * resp_R * self.L * absorbed,
             ]
         )
+        dalphas = dA_dV * dV / (1 - dA_dV * eta * resp_R * self.L * gamma * absorbed)
+        return alphas, dalphas
+
+    def _FK_fit_power_unscaled_and_grad(
+        self,
+        power: np.ndarray,
+        lam: float | np.ndarray,
+        V_app: float | np.ndarray,
+        R: float | np.ndarray,
+        eta: float,
+        gamma: float,
+        alpha_0: float,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        alphas, dalphas = self.FK_fit_alpha_array_grad(
+            power, lam, V_app, R, eta, gamma, alpha_0
+        )
+        P_out = power * np.exp(-self.L * (gamma * alphas + alpha_0))
+        dexponent = gamma * dalphas + np.array(
+            [np.zeros_like(alphas), alphas, np.ones_like(alphas)]
+        )
+        return P_out, -self.L * P_out * dexponent
+
+    def FK_fit_power_unscaled_array_grad(
+        self,
+        power: np.ndarray,
+        lam: float | np.ndarray,
+        V_app: float | np.ndarray,
+        R: float | np.ndarray,
+        eta: float,
+        gamma: float,
+        alpha_0: float,
+    ) -> np.ndarray:
+        return self._FK_fit_power_unscaled_and_grad(
+            power, lam, V_app, R, eta, gamma, alpha_0
+        )[1]
+
+    def FK_fit_current_array(
+        self, power: np.ndarray, eta: float, gamma: float, alpha_0: float
+    ) -> np.ndarray:
+        alphas = self.FK_fit_alpha_array(
+            power, self.lam, self.V_app, self.R, eta, gamma, alpha_0
+        )
+        current = (
+            power
+            * eta
+            / 1.24
+            * (self.lam / 1000)
+            * (1 - np.exp(-self.L * (gamma * alphas + alpha_0)))
+        )
         return current
 
+    def FK_fit_current_array_grad(
+        self, power: np.ndarray, eta: float, gamma: float, alpha_0: float
+    ) -> np.ndarray:
+        alphas, dalphas = self.FK_fit_alpha_array_grad(
+            power, self.lam, self.V_app, self.R, eta, gamma, alpha_0
+        )
+        resp = power / 1.24 * (self.lam / 1000)
+        absorbed = np.exp(-self.L * (gamma * alphas + alpha_0))
+        dexponent = gamma * dalphas + np.array(
+            [np.zeros_like(alphas), alphas, np.ones_like(alphas)]
+        )
+        grad = eta * resp * self.L * absorbed * dexponent
+        grad[0] += resp * (1 - absorbed)
+        return grad
+
     # def FK_fit_power_unscaled(
     #     self,
     #     power: float,
@@ -325,40 +582,54 @@ class FKFit:
     def FK_fit_power_scaled(
         self, power: np.ndarray, eta: float, norm: float
     ) -> np.ndarray:
-        P_out = np.array(
-            [
-                self.FK_fit_power_unscaled(pow1, self.lam, self.V_app, self.R, eta, 0.44, 23.5)
-                for pow1 in power
-            ]
+        P_out = self.FK_fit_power_unscaled_array(
+            power, self.lam, self.V_app, self.R, eta, 0.44, 23.5
         )
         return norm * P_out
 
+    def FK_fit_power_scaled_grad(
+        self, power: np.ndarray, eta: float, norm: float
+    ) -> np.ndarray:
+        P_out, dP_out = self._FK_fit_power_unscaled_and_grad(
+            power, self.lam, self.V_app, self.R, eta, 0.44, 23.5
+        )
+        return np.array([norm * dP_out[0], P_out])
+
     def FK_fit_voltage_scaled(
         self, voltage: np.ndarray, eta: float, alpha_0: float
-    ) -> float:
-        P_out = np.array(
-            [
-                self.FK_fit_power_unscaled(
-                    self.P_in, self.lam, vol, self.R, eta, alpha_0
-                )
-                for vol in voltage
-            ]
+    ) -> np.ndarray:
+        P_out = self.FK_fit_power_unscaled_array(
+            self.P_in, self.lam, voltage, self.R, eta, 0.44, alpha_0
         )
         return P_out / np.max(P_out)
 
+    def FK_fit_voltage_scaled_grad(
+        self, voltage: np.ndarray, eta: float, alpha_0: float
+    ) -> np.ndarray:
+        P_out, dP_out = self._FK_fit_power_unscaled_and_grad(
+            self.P_in, self.lam, voltage, self.R, eta, 0.44, alpha_0
+        )
+        dP_out = dP_out[[0, 2]]
+        idx_max = np.argmax(P_out)
+        P_max = P_out[idx_max]
+        return dP_out / P_max - P_out * dP_out[:, [idx_max]] / P_max**2
+
     def FK_fit_wavelength_scaled(
         self, wavelength: np.ndarray, eta: float, norm: float
-    ) -> float:
-        P_out = np.array(
-            [
-                self.FK_fit_power_unscaled(
-                    self.P_in, wl, self.V_app, self.R, eta, 0.44, 23.5
-                )
-                for wl in wavelength
-            ]
+    ) -> np.ndarray:
+        P_out = self.FK_fit_power_unscaled_array(
+            self.P_in, wavelength, self.V_app, self.R, eta, 0.44, 23.5
         )
         return norm * P_out
 
+    def FK_fit_wavelength_scaled_grad(
+        self, wavelength: np.ndarray, eta: float, norm: float
+    ) -> np.ndarray:
+        P_out, dP_out = self._FK_fit_power_unscaled_and_grad(
+            self.P_in, wavelength, self.V_app, self.R, eta, 0.44, 23.5
+        )
+        return np.array([norm * dP_out[0], P_out])
+
 
 @dataclass
 class FitInput:
@@ -367,16 +638,366 @@ class FitInput:
     yerror: np.ndarray | None
     fit_func: Callable
     initial_guesses: list[float]
+    # Gradient of fit_func w.r.t. its parameters, shape (n_parameters, n_points)
+    fit_grad: Callable | None = None
 
 
-@dataclass
+def propagate_errors(
+    func: Callable,
+    parameters: np.ndarray,
+    covariance: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Linear error propagation of a derived quantity for many fits at once.
+
+    The Jacobian is taken by central differences, with one vectorized call of
+    func per parameter and direction (steps scaled to the parameter errors),
+    and contracted with every covariance matrix in one go.
+
+    Args:
+        func: Derived quantity, called as func(*columns) with one array of
+            shape (n_fits,) per parameter, returning shape (n_fits, ...),
+            e.g. lambda g, b: g / 3.5e-3.
+        parameters: Fit parameters, shape (n_fits, n_parameters).
+        covariance: Covariance matrices, shape (n_fits, n_parameters,
+            n_parameters).
+
+    Return:
+        values: func at the fitted parameters.
+        errors: Propagated standard errors, same shape as values.
+    """
+    parameters = np.asarray(parameters, dtype=float)
+    covariance = np.asarray(covariance, dtype=float)
+    values = np.asarray(func(*parameters.T), dtype=float)
+
+    errors = np.sqrt(np.diagonal(covariance, axis1=-2, axis2=-1))
+    steps = np.where(
+        np.isfinite(errors) & (errors > 0),
+        np.maximum(1e-4 * errors, 1e-8 * np.abs(parameters)),
+        1e-6 * np.abs(parameters),
+    )
+    steps[steps == 0] = 1e-8
+
+    jacobian = np.empty(values.shape + (parameters.shape[1],))
+    for j in range(parameters.shape[1]):
+        shifted = parameters.copy()
+        shifted[:, j] += steps[:, j]
+        upper = np.asarray(func(*shifted.T), dtype=float)
+        shifted[:, j] -= 2 * steps[:, j]
+        lower = np.asarray(func(*shifted.T), dtype=float)
+        step = steps[:, j].reshape((-1,) + (1,) * (values.ndim - 1))
+        jacobian[..., j] = (upper - lower) / (2 * step)
+
+    # Variance J C J^T for every fit (and every output of func)
+    n_out = int(np.prod(values.shape[1:]))
+    flat_jacobian = jacobian.reshape(len(parameters), n_out, -1)
+    variance = np.einsum("noi,nij,noj->no", flat_jacobian, covariance, flat_jacobian)
+    return values, np.sqrt(variance).reshape(values.shape)
+
+
+@dataclass(slots=True)
 class FitResult:
-    parameters: list[float]
-    parameter_errors: list[float]
+    """Result of a single fit. Fits done in batches are collected in a
+    FitResultTable, whose rows are returned as FitResults."""
+
+    parameters: list[float] | np.ndarray
+    parameter_errors: list[float] | np.ndarray
     chi2: float | None
     ndof: float | None
     p_value: float | None
     success: bool
+    covariance: np.ndarray | None = None
+
+    def propagate(self, func: Callable) -> tuple[float, float]:
+        """Value and linearly propagated error of func(*parameters), see
+        propagate_errors. Without a covariance matrix the parameters are
+        treated as uncorrelated."""
+        covariance = self.covariance
+        if covariance is None:
+            covariance = np.diag(np.asarray(self.parameter_errors, dtype=float) ** 2)
+        values, errors = propagate_errors(
+            func, np.array([self.parameters], dtype=float), np.asarray(covariance)[None]
+        )
+        return values[0], errors[0]
+
+
+@dataclass
+class FitResultTable:
+    """Results of many fits as contiguous arrays, one row per fit.
+
+    Columns are plain arrays (e.g. table.parameters[:, -1] or table.chi2),
+    indexing with an int gives the FitResult of that row (its arrays are
+    views into the table), indexing with a slice, index array or boolean mask
+    gives a sub-table, e.g. table[table.success]. Missing chi2, ndof or
+    p_value are NaN in the table and None in a FitResult.
+
+    With covariance matrices, errors on derived quantities are propagated for
+    all fits at once, e.g. table.propagate(lambda g, b: g / 3.5e-3).
+    """
+
+    parameters: np.ndarray  # (n_fits, n_parameters)
+    parameter_errors: np.ndarray  # (n_fits, n_parameters)
+    chi2: np.ndarray
+    ndof: np.ndarray
+    p_value: np.ndarray
+    success: np.ndarray
+    covariance: np.ndarray | None = None  # (n_fits, n_parameters, n_parameters)
+    parameter_names: list[str] | None = None
+
+    @classmethod
+    def from_results(
+        cls, fit_results: list[FitResult], parameter_names: list[str] | None = None
+    ) -> "FitResultTable":
+        # Fits with fewer parameters are padded with NaN
+        n_par = max((len(result.parameters) for result in fit_results), default=0)
+
+        def padded(rows: list[np.ndarray]) -> np.ndarray:
+            array = np.full((len(rows), n_par), np.nan)
+            for idx, row in enumerate(rows):
+                array[idx, : len(row)] = row
+            return array
+
+        def optional(values: list[float | None]) -> np.ndarray:
+            return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+        covariance = None
+        if any(result.covariance is not None for result in fit_results):
+            covariance = np.full((len(fit_results), n_par, n_par), np.nan)
+            for idx, result in enumerate(fit_results):
+                if result.covariance is not None:
+                    n = len(result.covariance)
+                    covariance[idx, :n, :n] = result.covariance
+
+        return cls(
+            padded([result.parameters for result in fit_results]),
+            padded([result.parameter_errors for result in fit_results]),
+            optional([result.chi2 for result in fit_results]),
+            optional([result.ndof for result in fit_results]),
+            optional([result.p_value for result in fit_results]),
+            np.array([result.success for result in fit_results], dtype=bool),
+            covariance,
+            parameter_names,
+        )
+
+    def __len__(self) -> int:
+        return len(self.chi2)
+
+    def _row(self, row: int) -> FitResult:
+        def optional(value: float) -> float | None:
+            return None if np.isnan(value) else float(value)
+
+        ndof = optional(self.ndof[row])
+        return FitResult(
+            self.parameters[row],
+            self.parameter_errors[row],
+            optional(self.chi2[row]),
+            None if ndof is None else int(ndof),
+            optional(self.p_value[row]),
+            bool(self.success[row]),
+            None if self.covariance is None else self.covariance[row],
+        )
+
+    def __iter__(self) -> Iterator[FitResult]:
+        return (self._row(row) for row in range(len(self)))
+
+    def __getitem__(
+        self, idx: int | slice | np.ndarray
+    ) -> "FitResult | FitResultTable":
+        if isinstance(idx, (int, np.integer)):
+            return self._row(range(len(self))[idx])
+        return FitResultTable(
+            self.parameters[idx],
+            self.parameter_errors[idx],
+            self.chi2[idx],
+            self.ndof[idx],
+            self.p_value[idx],
+            self.success[idx],
+            None if self.covariance is None else self.covariance[idx],
+            self.parameter_names,
+        )
+
+    def _column(self, name: str) -> int:
+        if self.parameter_names is None:
+            raise ValueError("The table has no parameter names.")
+        return self.parameter_names.index(name)
+
+    def get(self, name: str) -> np.ndarray:
+        return self.parameters[:, self._column(name)]
+
+    def get_error(self, name: str) -> np.ndarray:
+        return self.parameter_errors[:, self._column(name)]
+
+    def propagate(self, func: Callable) -> tuple[np.ndarray, np.ndarray]:
+        """Values and linearly propagated errors of func for every fit, see
+        propagate_errors. Without covariance matrices the parameters are
+        treated as uncorrelated."""
+        covariance = self.covariance
+        if covariance is None:
+            covariance = np.einsum(
+                "ni,ij->nij",
+                self.parameter_errors**2,
+                np.eye(self.parameters.shape[1]),
+            )
+        return propagate_errors(func, self.parameters, covariance)
+
+    def save(self, path: str) -> None:
+        arrays = {
+            "parameters": self.parameters,
+            "parameter_errors": self.parameter_errors,
+            "chi2": self.chi2,
+            "ndof": self.ndof,
+            "p_value": self.p_value,
+            "success": self.success,
+        }
+        if self.covariance is not None:
+            arrays["covariance"] = self.covariance
+        if self.parameter_names is not None:
+            arrays["parameter_names"] = np.array(self.parameter_names, dtype=str)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "FitResultTable":
+        with np.load(path) as data:
+            names = data["parameter_names"].tolist() if "parameter_names" in data else None
+            return cls(
+                data["parameters"],
+                data["parameter_errors"],
+                data["chi2"],
+                data["ndof"],
+                data["p_value"],
+                data["success"],
+                data["covariance"] if "covariance" in data else None,
+                names,
+            )
+
+
+@dataclass
+class GlobalFitInput:
+    # ydata has shape (*slice_shape, n_points), xdata broadcasts against it.
+    # Parameters named in per_slice get one value per slice and are passed to
+    # fit_func with shape (*slice_shape, 1), the others are shared.
+    xdata: np.ndarray
+    ydata: np.ndarray
+    yerror: np.ndarray | float
+    fit_func: Callable
+    initial_guesses: list[float | np.ndarray]
+    per_slice: list[str]
+
+
+@dataclass(slots=True)
+class GlobalFitResult(FitResult):
+    # The covariance includes the correlations between slices. Parameters
+    # in per_slice are named f"{name}_{i}" for the flattened slice index i.
+    parameter_names: list[str] = field(default_factory=list)
+    slice_shape: tuple[int, ...] = ()
+
+    def _indices(self, name: str) -> list[int]:
+        if name in self.parameter_names:
+            return [self.parameter_names.index(name)]
+        n_slices = int(np.prod(self.slice_shape))
+        return [self.parameter_names.index(f"{name}_{i}") for i in range(n_slices)]
+
+    def get(self, name: str) -> float | np.ndarray:
+        values = np.array(self.parameters)[self._indices(name)]
+        if name in self.parameter_names:
+            return float(values[0])
+        return values.reshape(self.slice_shape)
+
+    def get_error(self, name: str) -> float | np.ndarray:
+        errors = np.array(self.parameter_errors)[self._indices(name)]
+        if name in self.parameter_names:
+            return float(errors[0])
+        return errors.reshape(self.slice_shape)
+
+
+# Weak keys, so that caching does not keep closures (and the data they
+# capture) alive
+_N_FIT_PARAMETERS = weakref.WeakKeyDictionary()
+
+
+def _n_fit_parameters(fit_func: Callable) -> int:
+    # Introspection once per fit function rather than once per fit. Bound
+    # methods (e.g. FKFit.model) are recreated on every attribute access, so
+    # they are cached by their function, which has one more parameter (self).
+    func = getattr(fit_func, "__func__", fit_func)
+    n_bound = 1 if func is not fit_func else 0
+    try:
+        return _N_FIT_PARAMETERS[func] - n_bound
+    except (KeyError, TypeError):
+        pass
+    n_parameters = len(inspect.signature(fit_func).parameters) - 1
+    try:
+        _N_FIT_PARAMETERS[func] = n_parameters + n_bound
+    except TypeError:
+        # Not weakly referenceable, e.g. builtins
+        pass
+    return n_parameters
+
+
+def _fit_data(
+    fit_input: FitInput, outlier: int | list[int] | None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray | float | None]:
+    # xdata, ydata and yerror without the outliers. A scalar yerror stays a
+    # scalar, an array is broadcast to ydata before removing them.
+    xdata = np.asarray(fit_input.xdata)
+    ydata = np.asarray(fit_input.ydata)
+    yerror = fit_input.yerror
+    if not outlier:
+        return xdata, ydata, yerror
+    if np.ndim(yerror) > 0:
+        yerror = np.delete(np.broadcast_to(yerror, ydata.shape), outlier)
+    return np.delete(xdata, outlier), np.delete(ydata, outlier), yerror
+
+
+def _least_squares_minuit(
+    fit_input: FitInput,
+    bounds: None | dict[str, tuple[float, float] | None],
+    outlier: int | list[int] | None,
+    softloss: bool,
+) -> Minuit:
+    if len(fit_input.initial_guesses) != _n_fit_parameters(fit_input.fit_func):
+        raise ValueError("Initial guesses must match # of fit function arguments.")
+    xdata, ydata, yerror = _fit_data(fit_input, outlier)
+
+    loss = "soft_l1" if softloss else "linear"
+    lstsq = LeastSquares(
+        xdata, ydata, yerror, fit_input.fit_func, loss=loss, grad=fit_input.fit_grad
+    )
+    minuit_obj = Minuit(
+        lstsq,
+        *fit_input.initial_guesses,
+        grad=True if fit_input.fit_grad is not None else None,
+    )
+
+    if bounds:
+        for name, bound in bounds.items():
+            minuit_obj.limits[name] = bound
+    return minuit_obj
+
+
+def _minuit_fit_result(
+    minuit_obj: Minuit, ndof: int | None = None, goodness_of_fit: bool = True
+) -> FitResult:
+    # ndof defaults to the one of the cost function. Without goodness_of_fit
+    # (unbinned likelihoods) chi2, ndof and p_value are None.
+    if goodness_of_fit:
+        chi2_val = minuit_obj.fval
+        ndof = minuit_obj.ndof if ndof is None else ndof
+        p_val = chi2.sf(chi2_val, ndof)
+    else:
+        chi2_val = ndof = p_val = None
+    success = minuit_obj.accurate and minuit_obj.valid
+
+    parameter_values = minuit_obj.values[:]
+    parameter_errors = minuit_obj.errors[:]
+    # Fixed parameters get zero rows and columns, NaN if HESSE failed
+    if minuit_obj.covariance is None:
+        covariance = np.full((len(parameter_values),) * 2, np.nan)
+    else:
+        covariance = np.array(minuit_obj.covariance)
+
+    return FitResult(
+        parameter_values, parameter_errors, chi2_val, ndof, p_val, success, covariance
+    )
 
 
 def perform_fit(
@@ -385,25 +1006,285 @@ def perform_fit(
     outlier: int | list[int] | None = None,
     softloss=False,
 ):
-    if (
-        len(fit_input.initial_guesses)
-        != len(inspect.signature(fit_input.fit_func).parameters) - 1
-    ):
+    minuit_obj = _least_squares_minuit(fit_input, bounds, outlier, softloss)
+    minuit_obj.migrad()
+    minuit_obj.hesse()
+    return _minuit_fit_result(minuit_obj)
+
+
+class FitSession:
+    """Least-squares fits of one model to many datasets of the same shape,
+    e.g. all (wavelength, voltage) columns of a sweep.
+
+    The LeastSquares cost and the Minuit object are built once. Every fit
+    swaps the new ydata (and yerror) into the cost in place and minimizes
+    from the previous optimum, or from the initial guesses if the previous
+    fit failed.
+    """
+
+    def __init__(
+        self,
+        fit_input: FitInput,
+        bounds: None | dict[str, tuple[float, float] | None] = None,
+        softloss=False,
+    ) -> None:
+        if len(fit_input.initial_guesses) != _n_fit_parameters(fit_input.fit_func):
+            raise ValueError("Initial guesses must match # of fit function arguments.")
+        # fit_input.ydata only sets the shape, the data is given to fit()
+        self.shape = np.shape(fit_input.ydata)
+        loss = "soft_l1" if softloss else "linear"
+        self.cost = LeastSquares(
+            fit_input.xdata,
+            fit_input.ydata,
+            fit_input.yerror,
+            fit_input.fit_func,
+            loss=loss,
+            grad=fit_input.fit_grad,
+        )
+        self.minuit_obj = Minuit(
+            self.cost,
+            *fit_input.initial_guesses,
+            grad=True if fit_input.fit_grad is not None else None,
+        )
+        if bounds:
+            for name, bound in bounds.items():
+                self.minuit_obj.limits[name] = bound
+
+    def fit(
+        self,
+        ydata: np.ndarray,
+        yerror: np.ndarray | None = None,
+        hesse=True,
+    ) -> FitResult:
+        if np.shape(ydata) != self.shape:
+            raise ValueError(f"ydata must have shape {self.shape}.")
+        self.cost.y = ydata
+        if yerror is not None:
+            self.cost.yerror = yerror
+        if not self.minuit_obj.valid:
+            self.minuit_obj.reset()
+        self.minuit_obj.migrad()
+        if hesse:
+            self.minuit_obj.hesse()
+        return _minuit_fit_result(self.minuit_obj)
+
+    def fit_all(
+        self,
+        ydata: np.ndarray,
+        yerror: np.ndarray | None = None,
+        hesse=True,
+    ) -> FitResultTable:
+        """Fit every dataset along the leading axes of ydata (and yerror),
+        shape (..., *shape), in order, each starting from the last optimum.
+
+        Return:
+            fit_results: One row per dataset, in C order of the leading axes.
+        """
+        ydata = np.asarray(ydata)
+        if ydata.shape[ydata.ndim - len(self.shape) :] != self.shape:
+            raise ValueError(f"ydata must end with shape {self.shape}.")
+        if yerror is not None:
+            yerror = np.broadcast_to(yerror, ydata.shape)
+            yerror = yerror.reshape((-1,) + self.shape)
+        ydata = ydata.reshape((-1,) + self.shape)
+        if yerror is None:
+            yerror = [None] * len(ydata)
+        return FitResultTable.from_results(
+            [self.fit(y, err, hesse) for y, err in zip(ydata, yerror)]
+        )
+
+
+def _linear_model(x: np.ndarray, slope: float, intercept: float) -> np.ndarray:
+    return slope * x + intercept
+
+
+def _linear_grad(x: np.ndarray, slope: float, intercept: float) -> np.ndarray:
+    return np.array([x, np.ones_like(x)])
+
+
+def batched_linear_fit(
+    x: np.ndarray,
+    Y: np.ndarray,
+    sigma: np.ndarray | float,
+    axis: int = 0,
+    max_condition: float = 1e10,
+) -> FitResultTable:
+    """Weighted least-squares straight-line fits y = slope * x + intercept of
+    many datasets at once, e.g. the current vs. power lines of every
+    (wavelength, voltage) column of a sweep cube.
+
+    The fits are solved in closed form in one vectorized pass (with x
+    centered on its weighted mean, for numerical stability). Columns that
+    fail the quality checks (non-finite data, non-positive errors, fewer than
+    two distinct x or an ill-conditioned normal matrix) are refitted with
+    Minuit on their finite points instead.
+
+    Args:
+        x: x values, broadcast against Y.
+        Y: y values, the points of every fit along axis.
+        sigma: Errors on Y, broadcast against Y.
+        axis: Axis of the points of one fit.
+        max_condition: Largest accepted ratio of the weighted mean of x**2
+            to the weighted variance of x.
+
+    Return:
+        fit_results: Parameters ["slope", "intercept"] with covariances, one
+            row per fit in C order of the broadcast shape without axis.
+    """
+    x, Y, sigma = np.broadcast_arrays(
+        np.asarray(x, dtype=float),
+        np.asarray(Y, dtype=float),
+        np.asarray(sigma, dtype=float),
+    )
+    n_points = Y.shape[axis]
+    x = np.moveaxis(x, axis, -1).reshape(-1, n_points)
+    Y = np.moveaxis(Y, axis, -1).reshape(-1, n_points)
+    sigma = np.moveaxis(sigma, axis, -1).reshape(-1, n_points)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = 1 / sigma**2
+        s_w = weights.sum(axis=1)
+        x_mean = (weights * x).sum(axis=1) / s_w
+        y_mean = (weights * Y).sum(axis=1) / s_w
+        dx = x - x_mean[:, None]
+        s_dxdx = (weights * dx**2).sum(axis=1)
+        slope = (weights * dx * Y).sum(axis=1) / s_dxdx
+        intercept = y_mean - slope * x_mean
+
+        covariance = np.empty((len(Y), 2, 2))
+        covariance[:, 0, 0] = 1 / s_dxdx
+        covariance[:, 0, 1] = covariance[:, 1, 0] = -x_mean / s_dxdx
+        covariance[:, 1, 1] = 1 / s_w + x_mean**2 / s_dxdx
+        residuals = Y - slope[:, None] * x - intercept[:, None]
+        chi2_val = (weights * residuals**2).sum(axis=1)
+        condition = (1 + x_mean**2 * s_w / s_dxdx) if n_points > 1 else np.inf
+
+    ndof = np.full(len(Y), n_points - 2, dtype=float)
+    table = FitResultTable(
+        np.stack([slope, intercept], axis=1),
+        np.sqrt(np.diagonal(covariance, axis1=1, axis2=2)),
+        chi2_val,
+        ndof,
+        chi2.sf(chi2_val, ndof) if n_points > 2 else np.full(len(Y), np.nan),
+        np.ones(len(Y), dtype=bool),
+        covariance,
+        ["slope", "intercept"],
+    )
+
+    finite = np.isfinite(x) & np.isfinite(Y) & np.isfinite(sigma) & (sigma > 0)
+    failed = (
+        ~finite.all(axis=1)
+        | ~(s_dxdx > 0)
+        | ~(condition <= max_condition)
+        | ~np.isfinite(table.parameters).all(axis=1)
+    )
+    for row in np.flatnonzero(failed):
+        mask = finite[row]
+        if np.unique(x[row, mask]).size < 2:
+            table.parameters[row] = table.parameter_errors[row] = np.nan
+            table.covariance[row] = np.nan
+            table.chi2[row] = table.ndof[row] = table.p_value[row] = np.nan
+            table.success[row] = False
+            continue
+        guesses = table.parameters[row]
+        if not np.isfinite(guesses).all():
+            guesses = [0.0, float(np.mean(Y[row, mask]))]
+        fit_result = perform_fit(
+            FitInput(
+                x[row, mask],
+                Y[row, mask],
+                sigma[row, mask],
+                _linear_model,
+                list(guesses),
+                _linear_grad,
+            )
+        )
+        table.parameters[row] = fit_result.parameters
+        table.parameter_errors[row] = fit_result.parameter_errors
+        table.covariance[row] = fit_result.covariance
+        table.chi2[row] = fit_result.chi2
+        table.ndof[row] = fit_result.ndof
+        table.p_value[row] = np.nan if fit_result.p_value is None else fit_result.p_value
+        table.success[row] = fit_result.success
+    return table
+
+
+def sweep_bin_edges(xdata: np.ndarray) -> np.ndarray:
+    """Bin edges around the points of a monotone sweep axis: midway between
+    neighbouring points, with the outer bins mirrored around the end points.
+    Works for increasing and decreasing (e.g. wavelength from a frequency
+    sweep) axes. perform_fit_llh uses them only with density=True, to turn a
+    rate per unit of x into expected counts."""
+    xdata = np.asarray(xdata, dtype=float)
+    if xdata.ndim != 1 or len(xdata) < 2:
+        raise ValueError("xdata must be one dimensional with at least 2 points.")
+    steps = np.diff(xdata)
+    if not (np.all(steps > 0) or np.all(steps < 0)):
+        raise ValueError("xdata must be strictly increasing or decreasing.")
+    mids = (xdata[1:] + xdata[:-1]) / 2
+    return np.concatenate(
+        ([2 * xdata[0] - mids[0]], mids, [2 * xdata[-1] - mids[-1]])
+    )
+
+
+def perform_fit_llh(
+    fit_input: FitInput,
+    bounds: None | dict[str, tuple[float, float] | None] = None,
+    outlier: int | list[int] | None = None,
+    binned=True,
+    density=False,
+) -> FitResult:
+    """Poisson likelihood fit, for counting data such as MeasureCounts.
+
+    Binned (default): ydata are the counts measured at the sweep points
+    xdata, and fit_func gives the expected counts there (the same model as
+    for perform_fit). The cost is the Poisson deviance (Baker-Cousins), with
+    the model evaluated once per call over all bins, so chi2 and p_value are
+    meaningful as for least squares. With density=True fit_func is a rate
+    per unit of x instead, and is multiplied by the bin widths from
+    sweep_bin_edges (e.g. counts per nm on a non-uniform wavelength axis).
+    yerror is not used.
+
+    Unbinned: xdata are individual events, fit_func is their normalized
+    probability density and ydata/yerror are ignored. chi2, ndof and
+    p_value are None.
+
+    fit_grad is used if given (binned only).
+    """
+    names = list(inspect.signature(fit_input.fit_func).parameters)[1:]
+    if len(fit_input.initial_guesses) != len(names):
         raise ValueError("Initial guesses must match # of fit function arguments.")
-    if outlier:
-        xdata = np.delete(fit_input.xdata, outlier)
-        ydata = np.delete(fit_input.ydata, outlier)
-        yerror = np.delete(fit_input.yerror, outlier)
-    else:
-        xdata = fit_input.xdata
-        ydata = fit_input.ydata
-        yerror = fit_input.yerror
+    xdata = np.asarray(fit_input.xdata, dtype=float)
 
-    if softloss:
-        lstsq = LeastSquares(xdata, ydata, yerror, fit_input.fit_func, loss="soft_l1")
+    if not binned:
+        if outlier:
+            xdata = np.delete(xdata, outlier)
+        cost = UnbinnedNLL(xdata, fit_input.fit_func)
+        minuit_obj = Minuit(cost, *fit_input.initial_guesses)
     else:
-        lstsq = LeastSquares(xdata, ydata, yerror, fit_input.fit_func)
-    minuit_obj = Minuit(lstsq, *fit_input.initial_guesses)
+        counts = np.asarray(fit_input.ydata, dtype=float)
+        widths = np.abs(np.diff(sweep_bin_edges(xdata))) if density else 1.0
+        if outlier:
+            xdata = np.delete(xdata, outlier)
+            counts = np.delete(counts, outlier)
+            if density:
+                widths = np.delete(widths, outlier)
+
+        def deviance(*par: float) -> float:
+            return poisson_chi2(counts, fit_input.fit_func(xdata, *par) * widths)
+
+        def deviance_grad(*par: float) -> np.ndarray:
+            mu = fit_input.fit_func(xdata, *par) * widths
+            dmu = np.asarray(fit_input.fit_grad(xdata, *par)) * widths
+            return 2 * np.sum((1 - counts / mu) * dmu, axis=-1)
+
+        minuit_obj = Minuit(
+            deviance,
+            *fit_input.initial_guesses,
+            name=names,
+            grad=deviance_grad if fit_input.fit_grad is not None else None,
+        )
+        minuit_obj.errordef = Minuit.LEAST_SQUARES
 
     if bounds:
         for name, bound in bounds.items():
@@ -411,64 +1292,79 @@ def perform_fit(
 
     minuit_obj.migrad()
     minuit_obj.hesse()
+    if not binned:
+        return _minuit_fit_result(minuit_obj, goodness_of_fit=False)
+    return _minuit_fit_result(minuit_obj, ndof=len(counts) - minuit_obj.nfit)
 
-    chi2_val = minuit_obj.fval
-    ndof = len(ydata) - minuit_obj.nfit
-    p_val = chi2.sf(chi2_val, ndof)
-    success = minuit_obj.accurate and minuit_obj.valid
 
-    parameter_values = minuit_obj.values[:]
-    parameter_errors = minuit_obj.errors[:]
+@dataclass
+class FitDiagnostics:
+    # Escalation step that gave a valid and accurate fit, None if none did
+    succeeded_step: str | None
+    steps: list[str]
+    nfcn: int
+    edm: float
+
+
+FIT_RETRY_STEPS = ("migrad", "simplex+migrad", "strategy 2", "scan")
 
-    return FitResult(parameter_values, parameter_errors, chi2_val, ndof, p_val, success)
-
-
-# def perform_fit_llh(
-#     fit_input: FitInput,
-#     bounds: None | dict[str, tuple[float, float] | None] = None,
-#     outlier: int | list[int] | None = None,
-# ):
-#     if (
-#         len(fit_input.initial_guesses)
-#         != len(inspect.signature(fit_input.fit_func).parameters) - 1
-#     ):
-#         raise ValueError("Initial guesses must match # of fit function arguments.")
-#     if outlier:
-#         xdata = np.delete(fit_input.xdata, outlier)
-#         ydata = np.delete(fit_input.ydata, outlier)
-#         yerror = np.delete(fit_input.yerror, outlier)
-#     else:
-#         xdata = fit_input.xdata
-#         ydata = fit_input.ydata
-#         yerror = fit_input.yerror
-
-#     counts, bin_edges = [[xdata[idx]] * ]
-
-#     # binwidth = np.diff(xdata)[0]
-#     # bin_edges = np.array([n * binwidth for n in range(len(xdata ) + 1)])
-#     # bin_edges = (fit_input.xdata[:-1] + fit_input.xdata[1:])
-#     # bin_edges = np.append(bin_edges, bin_edges[-1] + np.mean(np.diff(bin_edges)))
-#     # bin_edges = np.append([0], bin_edges)
-#     # if softloss:
-#     #     lstsq = LeastSquares(xdata, ydata, yerror, fit_input.fit_func, loss="soft_l1")
-#     # else:
-#     #     lstsq = LeastSquares(xdata, ydata, yerror, fit_input.fit_func)
-#     llh = BinnedNLL(ydata, bin_edges, fit_input.fit_func, use_pdf="approximate")
-#     minuit_obj = Minuit(llh, *fit_input.initial_guesses)
-
-#     if bounds:
-#         for name, bound in bounds.items():
-#             minuit_obj.limits[name] = bound
-
-#     minuit_obj.migrad()
-#     minuit_obj.hesse()
-
-#     success = minuit_obj.accurate and minuit_obj.valid
-
-#     parameter_values = minuit_obj.values[:]
-#     parameter_errors = minuit_obj.errors[:]
-
-#     return FitResult(parameter_values, parameter_errors, None, None, None, success)
+
+def perform_fit_retry(
+    fit_input: FitInput,
+    bounds: None | dict[str, tuple[float, float] | None] = None,
+    outlier: int | list[int] | None = None,
+    softloss=False,
+) -> tuple[FitResult, FitDiagnostics]:
+    """Fit with a single Minuit object, escalating the minimization until the
+    fit is valid and accurate.
+
+    The steps are, each continuing from where the previous one stopped:
+    migrad, simplex followed by migrad, migrad with strategy 2, and a scan
+    of the worst parameter (largest relative error) over +-5 errors (or its
+    limits) followed by migrad. HESSE is run after every step.
+
+    Return:
+        fit_result: Result of the last step that was run.
+        fit_diagnostics: Which step succeeded, the steps that were run and
+            the total number of function calls.
+    """
+    minuit_obj = _least_squares_minuit(fit_input, bounds, outlier, softloss)
+    steps = []
+    succeeded_step = None
+    for step in FIT_RETRY_STEPS:
+        steps.append(step)
+        if step == "migrad":
+            minuit_obj.migrad()
+        elif step == "simplex+migrad":
+            minuit_obj.simplex().migrad()
+        elif step == "strategy 2":
+            minuit_obj.strategy = 2
+            minuit_obj.migrad()
+        else:
+            free = [name for name in minuit_obj.parameters if not minuit_obj.fixed[name]]
+            values = np.array([minuit_obj.values[name] for name in free])
+            errors = np.array([minuit_obj.errors[name] for name in free])
+            relative = np.abs(errors) / np.maximum(np.abs(values), 1e-300)
+            relative = np.where(np.isfinite(relative), relative, np.inf)
+            worst = free[int(np.argmax(relative))]
+
+            value, error = minuit_obj.values[worst], minuit_obj.errors[worst]
+            if not np.isfinite(error) or error <= 0:
+                error = max(abs(value), 1.0)
+            low, high = minuit_obj.limits[worst]
+            bound = (max(value - 5 * error, low), min(value + 5 * error, high))
+            grid, fvals = minuit_obj.profile(worst, size=50, bound=bound)
+            minuit_obj.values[worst] = grid[np.nanargmin(fvals)]
+            minuit_obj.migrad()
+        minuit_obj.hesse()
+        if minuit_obj.valid and minuit_obj.accurate:
+            succeeded_step = step
+            break
+
+    diagnostics = FitDiagnostics(
+        succeeded_step, steps, minuit_obj.nfcn, minuit_obj.fmin.edm
+    )
+    return _minuit_fit_result(minuit_obj), diagnostics
 
 
 def perform_fit_rounds(
@@ -477,21 +1373,452 @@ def perform_fit_rounds(
     outlier: int | list[int] | None = None,
     opt_rounds: int = 10,
     softloss=False,
+    retry=False,
 ) -> FitResult:
-    opt_round = 0
-    success = False
+    # retry=True uses the escalation of perform_fit_retry instead of refits
+    if retry:
+        return perform_fit_retry(fit_input, bounds, outlier, softloss)[0]
+
+    # Refit from the previous optimum until a fit succeeds, without changing
+    # the caller's input. The last fit is returned as is, refitting from its
+    # optimum would only repeat it.
+    fit_input = replace(fit_input)
+    for _ in range(max(opt_rounds, 1)):
+        fit_result = perform_fit(fit_input, bounds, outlier, softloss)
+        if fit_result.success:
+            break
+        fit_input.initial_guesses = fit_result.parameters
+    return fit_result
 
-    while (opt_round < opt_rounds) and not (success):
-        intermediate_result = perform_fit(fit_input, bounds, outlier, softloss)
 
-        par = intermediate_result.parameters
-        fit_input.initial_guesses = par
+# Fit jobs of the running perform_fits_parallel call. Forked workers inherit
+# this list, so fit functions do not need to be picklable (e.g. lambdas).
+_PARALLEL_FIT_JOBS: list[tuple] | None = None
 
-        success = intermediate_result.success
-        opt_round += 1
 
-    fit_result = perform_fit(fit_input, bounds, outlier, softloss)
-    return fit_result
+def _perform_fit_job(job: tuple) -> tuple[FitResult | None, str | None]:
+    fit_input, bounds, outlier, softloss = job
+    try:
+        return perform_fit(fit_input, bounds, outlier, softloss), None
+    except Exception as error:
+        return None, f"{type(error).__name__}: {error}"
+
+
+def _perform_fit_by_index(idx: int) -> tuple[FitResult | None, str | None]:
+    return _perform_fit_job(_PARALLEL_FIT_JOBS[idx])
+
+
+def perform_fits_parallel(
+    fit_inputs: list[FitInput],
+    bounds: None
+    | dict[str, tuple[float, float] | None]
+    | list[dict[str, tuple[float, float] | None] | None] = None,
+    outliers: list[int | list[int] | None] | None = None,
+    softloss=False,
+    n_workers: int | None = None,
+) -> FitResultTable:
+    """Run independent perform_fit calls on a process pool.
+
+    Args:
+        fit_inputs: The fits to perform.
+        bounds: Parameter bounds shared by all fits, or one entry per fit.
+        outliers: Outlier indices for every fit (or None).
+        softloss: Use the soft_l1 loss for all fits.
+        n_workers: Number of processes, defaults to the number of cores.
+
+    Return:
+        fit_results: One row per fit, in the order of fit_inputs. Fits that
+            raise an error are reported with a warning and returned with NaN
+            parameters and success=False, the rest of the batch is unaffected.
+            A FitResultTable rather than a list: iterating or indexing it
+            with an int gives FitResults as before, list(fit_results) gives
+            the list.
+    """
+    global _PARALLEL_FIT_JOBS
+    n_fits = len(fit_inputs)
+    if bounds is None or isinstance(bounds, dict):
+        bounds = [bounds] * n_fits
+    if outliers is None:
+        outliers = [None] * n_fits
+    if len(bounds) != n_fits or len(outliers) != n_fits:
+        raise ValueError("bounds and outliers must have one entry per fit.")
+
+    jobs = list(zip(fit_inputs, bounds, outliers, [softloss] * n_fits))
+    n_workers = n_workers or os.cpu_count() or 1
+    chunksize = max(1, n_fits // (4 * n_workers))
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        _PARALLEL_FIT_JOBS = jobs
+        try:
+            with ProcessPoolExecutor(
+                n_workers, mp_context=multiprocessing.get_context("fork")
+            ) as pool:
+                outcomes = list(
+                    pool.map(_perform_fit_by_index, range(n_fits), chunksize=chunksize)
+                )
+        finally:
+            _PARALLEL_FIT_JOBS = None
+    else:
+        with ProcessPoolExecutor(n_workers) as pool:
+            outcomes = list(pool.map(_perform_fit_job, jobs, chunksize=chunksize))
+
+    fit_results = []
+    for idx, (fit_result, error) in enumerate(outcomes):
+        if fit_result is None:
+            warnings.warn(f"Fit {idx} failed with {error}")
+            n_par = len(fit_inputs[idx].initial_guesses)
+            fit_result = FitResult(
+                [np.nan] * n_par, [np.nan] * n_par, None, None, None, False
+            )
+        fit_results.append(fit_result)
+    return FitResultTable.from_results(fit_results)
+
+
+@dataclass
+class BootstrapResult:
+    nominal: FitResult
+    toys: FitResultTable
+    # Percentile interval of every parameter, shape (n_parameters, 2)
+    intervals: np.ndarray
+    cl: float
+
+    @property
+    def errors(self) -> np.ndarray:
+        # Symmetrized half width of the intervals
+        return (self.intervals[:, 1] - self.intervals[:, 0]) / 2
+
+
+# Data and settings of the running bootstrap_fit call, inherited by forked
+# workers like _PARALLEL_FIT_JOBS.
+_BOOTSTRAP_JOB: tuple | None = None
+
+
+def _bootstrap_batch(batch: tuple[int, np.random.SeedSequence]) -> FitResultTable:
+    n_toys, seed = batch
+    xdata, ydata, yerror, fit_input, nominal, bounds, softloss, method = _BOOTSTRAP_JOB
+    rng = np.random.default_rng(seed)
+
+    # One cost function and Minuit object per batch, every toy only swaps the
+    # data and restarts from the nominal parameters
+    loss = "soft_l1" if softloss else "linear"
+    lstsq = LeastSquares(
+        xdata, ydata, yerror, fit_input.fit_func, loss=loss, grad=fit_input.fit_grad
+    )
+    minuit_obj = Minuit(
+        lstsq,
+        *nominal.parameters,
+        grad=True if fit_input.fit_grad is not None else None,
+    )
+    if bounds:
+        for name, bound in bounds.items():
+            minuit_obj.limits[name] = bound
+
+    if method == "toys":
+        model = fit_input.fit_func(xdata, *nominal.parameters)
+        toy_ydata = model + rng.normal(size=(n_toys, len(ydata))) * yerror
+    else:
+        resampled = rng.integers(0, len(ydata), size=(n_toys, len(ydata)))
+
+    n_par = len(nominal.parameters)
+    parameters = np.empty((n_toys, n_par))
+    parameter_errors = np.empty((n_toys, n_par))
+    fvals = np.empty(n_toys)
+    success = np.empty(n_toys, dtype=bool)
+    for toy in range(n_toys):
+        if method == "toys":
+            lstsq.y = toy_ydata[toy]
+        else:
+            lstsq.x = xdata[resampled[toy]]
+            lstsq.y = ydata[resampled[toy]]
+            lstsq.yerror = yerror[resampled[toy]]
+        minuit_obj.reset()
+        minuit_obj.migrad()
+        parameters[toy] = minuit_obj.values
+        parameter_errors[toy] = minuit_obj.errors
+        fvals[toy] = minuit_obj.fval
+        success[toy] = minuit_obj.valid
+
+    ndof = np.full(n_toys, len(ydata) - minuit_obj.nfit, dtype=float)
+    return FitResultTable(
+        parameters, parameter_errors, fvals, ndof, chi2.sf(fvals, ndof), success
+    )
+
+
+def bootstrap_fit(
+    fit_input: FitInput,
+    n: int = 1000,
+    method: str = "toys",
+    bounds: None | dict[str, tuple[float, float] | None] = None,
+    outlier: int | list[int] | None = None,
+    softloss=False,
+    cl: float = 0.683,
+    seed: int | None = None,
+    batch_size: int = 100,
+    n_workers: int | None = None,
+) -> BootstrapResult:
+    """Bootstrap / toy Monte Carlo uncertainties of a perform_fit fit.
+
+    Toys are generated and fitted in batches, each batch reuses a single cost
+    function and Minuit object and starts every refit from the nominal
+    result (MIGRAD only, no HESSE). Batches are spread over a process pool.
+    Every batch has its own seed spawned from seed, so the result only
+    depends on seed and batch_size, not on the number of workers.
+
+    Args:
+        fit_input: The nominal fit.
+        n: Number of toys.
+        method: "toys" draws new ydata from the nominal model with Gaussian
+            yerror, "resample" resamples the data points with replacement.
+        bounds: Parameter bounds, as for perform_fit.
+        outlier: Outlier indices, removed before the nominal fit and the toys.
+        softloss: Use the soft_l1 loss.
+        cl: Confidence level of the central percentile intervals.
+        seed: Seed of the toy generation.
+        batch_size: Number of toys per batch.
+        n_workers: Number of processes, defaults to the number of cores.
+
+    Return:
+        bootstrap_result: The nominal FitResult, the toy fits and the
+            percentile intervals of every parameter (from the successful toys,
+            NaN with a warning if none succeeded).
+    """
+    global _BOOTSTRAP_JOB
+    if method not in ("toys", "resample"):
+        raise ValueError('method must be "toys" or "resample".')
+    if fit_input.yerror is None:
+        raise ValueError("bootstrap_fit needs yerror.")
+
+    nominal = perform_fit(fit_input, bounds, outlier, softloss)
+
+    xdata, ydata, yerror = _fit_data(fit_input, outlier)
+    yerror = np.broadcast_to(yerror, ydata.shape)
+
+    sizes = [min(batch_size, n - start) for start in range(0, n, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    batches = list(zip(sizes, seeds))
+
+    _BOOTSTRAP_JOB = (
+        xdata, ydata, yerror, fit_input, nominal, bounds, softloss, method
+    )
+    try:
+        n_workers = n_workers or os.cpu_count() or 1
+        can_fork = "fork" in multiprocessing.get_all_start_methods()
+        if can_fork and n_workers > 1 and len(batches) > 1:
+            with ProcessPoolExecutor(
+                n_workers, mp_context=multiprocessing.get_context("fork")
+            ) as pool:
+                tables = list(pool.map(_bootstrap_batch, batches))
+        else:
+            tables = [_bootstrap_batch(batch) for batch in batches]
+    finally:
+        _BOOTSTRAP_JOB = None
+
+    toys = FitResultTable(
+        *[
+            np.concatenate([getattr(table, field) for table in tables])
+            for field in (
+                "parameters", "parameter_errors", "chi2", "ndof", "p_value", "success"
+            )
+        ]
+    )
+    if not np.any(toys.success):
+        warnings.warn(
+            f"None of the {n} toy fits converged, the intervals are NaN. "
+            "The failed toys are kept in toys."
+        )
+        intervals = np.full((toys.parameters.shape[1], 2), np.nan)
+    else:
+        quantiles = 100 * np.array([(1 - cl) / 2, (1 + cl) / 2])
+        successful = toys.parameters[toys.success]
+        intervals = np.percentile(successful, quantiles, axis=0).T
+    return BootstrapResult(nominal, toys, intervals, cl)
+
+
+def perform_global_fit(
+    global_input: GlobalFitInput,
+    bounds: None | dict[str, tuple[float, float] | None] = None,
+) -> GlobalFitResult:
+    """Fit all slices of a data cube in a single Minuit minimization, with
+    some parameters shared between the slices and others fitted per slice.
+
+    fit_func must broadcast: it is evaluated once per cost call on the whole
+    cube, with per-slice parameters as arrays of shape (*slice_shape, 1).
+    Points where ydata is NaN are ignored.
+
+    Args:
+        global_input: The data cube, model and parameter layout.
+        bounds: Parameter bounds by name. Bounds on a per-slice parameter
+            apply to all of its slices.
+
+    Return:
+        global_fit_result: FitResult over all Minuit parameters (shared
+            ones by name, per-slice ones as "name_i"), with the full
+            covariance matrix.
+    """
+    names = list(inspect.signature(global_input.fit_func).parameters)[1:]
+    if len(global_input.initial_guesses) != len(names):
+        raise ValueError("Initial guesses must match # of fit function arguments.")
+    if not set(global_input.per_slice) <= set(names):
+        raise ValueError("per_slice must only contain fit function arguments.")
+
+    ydata = np.asarray(global_input.ydata, dtype=float)
+    slice_shape = ydata.shape[:-1]
+    n_slices = int(np.prod(slice_shape))
+    yerror = np.broadcast_to(global_input.yerror, ydata.shape)
+    mask = np.isfinite(ydata) & np.isfinite(yerror)
+
+    initial_values = []
+    parameter_names = []
+    parameter_slices = []
+    for name, guess in zip(names, global_input.initial_guesses):
+        start = len(initial_values)
+        if name in global_input.per_slice:
+            initial_values.extend(np.broadcast_to(guess, slice_shape).ravel())
+            parameter_names.extend(f"{name}_{i}" for i in range(n_slices))
+        else:
+            initial_values.append(guess)
+            parameter_names.append(name)
+        parameter_slices.append(slice(start, len(initial_values)))
+
+    def unpack(par: np.ndarray) -> list[float | np.ndarray]:
+        return [
+            par[sl].reshape(slice_shape + (1,))
+            if name in global_input.per_slice
+            else par[sl.start]
+            for name, sl in zip(names, parameter_slices)
+        ]
+
+    def cost(par: np.ndarray) -> float:
+        model = global_input.fit_func(global_input.xdata, *unpack(par))
+        residuals = (ydata - model) / yerror
+        return np.sum(residuals[mask] ** 2)
+
+    minuit_obj = Minuit(cost, np.array(initial_values, dtype=float), name=parameter_names)
+    minuit_obj.errordef = Minuit.LEAST_SQUARES
+
+    if bounds:
+        for name, bound in bounds.items():
+            if name in global_input.per_slice:
+                for i in range(n_slices):
+                    minuit_obj.limits[f"{name}_{i}"] = bound
+            else:
+                minuit_obj.limits[name] = bound
+
+    minuit_obj.migrad()
+    minuit_obj.hesse()
+
+    chi2_val = minuit_obj.fval
+    ndof = int(np.sum(mask)) - minuit_obj.nfit
+    p_val = chi2.sf(chi2_val, ndof)
+    success = minuit_obj.accurate and minuit_obj.valid
+
+    return GlobalFitResult(
+        minuit_obj.values[:],
+        minuit_obj.errors[:],
+        chi2_val,
+        ndof,
+        p_val,
+        success,
+        np.array(minuit_obj.covariance),
+        parameter_names,
+        slice_shape,
+    )
+
+
+@dataclass
+class NLCoefficients:
+    # Maximum of the second derivative of every fitted curve and the x
+    # (e.g. power) where it is reached, with propagated errors. The
+    # coefficient is 0 if the maximum is at the lower end of the range.
+    coeff: np.ndarray
+    coeff_error: np.ndarray
+    coeff_pow: np.ndarray
+    coeff_pow_error: np.ndarray
+    x: np.ndarray
+    deriv2: np.ndarray  # (n_fits, len(x))
+
+
+def _second_derivative(y: np.ndarray, step: float) -> np.ndarray:
+    # Second order stencil along the last axis, one-sided at the ends
+    deriv2 = np.empty_like(y)
+    deriv2[..., 1:-1] = y[..., 2:] - 2 * y[..., 1:-1] + y[..., :-2]
+    deriv2[..., 0] = 2 * y[..., 0] - 5 * y[..., 1] + 4 * y[..., 2] - y[..., 3]
+    deriv2[..., -1] = 2 * y[..., -1] - 5 * y[..., -2] + 4 * y[..., -3] - y[..., -4]
+    return deriv2 / step**2
+
+
+def _curve_maxima(deriv2: np.ndarray, x: np.ndarray) -> np.ndarray:
+    # Maximum of every row and its position, refined by a parabola through
+    # the neighbouring grid points, so both vary smoothly with the fit
+    # parameters (as needed for the error propagation)
+    rows = np.arange(len(deriv2))
+    idx = np.argmax(deriv2, axis=1)
+    inner = np.clip(idx, 1, len(x) - 2)
+    lower, center, upper = (deriv2[rows, inner + k] for k in (-1, 0, 1))
+    curvature = lower - 2 * center + upper
+    with np.errstate(divide="ignore", invalid="ignore"):
+        offset = np.where(curvature < 0, 0.5 * (lower - upper) / curvature, 0.0)
+    refine = (idx == inner) & (np.abs(offset) <= 1)
+    offset = np.where(refine, offset, 0.0)
+
+    step = x[1] - x[0]
+    peak = center - 0.25 * (lower - upper) * offset
+    coeff = np.where(refine, peak, deriv2[rows, idx])
+    coeff = np.where(idx == 0, 0.0, coeff)
+    return np.stack([coeff, x[idx] + offset * step], axis=1)
+
+
+def nl_coefficients(
+    fit_results: FitResultTable | list[FitResult],
+    model: Callable | list[Callable],
+    x_range: tuple[float, float],
+    n_points: int = 1000,
+) -> NLCoefficients:
+    """Non-linearity coefficients of many fitted curves at once.
+
+    All curves are evaluated on one shared grid as a single (n_fits,
+    n_points) array and differentiated twice with a finite-difference
+    stencil. The coefficient is the maximum of the second derivative and
+    coeff_pow its position, both refined between grid points. Errors are
+    propagated from the fit covariances (see propagate_errors), re-evaluating
+    the curves once per parameter and direction.
+
+    Args:
+        fit_results: Results of the fits, one per curve.
+        model: Fit function, called as model(x, *parameters) with x of shape
+            (1, n_points) and one column of shape (n_fits, 1) per parameter.
+            With a list of fit functions (e.g. one FKFit method per voltage),
+            every curve is evaluated with its own function instead.
+        x_range: Range of x (e.g. the measured powers) to search.
+        n_points: Number of grid points.
+
+    Return:
+        nl_coefficients: Coefficients and their positions, with errors, and
+            the second derivatives on the grid.
+    """
+    if not isinstance(fit_results, FitResultTable):
+        fit_results = FitResultTable.from_results(fit_results)
+    x = np.linspace(x_range[0], x_range[1], n_points)
+    step = x[1] - x[0]
+
+    def curves(*columns: np.ndarray) -> np.ndarray:
+        if callable(model):
+            return np.broadcast_to(
+                model(x[None, :], *[col[:, None] for col in columns]),
+                (len(columns[0]), n_points),
+            )
+        return np.array(
+            [func(x, *params) for func, params in zip(model, np.transpose(columns))]
+        )
+
+    def maxima(*columns: np.ndarray) -> np.ndarray:
+        return _curve_maxima(_second_derivative(curves(*columns), step), x)
+
+    deriv2 = _second_derivative(curves(*fit_results.parameters.T), step)
+    values, errors = fit_results.propagate(maxima)
+    return NLCoefficients(
+        values[:, 0], errors[:, 0], values[:, 1], errors[:, 1], x, deriv2
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,57 @@
+"""Physics models shared by data_analysis and analytical_calculations: the
+AlGaAs refractive index, the Franz-Keldysh absorption and the self-consistent
+absorption under illumination.
+
+Submodules are only imported when one of their names is first used, and none
+of them imports matplotlib, iminuit or scipy.optimize, so e.g. worker
+processes of parallel fits start quickly.
+
+    index: gaas_index and its caches.
+    absorption: FK_absorption, the fused FK_absorption_kernel, FK_fit and
+        their gradients.
+    table: FKAbsorptionTable, an interpolated FK_absorption.
+    selfconsistent: solve_FK_alpha, its continuation variant for grids of
+        operating points, and the continuation solvers of FK_fit_power.
+"""
+import importlib
+
+SUBMODULES = ("index", "absorption", "table", "selfconsistent")
+
+_EXPORTS = {
+    "gaas_index": "index",
+    "gaas_index_coefficients": "index",
+    "gaas_index_cache_info": "index",
+    "gaas_index_cache_clear": "index",
+    "airy": "absorption",
+    "FK_absorption": "absorption",
+    "FK_absorption_kernel": "absorption",
+    "FK_field": "absorption",
+    "FK_fit": "absorption",
+    "FK_absorption_grad": "absorption",
+    "FK_field_grad": "absorption",
+    "FK_fit_grad": "absorption",
+    "FKAbsorptionTable": "table",
+    "solve_FK_alpha": "selfconsistent",
+    "trace_branch": "selfconsistent",
+    "follow_branch": "selfconsistent",
+    "FK_fit_power": "selfconsistent",
+    "FK_fit_continuation": "selfconsistent",
+    "solve_FK_alpha_continuation": "selfconsistent",
+}
+
+__all__ = list(SUBMODULES) + list(_EXPORTS)
+
+
+def __getattr__(name: str) -> object:
+    if name in SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    if name in _EXPORTS:
+        module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,216 @@
+"""Franz-Keldysh absorption in GaAs, from G. E. Stillman, C. M. Wolfe,
+C. O. Bozler, and J. A. Rossi, Appl. Phys. Lett. 28, 544 (1976),
+https://doi.org/10.1063/1.88816, and its dependence on the diode voltage.
+
+lam is the wavelength in nm, T the temperature in K (sets both index and
+bandgap of GaAs), F the electric field in V/cm and alpha the absorption in
+1/cm.
+"""
+import numpy as np
+from scipy import special
+
+from .index import gaas_index, gaas_index_coefficients
+
+
+# Here, k is the "kind" of the airy function
+def airy(k: int, z: float) -> float:
+    if not isinstance(k, int) or k not in [0, 1, 2, 3]:
+        raise ValueError("k must be an integer between 0 and 3.")
+    else:
+        return special.airy(z)[k]
+
+
+def FK_absorption(lam: float, x: float, T: float, F: float) -> float:
+    n = gaas_index(lam, x, T)  # GaAs refractive index (constant)
+    mh1 = 0.087  # Light-hole effective mass
+    mh2 = 0.45  # Heavy-hole effective mass
+    mu1 = 0.0377
+    mu2 = 0.0579
+    fkcoeff = 0.58  # Experimental coefficient
+
+    Eg = 1.519 - 5.405e-4 * T**2 / (T + 204)  # Temperature-dependent gap
+    Eph = 1239.84 / lam
+
+    beta1 = 1.1e5 * (Eg - Eph) * (2 * mu1) ** (1 / 3) * F ** (-2 / 3)
+    beta2 = 1.1e5 * (Eg - Eph) * (2 * mu2) ** (1 / 3) * F ** (-2 / 3)
+
+    a1 = (
+        (1 + 1 / mh1)
+        * (2 * mu1) ** (4 / 3)
+        * (np.abs(airy(1, beta1)) ** 2 - beta1 * np.abs(airy(0, beta1)) ** 2)
+    )
+    a2 = (
+        (1 + 1 / mh2)
+        * (2 * mu2) ** (4 / 3)
+        * (np.abs(airy(1, beta2)) ** 2 - beta2 * np.abs(airy(0, beta2)) ** 2)
+    )
+
+    FKa = (a1 + a2) * F ** (1 / 3) * 1e4 / n
+    alpha = fkcoeff * FKa
+    return alpha
+
+
+# Constants of FK_absorption shared with the fused kernel
+FK_MU = (0.0377, 0.0579)  # Reduced masses (light, heavy hole)
+FK_MH = (0.087, 0.45)  # Hole effective masses (light, heavy)
+FK_COEFF = 0.58  # Experimental coefficient
+
+
+def _FK_absorption_chunk(
+    lam: np.ndarray,
+    x: float,
+    T: float,
+    F: np.ndarray,
+    out: np.ndarray,
+    work: np.ndarray,
+) -> None:
+    # FK_absorption for one 1-D chunk, written into out using only the
+    # preallocated rows of work (index, beta and the Airy outputs)
+    m = len(out)
+    n, tmp, beta, ai, aip, bi, bip = [row[:m] for row in work]
+
+    # GaAs index from the cached (x, T) coefficients, see _gaas_index
+    A, C0, E0, C1, E12 = gaas_index_coefficients(x, T)
+    np.divide(1000.0, lam, out=tmp)
+    np.multiply(tmp, tmp, out=tmp)  # E**2
+    n.fill(A)
+    for coeff, pole in (
+        (C0, E0**2),
+        (C1, E12),
+        ((1 - x) * 1.55e-3, 0.724e-3),
+        (x * 2.61e-3, 1.331e-3),
+    ):
+        np.subtract(pole, tmp, out=beta)
+        np.divide(coeff, beta, out=beta)
+        np.add(n, beta, out=n)
+    np.sqrt(n, out=n)
+
+    # (Eg - Eph) * F^(-2/3), the beta of both holes up to a constant
+    Eg = 1.519 - 5.405e-4 * T**2 / (T + 204)
+    np.divide(1239.84, lam, out=tmp)
+    np.subtract(Eg, tmp, out=tmp)
+    np.power(F, -2 / 3, out=bi)
+    np.multiply(tmp, bi, out=tmp)
+
+    out.fill(0.0)
+    for mu, mh in zip(FK_MU, FK_MH):
+        np.multiply(tmp, 1.1e5 * (2 * mu) ** (1 / 3), out=beta)
+        # Far below the gap Ai'^2 - beta * Ai^2 only needs K_1/3 and K_2/3,
+        # which are cheaper than special.airy there (slower for beta < ~10)
+        if m and np.min(beta) > 10:
+            # Ai(b) = sqrt(b / 3) K_1/3(z) / pi, Ai'(b) = -b K_2/3(z) / (sqrt(3) pi)
+            # with z = 2 / 3 b^(3/2), so Ai'^2 - b Ai^2 = b^2 (K_2/3^2 - K_1/3^2) / (3 pi^2)
+            np.power(beta, 1.5, out=bi)
+            np.multiply(bi, 2 / 3, out=bi)
+            special.kv(1 / 3, bi, out=ai)
+            special.kv(2 / 3, bi, out=aip)
+            np.multiply(ai, ai, out=ai)
+            np.multiply(aip, aip, out=aip)
+            np.subtract(aip, ai, out=aip)
+            np.multiply(beta, beta, out=ai)
+            np.multiply(aip, ai, out=aip)
+            np.multiply(aip, 1 / (3 * np.pi**2), out=aip)
+        else:
+            special.airy(beta, out=(ai, aip, bi, bip))
+            # Ai'^2 - beta * Ai^2
+            np.multiply(ai, ai, out=ai)
+            np.multiply(ai, beta, out=ai)
+            np.multiply(aip, aip, out=aip)
+            np.subtract(aip, ai, out=aip)
+        np.multiply(aip, (1 + 1 / mh) * (2 * mu) ** (4 / 3), out=aip)
+        np.add(out, aip, out=out)
+
+    # * fkcoeff * F^(1/3) * 1e4 / n
+    np.cbrt(F, out=tmp)
+    np.multiply(out, tmp, out=out)
+    np.divide(out, n, out=out)
+    np.multiply(out, FK_COEFF * 1e4, out=out)
+
+
+def FK_absorption_kernel(
+    lam: float | np.ndarray,
+    x: float,
+    T: float,
+    F: float | np.ndarray,
+    out: np.ndarray | None = None,
+    chunksize: int = 8192,
+) -> np.ndarray:
+    """Fused FK_absorption for scalar x and T, behaving like a ufunc in lam
+    and F: inputs broadcast, and the result can be written into out.
+
+    The inputs are streamed in chunks through a fixed workspace, so apart
+    from the result nothing of the size of the input is allocated (the
+    chunked intermediates stay in cache). Only Ai and Ai' enter the model:
+    for chunks far below the gap they are expressed through the modified
+    Bessel functions K_1/3 and K_2/3, otherwise scipy.special.airy is
+    evaluated once per hole into the workspace (Bi and Bi' go to scratch
+    rows) instead of twice as in FK_absorption.
+
+    Args:
+        lam: Wavelength(s) in nm.
+        x: Al mole fraction.
+        T: Temperature in K.
+        F: Electric field(s) in V/cm.
+        out: Output array of the broadcast shape, allocated if None.
+        chunksize: Number of elements per chunk.
+
+    Return:
+        alpha: FK absorption in 1/cm (out, if given).
+    """
+    if np.ndim(x) != 0 or np.ndim(T) != 0:
+        raise ValueError("FK_absorption_kernel needs scalar x and T.")
+    x, T = float(x), float(T)
+    lam = np.asarray(lam, dtype=float)
+    F = np.asarray(F, dtype=float)
+    if out is None:
+        out = np.empty(np.broadcast_shapes(lam.shape, F.shape))
+
+    iterator = np.nditer(
+        [lam, F, out],
+        flags=["external_loop", "buffered", "zerosize_ok"],
+        op_flags=[["readonly"], ["readonly"], ["writeonly"]],
+        op_dtypes=[np.float64] * 3,
+        buffersize=chunksize,
+    )
+    work = np.empty((7, max(1, min(chunksize, out.size))))
+    with iterator:
+        for lam_chunk, F_chunk, out_chunk in iterator:
+            _FK_absorption_chunk(lam_chunk, x, T, F_chunk, out_chunk, work)
+    return out
+
+
+def FK_field(V_d: float) -> float:
+    # We do things in nanometers first then convert to centimeters
+    # to avoid floating point issues. 795.5 is in units nm²/V
+    depletion_width = 1e-7 * np.sqrt(1e4 + 795.5 * (1.4 - V_d))
+    return -(V_d - 1.4) / depletion_width
+
+
+def FK_fit(lam: float, x: float, T: float, V_d: float) -> float:
+    return FK_absorption(lam, x, T, FK_field(V_d))
+
+
+def FK_absorption_grad(lam: float, x: float, T: float, F: float) -> float:
+    # d alpha / dF. With f(beta) = Ai'(beta)² - beta Ai(beta)² and Ai'' = beta Ai
+    # we get f'(beta) = -Ai(beta)², and d beta / dF = -2/3 beta / F.
+    n = gaas_index(lam, x, T)
+    Eg = 1.519 - 5.405e-4 * T**2 / (T + 204)
+    Eph = 1239.84 / lam
+
+    dalpha = 0.0
+    for mu, mh in zip(FK_MU, FK_MH):
+        beta = 1.1e5 * (Eg - Eph) * (2 * mu) ** (1 / 3) * F ** (-2 / 3)
+        Ai, Aip, _, _ = special.airy(beta)
+        dalpha = dalpha + (1 + 1 / mh) * (2 * mu) ** (4 / 3) * (Aip**2 + beta * Ai**2)
+
+    return FK_COEFF * dalpha * F ** (-2 / 3) / 3 * 1e4 / n
+
+
+def FK_field_grad(V_d: float) -> float:
+    # d FK_field / d V_d
+    s = np.sqrt(1e4 + 795.5 * (1.4 - V_d))
+    return -1e7 * (1 / s - 795.5 * (1.4 - V_d) / (2 * s**3))
+
+
+def FK_fit_grad(lam: float, x: float, T: float, V_d: float) -> float:
+    return FK_absorption_grad(lam, x, T, FK_field(V_d)) * FK_field_grad(V_d)
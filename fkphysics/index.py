@@ -0,0 +1,107 @@
+"""Refractive index of AlGaAs, based on Gehrsitz et al., J. Appl. Phys. 87,
+7825 (2000). The canonical refractive index generator, by courtesy of Niels
+Gregersen.
+
+lam in nm, x is the mole fraction of Al: Al(x)Ga(1-x)As, T in Kelvin.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+
+def _gaas_index_coefficients(x: float, T: float) -> tuple[float, ...]:
+    # Gehrsitz et al., Eq. (11) and below Eq. (11):
+    E_Gamma_0 = 1.5192 / 1.239856  # OK
+    E_Deb = 15.9e-3 / 1.239856  # OK
+    E_TO = 33.6e-3 / 1.239856  # OK
+    S = 1.8  # OK
+    S_TO = 1.1  # OK
+    kB = 0.0861708e-3 / 1.239856  # OK
+    E_Gamma_GaAs = (
+        E_Gamma_0
+        + S * E_Deb * (1 - 1 / np.tanh(E_Deb / (2 * kB * T)))
+        + S_TO * E_TO * (1 - 1 / np.tanh(E_TO / (2 * kB * T)))
+    )  # OK, but cot rather than coth in original code!!!!!!!!
+
+    # Gehrsitz et al., Table II, GaAs Fit 2 (Have not tried with Fit1...):
+    a0 = 5.9613  # OK
+    a1 = 7.178 * 1e-4  # OK
+    a2 = -0.953 * 1e-6  # OK
+    e0 = 4.7171  # OK
+    e1 = -3.237 * 1e-4  # OK
+    e2 = -1.358 * 1e-6  # OK
+
+    # Gehrsitz et al., Page 7830, column 1:
+    A0 = a0 + a1 * T + a2 * T**2  # OK
+    E120 = e0 + e1 * T + e2 * T**2  # OK
+
+    # Gehrsitz et al., Table IV:
+    A = (
+        A0 - 16.159 * x + 43.511 * x**2 - 71.317 * x**3 + 57.535 * x**4 - 17.451 * x**5
+    )  # OK
+    C1 = 21.5647 + 113.74 * x - 122.5 * x**2 + 108.401 * x**3 - 47.318 * x**4  # OK
+    E12 = E120 + 11.006 * x - 3.08 * x**2  # OK
+    invC0 = (
+        50.535 - 150.7 * x - 62.209 * x**2 + 797.16 * x**3 - 1125 * x**4 + 503.79 * x**5
+    )  # OK but sign ERROR in original code
+    E0 = E_Gamma_GaAs + 1.1308 * x + 0.1436 * x**2  # OK
+    # E0 = E_Gamma_GaAs + 1.136*x + 0.22*x**2#Also OK? Eq. (14).
+    C0 = 1 / invC0
+    return A, C0, E0, C1, E12
+
+
+# The (x, T) dependent coefficients only take a handful of values in practice
+gaas_index_coefficients = lru_cache(maxsize=64)(_gaas_index_coefficients)
+
+
+def _gaas_index(lam: float, x: float, T: float) -> float:
+    lam = lam / 1000
+
+    E = 1.0 / lam
+
+    if np.ndim(x) == 0 and np.ndim(T) == 0:
+        A, C0, E0, C1, E12 = gaas_index_coefficients(float(x), float(T))
+    else:
+        A, C0, E0, C1, E12 = _gaas_index_coefficients(x, T)
+
+    C2_GaAs = 1.55 * 1e-3  # OK
+    C2_AlAs = 2.61 * 1e-3  # OK
+    E22_GaAs = 0.724 * 1e-3  # OK
+    E22_AlAs = 1.331 * 1e-3  # OK
+    E22 = E22_GaAs  # OK
+    C2 = C2_GaAs  # OK
+
+    E32 = E22_AlAs  # OK
+    C3 = C2_AlAs  # OK
+    R = (1 - x) * C2 / (E22 - E**2) + x * C3 / (E32 - E**2)  # OK
+    eps = A + C0 / (E0**2 - E**2) + C1 / (E12 - E**2) + R  # OK
+    n = np.sqrt(eps)  # OK
+    return n
+
+
+_gaas_index_scalar = lru_cache(maxsize=1024)(_gaas_index)
+
+
+def gaas_index(lam: float, x: float, T: float) -> float:
+    if np.ndim(lam) == 0 and np.ndim(x) == 0 and np.ndim(T) == 0:
+        return _gaas_index_scalar(float(lam), float(x), float(T))
+    return _gaas_index(lam, x, T)
+
+
+def gaas_index_cache_info() -> dict[str, tuple]:
+    """Hit/miss statistics of the gaas_index caches, e.g. to check that a fit
+    loop does not recompute the (x, T) dependent coefficients.
+
+    Return:
+        cache_info: functools cache_info of the coefficient and the scalar
+            lookup caches.
+    """
+    return {
+        "coefficients": gaas_index_coefficients.cache_info(),
+        "scalar": _gaas_index_scalar.cache_info(),
+    }
+
+
+def gaas_index_cache_clear() -> None:
+    gaas_index_coefficients.cache_clear()
+    _gaas_index_scalar.cache_clear()
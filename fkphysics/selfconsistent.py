@@ -0,0 +1,566 @@
+from typing import Callable
+
+import numpy as np
+
+from .absorption import FK_fit
+
+
+def _bracketed_newton(
+    residual: Callable,
+    alpha: np.ndarray,
+    lo: np.ndarray,
+    hi: np.ndarray,
+    g_lo: np.ndarray,
+    g_hi: np.ndarray,
+    xtol: float,
+    maxiter: int,
+) -> np.ndarray:
+    # Newton iteration on residual(alpha, idx) for many points at once, kept
+    # inside the brackets [lo, hi] with g_lo = residual(lo) >= 0 >= g_hi.
+    # Points where an end of the bracket is an exact root are not iterated.
+    # All arrays are updated in place.
+
+    # Ends of the bracket that are exact roots (e.g. alpha = 0 once the
+    # diode is forward biased) need no iterations
+    alpha[:] = np.where(g_hi == 0, hi, np.where(g_lo == 0, lo, alpha))
+    # Side of the bracket moved last, for the Illinois variant of false position
+    last = np.zeros(alpha.size, dtype=np.int8)
+    active = (g_lo != 0) & (g_hi != 0)
+    for _ in range(maxiter):
+        idx = np.flatnonzero(active)
+        if idx.size == 0:
+            break
+        a = alpha[idx]
+        g = residual(a, idx)
+        lo[idx] = np.where(g > 0, a, lo[idx])
+        g_lo[idx] = np.where(g > 0, g, g_lo[idx])
+        hi[idx] = np.where(g < 0, a, hi[idx])
+        g_hi[idx] = np.where(g < 0, g, g_hi[idx])
+        # Halve the residual of an end that stayed put twice in a row, so
+        # false position does not stall on one side
+        side = np.sign(g).astype(np.int8)
+        g_hi[idx] = np.where((side > 0) & (last[idx] > 0), 0.5 * g_hi[idx], g_hi[idx])
+        g_lo[idx] = np.where((side < 0) & (last[idx] < 0), 0.5 * g_lo[idx], g_lo[idx])
+        last[idx] = side
+
+        h = 1e-7 * np.maximum(1.0, np.abs(a))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = g / ((residual(a + h, idx) - g) / h)
+        new = a - step
+        # Exact roots and Newton steps below the tolerance are accepted as
+        # they are, Newton steps within the tolerance of the bracket (e.g. a
+        # root at alpha = 0) are clipped into it. Otherwise fall back to
+        # false position (or bisection, if that does not land inside either)
+        # whenever Newton leaves the bracket.
+        exact = g == 0
+        new[exact] = a[exact]
+        tol = xtol * (1 + np.abs(a))
+        done = exact | (np.abs(step) <= tol)
+        fallback = ~done & (
+            ~np.isfinite(new) | (new < lo[idx] - tol) | (new > hi[idx] + tol)
+        )
+        clip = ~done & ~fallback
+        new[clip] = np.clip(new[clip], lo[idx][clip], hi[idx][clip])
+        l, u, gl, gu = (arr[idx][fallback] for arr in (lo, hi, g_lo, g_hi))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            secant = l - gl * (u - l) / (gu - gl)
+        new[fallback] = np.where((secant > l) & (secant < u), secant, 0.5 * (l + u))
+
+        alpha[idx] = new
+        converged = done | (np.abs(new - a) <= xtol * (1 + np.abs(new)))
+        active[idx[converged]] = False
+
+    return alpha
+
+
+def solve_FK_alpha(
+    power: np.ndarray,
+    lam: float | np.ndarray,
+    V_app: float | np.ndarray,
+    R: float | np.ndarray,
+    eta: float,
+    gamma: float,
+    alpha_0: float,
+    L: float,
+    x: float,
+    T: float,
+    alpha_init: float | np.ndarray | None = None,
+    xtol: float = 1e-10,
+    maxiter: int = 100,
+    absorption: Callable = FK_fit,
+) -> np.ndarray:
+    """Solve the self-consistent FK absorption for a whole array of operating
+    points at once.
+
+    The photocurrent generated by the absorbed power shifts the voltage over
+    the diode, which in turn changes the FK absorption:
+
+        alpha = FK_fit(lam, x, T, V_app + P * eta / 1.24 * lam * R
+                       * (1 - exp(-L * (gamma * alpha + alpha_0))))
+
+    Instead of one fsolve call per point, all points are iterated together
+    with a bracketed Newton method (finite-difference derivative, false
+    position whenever a Newton step leaves the bracket).
+
+    Args:
+        power: Incident power(s) in muW.
+        lam: Wavelength(s) in nm.
+        V_app: Applied voltage(s) in V.
+        R: Load resistance(s) in Mohm.
+        eta: Quantum efficiency.
+        gamma: Confinement factor of the FK absorption.
+        alpha_0: Field-independent background absorption in 1/cm.
+        L: Waveguide length in cm.
+        x: Al mole fraction.
+        T: Temperature in K.
+        alpha_init: Starting guess(es). Defaults to the zero-power solution.
+        xtol: Relative tolerance on alpha.
+        maxiter: Maximum number of Newton/bisection iterations.
+        absorption: Model for the FK absorption, FK_fit or the FK_fit method
+            of an FKAbsorptionTable.
+
+    Return:
+        alphas: The self-consistent FK absorption, broadcast to the shape of
+            the operating point arrays.
+    """
+    power, lam, V_app, R = np.broadcast_arrays(
+        *[np.asarray(arr, dtype=float) for arr in (power, lam, V_app, R)]
+    )
+    shape = power.shape
+    power, lam, V_app, R = [arr.ravel() for arr in (power, lam, V_app, R)]
+    # Responsivity = eta * lam(mu m) / 1.24
+    photo_voltage = power * eta / 1.24 * (lam / 1000) * R
+
+    def residual(alpha: np.ndarray, idx: np.ndarray) -> np.ndarray:
+        absorbed = 1 - np.exp(-L * (gamma * alpha + alpha_0))
+        # FK_fit is undefined once the diode is forward biased past the
+        # built-in voltage, so we clip just below it (zero field limit)
+        V_d = np.minimum(V_app[idx] + photo_voltage[idx] * absorbed, 1.4 - 1e-6)
+        return absorption(lam[idx], x, T, V_d) - alpha
+
+    all_idx = np.arange(power.size)
+    alpha_zero = absorption(lam, x, T, np.minimum(V_app, 1.4 - 1e-6))
+    alpha_zero = np.where(np.isfinite(alpha_zero), alpha_zero, 1000.0)
+
+    # FK_fit >= 0, so the root is bracketed by 0 and any alpha with g <= 0.
+    # The bracket only depends on the zero-power solution, never on
+    # alpha_init, so where it holds a single root (everywhere off the folds
+    # of FK_fit_power) a warm start only changes the number of iterations.
+    lo = np.zeros_like(alpha_zero)
+    hi = np.maximum(alpha_zero, 1.0)
+    g_hi = residual(hi, all_idx)
+    g_lo = residual(lo, all_idx)
+    for _ in range(60):
+        idx = np.flatnonzero(g_hi > 0)
+        if idx.size == 0:
+            break
+        lo[idx] = hi[idx]
+        g_lo[idx] = g_hi[idx]
+        hi[idx] *= 2
+        g_hi[idx] = residual(hi[idx], idx)
+
+    if alpha_init is None:
+        alpha = alpha_zero
+    else:
+        alpha = np.broadcast_to(np.asarray(alpha_init, dtype=float), shape).ravel()
+        alpha = np.where(np.isfinite(alpha), alpha, alpha_zero)
+    alpha = np.clip(alpha, lo, hi)
+    alpha = _bracketed_newton(residual, alpha, lo, hi, g_lo, g_hi, xtol, maxiter)
+    return alpha.reshape(shape)
+
+
+def trace_branch(
+    residual: Callable,
+    theta_0: float,
+    theta_1: float,
+    alpha_start: float,
+    ds: float = 0.01,
+    ds_min: float = 1e-8,
+    ds_max: float = 0.05,
+    max_steps: int = 100_000,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Trace the solution curve residual(theta, alpha) = 0 from theta_0 to
+    theta_1 with pseudo-arclength continuation.
+
+    Unlike warm-starting a root finder from the previous point, the curve is
+    followed around folds (where d theta / ds changes sign), so the solution
+    never jumps between the branches of a bistable region. The solution is
+    traced in log(alpha), so it has to stay positive (absorption coefficients
+    do), but can vary over many orders of magnitude along the curve.
+
+    Args:
+        residual: Vectorized residual(theta, alpha).
+        theta_0: Start of the sweep parameter.
+        theta_1: End of the sweep parameter.
+        alpha_start: Solution at theta_0.
+        ds: Initial arclength step (in units scaled to the sweep range).
+        ds_min: Smallest step before giving up.
+        ds_max: Largest step.
+        max_steps: Maximum number of continuation steps.
+
+    Return:
+        thetas: Sweep parameter along the curve.
+        alphas: Solution along the curve.
+        folds: Indices of the points just before each fold.
+    """
+    # Scaled coordinates: u runs from 0 to 1 over the sweep, v = log(alpha)
+    theta_scale = theta_1 - theta_0 if theta_1 != theta_0 else 1.0
+
+    def G(u: float, v: float) -> float:
+        return residual(theta_0 + u * theta_scale, np.exp(v)) / np.exp(v)
+
+    def gradient(u: float, v: float, g: float) -> np.ndarray:
+        h = 1e-7
+        return np.array([(G(u + h, v) - g) / h, (G(u, v + h) - g) / h])
+
+    X = np.array([0.0, np.log(alpha_start)])
+    g = G(*X)
+    grad = gradient(*X, g)
+    tangent = np.array([grad[1], -grad[0]]) / np.linalg.norm(grad)
+    if tangent[0] < 0:
+        tangent = -tangent
+
+    points = [X]
+    tangents = [tangent]
+    for _ in range(max_steps):
+        if X[0] >= 1:
+            break
+        while True:
+            X_pred = X + ds * tangent
+            X_new = X_pred.copy()
+            converged = False
+            for n_iter in range(1, 9):
+                g = G(*X_new)
+                grad = gradient(*X_new, g)
+                jacobian = np.array([grad, tangent])
+                rhs = np.array([g, tangent @ (X_new - X_pred)])
+                try:
+                    step = np.linalg.solve(jacobian, rhs)
+                except np.linalg.LinAlgError:
+                    break
+                X_new = X_new - step
+                if not np.all(np.isfinite(X_new)):
+                    break
+                if np.max(np.abs(step)) < 1e-10:
+                    converged = True
+                    break
+            if converged:
+                break
+            ds /= 2
+            if ds < ds_min:
+                theta = theta_0 + X[0] * theta_scale
+                raise RuntimeError(f"Continuation failed at theta={theta}.")
+
+        g = G(*X_new)
+        grad = gradient(*X_new, g)
+        new_tangent = np.array([grad[1], -grad[0]]) / np.linalg.norm(grad)
+        if new_tangent @ tangent < 0:
+            new_tangent = -new_tangent
+        X, tangent = X_new, new_tangent
+        points.append(X)
+        tangents.append(tangent)
+        if n_iter <= 3:
+            ds = min(1.5 * ds, ds_max)
+
+    points = np.array(points)
+    direction = np.sign(np.array(tangents)[:, 0])
+    folds = np.flatnonzero(direction[1:] != direction[:-1])
+    return theta_0 + points[:, 0] * theta_scale, np.exp(points[:, 1]), folds
+
+
+def follow_branch(
+    residual: Callable,
+    thetas: np.ndarray,
+    alpha_start: float,
+    xtol: float = 1e-12,
+    maxiter: int = 100,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Solve residual(theta, alpha) = 0 for every theta, following the branch
+    that starts at min(thetas) with alpha_start through a monotone sweep.
+
+    When the sweep passes a fold, the solution continues on the next branch
+    that moves in the sweep direction (hysteresis) instead of whichever root a
+    warm-started solver happens to land on. The result does not depend on the
+    order of thetas. The traced curve is refined to xtol with a Newton
+    iteration bracketed between the neighbouring traced points, so it stays
+    on the traced branch.
+
+    Raises ValueError if the branch never moves in the sweep direction.
+
+    Return:
+        alphas: Solutions at thetas (same order).
+        fold_thetas: Sweep parameter values of the detected folds.
+    """
+    thetas = np.asarray(thetas, dtype=float)
+    theta_min, theta_max = np.min(thetas), np.max(thetas)
+    curve_thetas, curve_alphas, folds = trace_branch(
+        residual, theta_min, theta_max, alpha_start
+    )
+
+    # Split the curve into monotone segments and keep the ones that move in
+    # the sweep direction, these are the states a monotone sweep visits
+    bounds = np.concatenate(([0], folds + 1, [len(curve_thetas)]))
+    segments = [
+        (curve_thetas[start:stop], curve_alphas[start:stop])
+        for start, stop in zip(bounds[:-1], bounds[1:])
+        if stop - start > 1 and curve_thetas[stop - 1] > curve_thetas[start]
+    ]
+
+    if not segments:
+        raise ValueError(
+            f"The branch traced from theta={theta_min} with alpha={alpha_start} "
+            f"never moves towards theta={theta_max}, so it cannot be followed."
+        )
+
+    # Each theta lies between two traced points of its segment. The root is
+    # polished between their alphas, widened by their distance in log(alpha)
+    # (in which the curve is traced), so it cannot jump to another branch.
+    order = np.argsort(thetas)
+    alphas = np.empty(len(thetas))
+    lo = np.empty(len(thetas))
+    hi = np.empty(len(thetas))
+    segment = 0
+    for idx in order:
+        while (
+            thetas[idx] > segments[segment][0][-1] and segment < len(segments) - 1
+        ):
+            segment += 1
+        segment_thetas, segment_alphas = segments[segment]
+        k = np.searchsorted(segment_thetas, thetas[idx])
+        k = np.clip(k, 1, len(segment_thetas) - 1)
+        left, right = segment_alphas[k - 1], segment_alphas[k]
+        alphas[idx] = np.interp(thetas[idx], segment_thetas, segment_alphas)
+        lo[idx], hi[idx] = min(left, right), max(left, right)
+
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        width = np.maximum(np.log(hi / lo), 1e-8)
+        g_lo = np.empty(len(thetas))
+        g_hi = np.empty(len(thetas))
+        bracketed = np.zeros(len(thetas), dtype=bool)
+        # Widen brackets without a sign change (the curve is not linear
+        # between traced points) until they hold one
+        for _ in range(8):
+            idx = np.flatnonzero(~bracketed)
+            if idx.size == 0:
+                break
+            lo[idx] = np.minimum(lo[idx], alphas[idx]) * np.exp(-width[idx])
+            hi[idx] = np.maximum(hi[idx], alphas[idx]) * np.exp(width[idx])
+            g_lo[idx] = residual(thetas[idx], lo[idx])
+            g_hi[idx] = residual(thetas[idx], hi[idx])
+            bracketed[idx] = np.sign(g_lo[idx]) != np.sign(g_hi[idx])
+            width[idx] *= 2
+
+        # Orient every residual so that it is positive at the lower end
+        sign = np.where(g_lo < 0, -1.0, 1.0)
+        idx = np.flatnonzero(bracketed)
+
+        def oriented(alpha: np.ndarray, sub: np.ndarray) -> np.ndarray:
+            return sign[idx[sub]] * residual(thetas[idx[sub]], alpha)
+
+        alphas[idx] = _bracketed_newton(
+            oriented,
+            np.clip(alphas[idx], lo[idx], hi[idx]),
+            lo[idx],
+            hi[idx],
+            sign[idx] * g_lo[idx],
+            sign[idx] * g_hi[idx],
+            xtol,
+            maxiter,
+        )
+
+    return alphas, curve_thetas[folds]
+
+
+def FK_fit_power(
+    P_in: float,
+    eta: float,
+    R: float,
+    L: float,
+    lam: float,
+    x: float,
+    T: float,
+    V_app: float,
+    alpha_0: float,
+):
+    def residual(power, alpha):
+        # FK_fit is undefined past the built-in voltage, clip to zero field
+        V_d = np.minimum(
+            V_app + power * eta / 1.24 * (lam / 1000) * R * (1 - np.exp(-alpha * L)),
+            1.4 - 1e-6,
+        )
+        return FK_fit(lam, x, T, V_d) + alpha_0 - alpha
+
+    P_in = np.asarray(P_in, dtype=float)
+    P_min = np.min(P_in)
+    # Explicit at zero power, otherwise solved once from there
+    alpha_start = FK_fit(lam, x, T, V_app) + alpha_0
+    if P_min != 0:
+        alpha_start = follow_branch(residual, np.array([0, P_min]), alpha_start)[0][1]
+
+    alphas = follow_branch(residual, P_in, alpha_start)[0]
+    return P_in * np.exp(-L * alphas), alphas
+
+
+def FK_fit_continuation(
+    axis: str,
+    values: np.ndarray,
+    P_in: float,
+    eta: float,
+    R: float,
+    L: float,
+    lam: float,
+    x: float,
+    T: float,
+    V_app: float,
+    alpha_0: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Self-consistent absorption along any parameter of FK_fit_power.
+
+    The first point is reached by continuation in power from the explicit
+    zero-power solution, then the branch is followed along axis.
+
+    Args:
+        axis: Name of the swept parameter ("P_in", "eta", "R", "L", "lam",
+            "V_app" or "alpha_0"), the value given for it is ignored.
+        values: Values of the swept parameter.
+
+    Return:
+        alphas: Absorption at values.
+        fold_values: Parameter values of the detected folds (bistability).
+    """
+    params = {
+        "P_in": P_in,
+        "eta": eta,
+        "R": R,
+        "L": L,
+        "lam": lam,
+        "V_app": V_app,
+        "alpha_0": alpha_0,
+    }
+    if axis not in params:
+        raise ValueError(f"axis must be one of {list(params)}.")
+
+    def residual(theta, alpha):
+        p = {**params, axis: theta}
+        V_d = np.minimum(
+            p["V_app"]
+            + p["P_in"] * p["eta"] / 1.24 * (p["lam"] / 1000) * p["R"]
+            * (1 - np.exp(-alpha * p["L"])),
+            1.4 - 1e-6,
+        )
+        return FK_fit(p["lam"], x, T, V_d) + p["alpha_0"] - alpha
+
+    values = np.asarray(values, dtype=float)
+    start = {**params, axis: np.min(values)}
+    alpha_start = FK_fit_power(
+        np.array([start["P_in"]]),
+        start["eta"],
+        start["R"],
+        start["L"],
+        start["lam"],
+        x,
+        T,
+        start["V_app"],
+        start["alpha_0"],
+    )[1][0]
+    return follow_branch(residual, values, alpha_start)
+
+
+def solve_FK_alpha_continuation(
+    power: np.ndarray,
+    lam: float | np.ndarray,
+    V_app: float | np.ndarray,
+    R: float | np.ndarray,
+    eta: float,
+    gamma: float,
+    alpha_0: float,
+    L: float,
+    x: float,
+    T: float,
+    xtol: float = 1e-10,
+    absorption: Callable = FK_fit,
+) -> np.ndarray:
+    """solve_FK_alpha by continuation: every slice of constant (lam, V_app, R)
+    follows its branch through increasing power with follow_branch, so in
+    bistable regions the result is the state a power sweep ends up in
+    (hysteresis) rather than whichever root the bracket of solve_FK_alpha
+    holds, independent of the order of the points.
+
+    Neighbouring solutions are reused across all axes: the slices are taken
+    in order of (lam, V_app, R), and each one starts from the solution at the
+    lowest power of the previous slice, continued along the straight line
+    between their operating points. Only the first slice (and any slice the
+    continuation fails to reach, e.g. across the band edge) starts from the
+    explicit zero-power solution. The arguments are those of solve_FK_alpha.
+
+    Return:
+        alphas: The self-consistent FK absorption, broadcast to the shape of
+            the operating point arrays.
+    """
+    if gamma == 0:
+        # No feedback of the absorption on the voltage, nothing to follow
+        return solve_FK_alpha(
+            power, lam, V_app, R, eta, gamma, alpha_0, L, x, T,
+            xtol=xtol, absorption=absorption,
+        )
+    power, lam, V_app, R = np.broadcast_arrays(
+        *[np.asarray(arr, dtype=float) for arr in (power, lam, V_app, R)]
+    )
+    shape = power.shape
+    power, lam, V_app, R = [arr.ravel() for arr in (power, lam, V_app, R)]
+
+    def residual(point: np.ndarray, total: np.ndarray) -> np.ndarray:
+        # In the total absorption gamma * alpha + alpha_0, which stays
+        # positive as trace_branch requires. point = (power, lam, V_app, R).
+        p, l, v, r = point
+        absorbed = 1 - np.exp(-L * total)
+        V_d = np.minimum(v + p * eta / 1.24 * (l / 1000) * r * absorbed, 1.4 - 1e-6)
+        return gamma * absorption(l, x, T, V_d) + alpha_0 - total
+
+    def along(start: np.ndarray, stop: np.ndarray) -> Callable:
+        # Residual along the straight line from start (t = 0) to stop (t = 1)
+        def line_residual(t: np.ndarray, total: np.ndarray) -> np.ndarray:
+            t = np.asarray(t)[..., None]
+            return residual(np.moveaxis(start + t * (stop - start), -1, 0), total)
+
+        return line_residual
+
+    slices, inverse = np.unique(
+        np.stack([lam, V_app, R], axis=1), axis=0, return_inverse=True
+    )
+    inverse = inverse.ravel()
+    alphas = np.empty(power.size)
+    previous = None
+    for k, (l, v, r) in enumerate(slices):
+        idx = np.flatnonzero(inverse == k)
+        start = np.array([np.min(power[idx]), l, v, r])
+        zero_power = np.array([0.0, l, v, r])
+        total_zero = residual(zero_power, np.zeros(1))[0]
+        if total_zero <= 0:
+            # No absorption at all (forward biased without background)
+            alphas[idx] = 0.0
+            continue
+
+        total_start = None
+        if previous is not None:
+            try:
+                total_start = follow_branch(
+                    along(previous[0], start), np.array([0.0, 1.0]), previous[1]
+                )[0][1]
+            except (RuntimeError, ValueError):
+                pass
+        if total_start is None:
+            total_start = total_zero
+            if start[0] != 0:
+                total_start = follow_branch(
+                    along(zero_power, start), np.array([0.0, 1.0]), total_zero
+                )[0][1]
+        previous = (start, total_start)
+
+        def slice_residual(p: np.ndarray, total: np.ndarray) -> np.ndarray:
+            return residual((p, l, v, r), total)
+
+        totals = follow_branch(slice_residual, power[idx], total_start, xtol)[0]
+        alphas[idx] = (totals - alpha_0) / gamma
+
+    return alphas.reshape(shape)
@@ -0,0 +1,159 @@
+import hashlib
+import os
+
+import numpy as np
+
+from analysistools.cache import user_cache_dir
+
+from .absorption import FK_absorption, FK_absorption_grad, FK_field, FK_field_grad
+
+CACHEDIR = user_cache_dir("fk_tables")
+
+
+def _rect_bivariate_spline(*args: np.ndarray) -> object:
+    # scipy.interpolate imports scipy.optimize, so only load it once a table
+    # is actually built
+    from scipy.interpolate import RectBivariateSpline
+
+    return RectBivariateSpline(*args)
+
+
+class FKAbsorptionTable:
+    """Precomputed FK absorption on a (wavelength, field) grid for a fixed
+    (x, T), served by bicubic spline interpolation in (lam, log10(F)).
+
+    The grid is refined until the interpolation error, checked against the
+    exact FK_absorption at every cell midpoint, is below atol + rtol * alpha.
+    Points outside the grid are evaluated exactly, so the bound holds for all
+    inputs. Tables are cached in CACHEDIR, a user cache directory (see
+    analysistools.cache), keyed by grid and material parameters.
+
+    FK_absorption and FK_fit have the same signatures as the module level
+    functions and can be used in their place, e.g. as the absorption model of
+    FKFit.
+    """
+
+    def __init__(
+        self,
+        x: float,
+        T: float,
+        lam_range: tuple[float, float] = (900, 1000),
+        field_range: tuple[float, float] = (1e3, 1e6),
+        n_lam: int = 101,
+        n_field: int = 101,
+        atol: float = 1e-3,
+        rtol: float = 1e-4,
+        max_refinements: int = 3,
+        cache: bool = True,
+    ) -> None:
+        self.x = x
+        self.T = T
+        self.atol = atol
+        self.rtol = rtol
+
+        key = hashlib.sha1(
+            repr(
+                (x, T, tuple(lam_range), tuple(field_range), n_lam, n_field, atol, rtol)
+            ).encode()
+        ).hexdigest()[:16]
+        cache_path = os.path.join(CACHEDIR, f"fk_table_{key}.npz")
+
+        if cache and os.path.exists(cache_path):
+            table = np.load(cache_path)
+            self.lam_grid = table["lam_grid"]
+            self.log_field_grid = table["log_field_grid"]
+            self.alpha_grid = table["alpha_grid"]
+            self.max_error = float(table["max_error"])
+        else:
+            self._build(lam_range, field_range, n_lam, n_field, max_refinements)
+            if cache:
+                os.makedirs(CACHEDIR, exist_ok=True)
+                np.savez(
+                    cache_path,
+                    lam_grid=self.lam_grid,
+                    log_field_grid=self.log_field_grid,
+                    alpha_grid=self.alpha_grid,
+                    max_error=self.max_error,
+                )
+
+        self._spline = _rect_bivariate_spline(
+            self.lam_grid, self.log_field_grid, self.alpha_grid
+        )
+
+    def _build(
+        self,
+        lam_range: tuple[float, float],
+        field_range: tuple[float, float],
+        n_lam: int,
+        n_field: int,
+        max_refinements: int,
+    ) -> None:
+        log_field_range = np.log10(field_range)
+        for _ in range(max_refinements + 1):
+            self.lam_grid = np.linspace(*lam_range, n_lam)
+            self.log_field_grid = np.linspace(*log_field_range, n_field)
+            self.alpha_grid = FK_absorption(
+                self.lam_grid[:, None], self.x, self.T, 10 ** self.log_field_grid
+            )
+            spline = _rect_bivariate_spline(
+                self.lam_grid, self.log_field_grid, self.alpha_grid
+            )
+
+            lam_mid = (self.lam_grid[1:] + self.lam_grid[:-1]) / 2
+            log_field_mid = (self.log_field_grid[1:] + self.log_field_grid[:-1]) / 2
+            exact = FK_absorption(lam_mid[:, None], self.x, self.T, 10**log_field_mid)
+            error = np.abs(spline(lam_mid, log_field_mid) - exact)
+            self.max_error = float(np.max(error))
+            if np.all(error <= self.atol + self.rtol * np.abs(exact)):
+                return
+            n_lam, n_field = 2 * n_lam - 1, 2 * n_field - 1
+        raise RuntimeError(
+            f"FK table did not reach atol={self.atol}, rtol={self.rtol} "
+            f"after {max_refinements} refinements (max error {self.max_error:.3g})."
+        )
+
+    def FK_absorption(self, lam: float, x: float, T: float, F: float) -> float:
+        if x != self.x or T != self.T:
+            raise ValueError(f"Table was built for x={self.x}, T={self.T}.")
+        lam, F = np.broadcast_arrays(
+            np.asarray(lam, dtype=float), np.asarray(F, dtype=float)
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_field = np.log10(F)
+        inside = (
+            (lam >= self.lam_grid[0])
+            & (lam <= self.lam_grid[-1])
+            & (log_field >= self.log_field_grid[0])
+            & (log_field <= self.log_field_grid[-1])
+        )
+        alpha = np.empty(lam.shape)
+        alpha[inside] = self._spline.ev(lam[inside], log_field[inside])
+        alpha[~inside] = FK_absorption(lam[~inside], x, T, F[~inside])
+        return alpha if alpha.ndim else float(alpha)
+
+    def FK_fit(self, lam: float, x: float, T: float, V_d: float) -> float:
+        return self.FK_absorption(lam, x, T, FK_field(V_d))
+
+    def FK_absorption_grad(self, lam: float, x: float, T: float, F: float) -> float:
+        if x != self.x or T != self.T:
+            raise ValueError(f"Table was built for x={self.x}, T={self.T}.")
+        lam, F = np.broadcast_arrays(
+            np.asarray(lam, dtype=float), np.asarray(F, dtype=float)
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_field = np.log10(F)
+        inside = (
+            (lam >= self.lam_grid[0])
+            & (lam <= self.lam_grid[-1])
+            & (log_field >= self.log_field_grid[0])
+            & (log_field <= self.log_field_grid[-1])
+        )
+        grad = np.empty(lam.shape)
+        grad[inside] = self._spline.ev(lam[inside], log_field[inside], dy=1) / (
+            F[inside] * np.log(10)
+        )
+        grad[~inside] = FK_absorption_grad(lam[~inside], x, T, F[~inside])
+        return grad if grad.ndim else float(grad)
+
+    def FK_fit_grad(self, lam: float, x: float, T: float, V_d: float) -> float:
+        return self.FK_absorption_grad(lam, x, T, FK_field(V_d)) * FK_field_grad(V_d)
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from fkphysics import FK_absorption, FK_absorption_grad, FK_absorption_kernel
+
+
+@pytest.mark.parametrize("x, T", [(0.0, 298.0), (0.1, 77.0)])
+@pytest.mark.parametrize("chunksize", [8192, 1000])
+def test_kernel_matches_fk_absorption(x, T, chunksize):
+    # From just below the gap (the index has its pole at the gap, near 870 nm
+    # for GaAs at room temperature) into the tail, at weak and strong fields
+    lam = np.linspace(875, 1000, 251)[:, None]
+    F = np.logspace(2, 6.5, 60)
+    expected = FK_absorption(lam, x, T, F)
+    alpha = FK_absorption_kernel(lam, x, T, F, chunksize=chunksize)
+    assert alpha.shape == expected.shape
+    np.testing.assert_allclose(alpha, expected, rtol=1e-10, atol=1e-300)
+
+
+def test_kernel_out_and_scalars():
+    lam = np.linspace(880, 950, 11)[:, None]
+    F = np.logspace(3, 6, 7)
+    out = np.empty((11, 7))
+    assert FK_absorption_kernel(lam, 0.0, 298.0, F, out=out) is out
+    np.testing.assert_allclose(out, FK_absorption(lam, 0.0, 298.0, F), rtol=1e-10)
+    scalar = FK_absorption_kernel(900.0, 0.0, 298.0, 1e5)
+    assert float(scalar) == pytest.approx(FK_absorption(900.0, 0.0, 298.0, 1e5))
+
+
+def test_grad_matches_finite_differences():
+    lam = np.linspace(880, 1000, 25)[:, None]
+    F = np.logspace(3, 6, 13)
+    step = 1e-6 * F
+    upper = FK_absorption(lam, 0.0, 298.0, F + step)
+    lower = FK_absorption(lam, 0.0, 298.0, F - step)
+    expected = (upper - lower) / (2 * step)
+    grad = FK_absorption_grad(lam, 0.0, 298.0, F)
+    np.testing.assert_allclose(grad, expected, rtol=1e-5, atol=1e-12)
@@ -0,0 +1,103 @@
+import os
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.ticker import FuncFormatter
+import numpy as np
+import pytest
+
+from analysistools import figures
+from analysistools.figures import FigureExporter, figure_key
+
+
+def make_figure(scale=1.0, label="x"):
+    fig, ax = plt.subplots()
+    ax.plot(np.arange(10), scale * np.arange(10) ** 2)
+    ax.set_xlabel(label)
+    return fig
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.fixture
+def exporter(tmp_path_factory, monkeypatch):
+    monkeypatch.setattr(figures, "KEYS_DIR", str(tmp_path_factory.mktemp("keys")))
+    exporter = FigureExporter(max_workers=1)
+    yield exporter
+    exporter.flush()
+
+
+def test_key_is_reproducible():
+    rc = {}
+    key = figure_key(make_figure(), "a.png", True, rc)
+    assert figure_key(make_figure(), "a.png", True, rc) == key
+    assert figure_key(make_figure(2.0), "a.png", True, rc) != key
+    assert figure_key(make_figure(label="y"), "a.png", True, rc) != key
+    assert figure_key(make_figure(), "a.svg", True, rc) != key
+    assert figure_key(make_figure(), "a.png", False, rc) != key
+
+
+def test_unchanged_figure_is_not_rendered(exporter, tmp_path):
+    path = str(tmp_path / "fig.svg")
+    assert exporter.save(path, make_figure())
+    assert not exporter.save(path, make_figure())
+    assert exporter.submit(path, make_figure()).result() is None
+    assert exporter.save(path, make_figure(2.0))
+    assert exporter.flush() == [path, path]
+    assert sorted(os.listdir(tmp_path)) == ["fig.svg"]
+
+
+def test_latest_submission_wins(exporter, tmp_path):
+    reference = str(tmp_path / "reference.svg")
+    exporter.save(reference, make_figure(3.0))
+    path = str(tmp_path / "fig.svg")
+    for scale in (1.0, 2.0):
+        exporter.submit(path, make_figure(scale))
+    exporter.save(path, make_figure(3.0))
+    exporter.flush()
+    assert read(path) == read(reference)
+    assert sorted(os.listdir(tmp_path)) == ["fig.svg", "reference.svg"]
+
+    exporter.submit(path, make_figure(4.0))
+    exporter.flush()
+    assert read(path) != read(reference)
+
+
+def test_superseded_errors_are_raised(exporter, tmp_path):
+    path = str(tmp_path / "fig.png")
+    broken = exporter.submit(path, make_figure(label=r"$\undefinedcommand$"))
+    exporter.submit(path, make_figure())
+    if broken.cancelled():
+        exporter.flush()
+    else:
+        with pytest.raises(ValueError):
+            exporter.flush()
+    assert os.path.exists(path)
+
+
+def test_unpicklable_figure_is_saved(exporter, tmp_path):
+    fig = make_figure()
+    fig.axes[0].xaxis.set_major_formatter(FuncFormatter(lambda x, pos: f"{x:g} nm"))
+    assert figure_key(fig, "a.png", True, {}) is None
+
+    path = str(tmp_path / "fig.png")
+    assert exporter.save(path, fig)
+    assert exporter.save(path, fig)
+    assert exporter.submit(str(tmp_path / "background.png"), fig).done()
+    assert exporter.flush() == [path, path, str(tmp_path / "background.png")]
+
+
+def test_outputs_get_default_permissions(exporter, tmp_path):
+    umask = os.umask(0)
+    os.umask(umask)
+    path = str(tmp_path / "fig.png")
+    exporter.save(path, make_figure())
+    exporter.submit(str(tmp_path / "background.png"), make_figure(2.0))
+    exporter.flush()
+    for name in os.listdir(tmp_path):
+        assert os.stat(tmp_path / name).st_mode & 0o777 == 0o666 & ~umask
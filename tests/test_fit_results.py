@@ -0,0 +1,181 @@
+import dataclasses
+import gc
+import inspect
+import warnings
+import weakref
+
+import numpy as np
+import pytest
+
+from utilities import (
+    FitInput,
+    FitResult,
+    FitResultTable,
+    GlobalFitResult,
+    _n_fit_parameters,
+    bootstrap_fit,
+    perform_fit,
+    perform_fit_llh,
+    sweep_bin_edges,
+)
+
+
+def _results() -> list[FitResult]:
+    covariance = np.array([[0.04, 0.01], [0.01, 0.09]])
+    return [
+        FitResult([1.0, 2.0], [0.2, 0.3], 3.5, 4, 0.5, True, covariance),
+        FitResult([np.nan, np.nan], [np.nan, np.nan], None, None, None, False),
+    ]
+
+
+def test_fit_result_is_slotted_record():
+    result = _results()[0]
+    assert dataclasses.is_dataclass(result)
+    assert not hasattr(result, "__dict__")
+
+
+def test_table_rows_are_fit_results():
+    results = _results()
+    table = FitResultTable.from_results(results)
+    rows = list(table)
+    assert all(type(row) is FitResult for row in rows)
+    assert rows[0].chi2 == 3.5 and rows[0].ndof == 4 and rows[0].success is True
+    assert rows[1].chi2 is None and rows[1].ndof is None and rows[1].success is False
+    np.testing.assert_array_equal(table[0].covariance, results[0].covariance)
+
+
+def test_propagate_matches_table():
+    result = _results()[0]
+    table = FitResultTable.from_results([result])
+
+    def ratio(a, b):
+        return a / b
+
+    value, error = result.propagate(ratio)
+    values, errors = table.propagate(ratio)
+    np.testing.assert_allclose([value, error], [values[0], errors[0]])
+
+    uncorrelated = dataclasses.replace(result, covariance=None)
+    _, error = uncorrelated.propagate(ratio)
+    expected = np.hypot(0.2 / 2.0, 1.0 * 0.3 / 2.0**2)
+    np.testing.assert_allclose(error, expected, rtol=1e-6)
+
+
+def test_global_fit_result_is_fit_result():
+    result = GlobalFitResult(
+        [1.0, 2.0, 3.0],
+        [0.1, 0.2, 0.3],
+        1.0,
+        2,
+        0.6,
+        True,
+        np.eye(3),
+        ["a", "b_0", "b_1"],
+        (2,),
+    )
+    assert isinstance(result, FitResult)
+    assert result.get("a") == 1.0
+    np.testing.assert_array_equal(result.get_error("b"), [0.2, 0.3])
+    assert result == dataclasses.replace(result)
+
+
+def test_bootstrap_with_scalar_yerror_and_outlier():
+    x = np.linspace(0, 1, 20)
+    y = 2 * x + 1 + 0.01 * np.random.default_rng(0).standard_normal(20)
+    y[5] = 10
+
+    def line(x, a, b):
+        return a * x + b
+
+    fit_input = FitInput(x, y, 0.01, line, [1.0, 0.0])
+    result = bootstrap_fit(fit_input, n=20, outlier=[5], seed=1, n_workers=1)
+    np.testing.assert_allclose(result.nominal.parameters, [2, 1], atol=0.05)
+    assert result.toys.success.all()
+
+
+def test_llh_fit_results():
+    x = np.linspace(0, 1, 30)
+    counts = np.random.default_rng(2).poisson(50 + 20 * x)
+
+    def line(x, a, b):
+        return a + b * x
+
+    binned = perform_fit_llh(FitInput(x, counts, None, line, [40.0, 10.0]))
+    assert binned.ndof == 28 and binned.p_value is not None
+    assert binned.covariance.shape == (2, 2)
+
+    def exponential(x, tau):
+        return np.exp(-x / tau) / tau
+
+    events = np.random.default_rng(3).exponential(2.0, 500)
+    unbinned = perform_fit_llh(
+        FitInput(events, None, None, exponential, [1.0]),
+        bounds={"tau": (0.1, 10)},
+        binned=False,
+    )
+    assert unbinned.chi2 is None and unbinned.ndof is None
+    assert abs(unbinned.parameters[0] - 2.0) < 3 * unbinned.parameter_errors[0]
+
+
+def test_sweep_bin_edges():
+    np.testing.assert_allclose(sweep_bin_edges([3.0, 2.0, 0.0]), [3.5, 2.5, 1, -1])
+    for xdata in ([1.0], [[1.0, 2.0]], [1.0, 2.0, 2.0]):
+        with pytest.raises(ValueError):
+            sweep_bin_edges(xdata)
+
+
+def test_fit_parameter_count_cache_keeps_no_closures_alive():
+    x = np.linspace(0, 1, 10)
+    data = np.zeros(10**6)
+
+    def make_line():
+        offset = data
+
+        def line(x, a, b):
+            return a * x + b + offset[:10]
+
+        return line
+
+    line = make_line()
+    perform_fit(FitInput(x, 2 * x + 1, 0.1, line, [1.0, 0.0]))
+    closure = weakref.ref(line)
+    del line
+    gc.collect()
+    assert closure() is None
+
+
+def test_bound_method_parameter_count_is_cached(monkeypatch):
+    class Model:
+        def line(self, x, a, b):
+            return a * x + b
+
+    x = np.linspace(0, 1, 10)
+    model = Model()
+    perform_fit(FitInput(x, 2 * x + 1, 0.1, model.line, [1.0, 0.0]))
+
+    def no_signature(func, *args, **kwargs):
+        raise AssertionError("signature computed again")
+
+    # The bound method of the fit is gone, a new one is counted from the
+    # cache of its function
+    gc.collect()
+    monkeypatch.setattr(inspect, "signature", no_signature)
+    assert _n_fit_parameters(model.line) == 2
+
+
+def test_bootstrap_without_converged_toys():
+    x = np.linspace(0, 1, 20)
+
+    def brittle(x, a, b):
+        # Only defined at the starting point, so no toy fit can converge
+        if (a, b) == (1.0, 0.0):
+            return a * x + b
+        return np.full_like(x, np.nan)
+
+    fit_input = FitInput(x, 2 * x + 1, 0.1, brittle, [1.0, 0.0])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        with pytest.warns(UserWarning, match="None of the 10 toy fits converged"):
+            result = bootstrap_fit(fit_input, n=10, seed=0, n_workers=1)
+    assert not result.toys.success.any() and len(result.toys) == 10
+    assert result.intervals.shape == (2, 2) and np.isnan(result.intervals).all()
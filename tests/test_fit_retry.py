@@ -0,0 +1,62 @@
+import warnings
+
+import numpy as np
+import pytest
+
+import utilities
+from utilities import FIT_RETRY_STEPS, FitInput, perform_fit_retry, perform_fit_rounds
+
+
+def line(x, a, b):
+    return a * x + b
+
+
+def degenerate_line(x, a, b, c):
+    # a and c are not identifiable, HESSE never gets an accurate covariance
+    return (a + c) * x + b
+
+
+@pytest.fixture
+def fit_input():
+    x = np.linspace(0, 1, 20)
+    y = 2 * x + 1 + 0.05 * np.random.default_rng(0).standard_normal(20)
+    return FitInput(x, y, 0.05, line, [1.0, 0.0])
+
+
+def test_retry_stops_at_first_successful_step(fit_input):
+    fit_result, diagnostics = perform_fit_retry(fit_input)
+    assert fit_result.success
+    assert diagnostics.succeeded_step == "migrad"
+    assert diagnostics.steps == ["migrad"]
+    assert diagnostics.nfcn > 0 and diagnostics.edm < 1e-3
+
+
+def test_retry_runs_every_step_without_success(fit_input):
+    x = fit_input.xdata
+    fit_input = FitInput(x, 2 * x + 1, 0.1, degenerate_line, [1.0, 0.0, 0.0])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        fit_result, diagnostics = perform_fit_retry(fit_input)
+    assert not fit_result.success
+    assert diagnostics.succeeded_step is None
+    assert diagnostics.steps == list(FIT_RETRY_STEPS)
+
+
+def test_rounds_retry_mode_matches_perform_fit_retry(fit_input):
+    fit_result = perform_fit_rounds(fit_input, retry=True)
+    expected, _ = perform_fit_retry(fit_input)
+    np.testing.assert_allclose(fit_result.parameters, expected.parameters)
+
+
+def test_rounds_stop_after_first_success(fit_input, monkeypatch):
+    calls = []
+    perform_fit = utilities.perform_fit
+
+    def counting_perform_fit(*args):
+        calls.append(args[0].initial_guesses)
+        return perform_fit(*args)
+
+    monkeypatch.setattr(utilities, "perform_fit", counting_perform_fit)
+    fit_result = perform_fit_rounds(fit_input)
+    assert fit_result.success and len(calls) == 1
+    assert fit_input.initial_guesses == [1.0, 0.0]
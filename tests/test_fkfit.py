@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+from utilities import FKFit, SolutionCache
+
+POWER = np.linspace(0, 100, 101)
+
+
+def new_fkfit() -> FKFit:
+    return FKFit(50, 1, 3.5e-3, 930, 0, 298, -4)
+
+
+def warmed_fkfit() -> FKFit:
+    # Cache filled by other parameters, operating points and models
+    fk_fit = new_fkfit()
+    fk_fit.FK_fit_power_scaled(POWER, 0.5, 2.0)
+    for eta, gamma, alpha_0 in [(0.1, 0.3, 10), (0.9, 0.6, 40), (0.3, 0.2, 0)]:
+        fk_fit.FK_fit_current_array(POWER, eta, gamma, alpha_0)
+        fk_fit.FK_fit_current(20.0, 930, -4, 1, eta, gamma, alpha_0)
+    fk_fit.FK_fit_voltage_scaled(np.linspace(-4, 0, 41), 0.5, 23.5)
+    return fk_fit
+
+
+def test_solution_cache_is_bounded():
+    cache = SolutionCache(capacity=8)
+    for i in range(20):
+        cache.store(float(i), -4, 930, 100.0 + i)
+    assert len(cache) == 8
+    assert cache.nearest(19.0, -4, 930) == 119.0
+    # Evicted points fall back to the nearest cached one
+    assert cache.nearest(0.0, -4, 930) == 112.0
+
+
+@pytest.mark.parametrize(
+    "method, args",
+    [
+        ("FK_fit_current_array", (POWER, 0.5, 0.44, 23.5)),
+        ("FK_fit_power_scaled", (POWER, 0.5, 2.0)),
+        ("FK_fit_voltage_scaled", (np.linspace(-4, 0, 41), 0.5, 23.5)),
+        ("FK_fit_wavelength_scaled", (np.linspace(900, 960, 31), 0.5, 2.0)),
+    ],
+)
+def test_output_independent_of_call_history(method, args):
+    fresh = getattr(new_fkfit(), method)(*args)
+    warmed = getattr(warmed_fkfit(), method)(*args)
+    np.testing.assert_allclose(warmed, fresh, rtol=1e-9, atol=1e-12)
+
+
+def test_scalar_models_independent_of_call_history():
+    args = (930, -4, 1, 0.5, 0.44, 23.5)
+    for power in (0.0, 1.0, 50.0):
+        for method in ("FK_fit_current", "FK_fit_power_unscaled"):
+            fresh = getattr(new_fkfit(), method)(power, *args)
+            warmed = getattr(warmed_fkfit(), method)(power, *args)
+            assert warmed == pytest.approx(fresh, rel=1e-9, abs=1e-12)
+
+
+def test_continuation_mode_matches_off_folds():
+    fk_fit = FKFit(50, 1, 3.5e-3, 930, 0, 298, -4, continuation=True)
+    args = (np.linspace(900, 960, 7), 0.5, 2.0)
+    np.testing.assert_allclose(
+        fk_fit.FK_fit_wavelength_scaled(*args),
+        new_fkfit().FK_fit_wavelength_scaled(*args),
+        rtol=1e-9,
+    )
+
+
+@pytest.fixture(scope="module")
+def shared_fkfit() -> FKFit:
+    # One instance for all gradient checks, warmed by other parameters, as in
+    # a fit campaign where Minuit calls the same FKFit thousands of times
+    return warmed_fkfit()
+
+
+def finite_difference(func, params: list[float], rel_step: float = 1e-6) -> np.ndarray:
+    grad = []
+    for j, value in enumerate(params):
+        step = rel_step * max(abs(value), 1.0)
+        upper, lower = list(params), list(params)
+        upper[j] += step
+        lower[j] -= step
+        grad.append((np.asarray(func(*upper)) - np.asarray(func(*lower))) / (2 * step))
+    return np.array(grad)
+
+
+VOLTAGE = np.linspace(-4, 0.5, 46)
+WAVELENGTH = np.linspace(900, 960, 31)
+OPERATING_POINT = (POWER, 930, -4, 1)
+
+
+@pytest.mark.parametrize(
+    "model, grad, x, params",
+    [
+        (
+            "FK_fit_alpha_array",
+            "FK_fit_alpha_array_grad",
+            OPERATING_POINT,
+            [0.5, 0.44, 23.5],
+        ),
+        (
+            "FK_fit_power_unscaled_array",
+            "FK_fit_power_unscaled_array_grad",
+            OPERATING_POINT,
+            [0.5, 0.44, 23.5],
+        ),
+        (
+            "FK_fit_current_array",
+            "FK_fit_current_array_grad",
+            (POWER,),
+            [0.5, 0.44, 23.5],
+        ),
+        ("FK_fit_power_scaled", "FK_fit_power_scaled_grad", (POWER,), [0.5, 2.0]),
+        (
+            "FK_fit_voltage_scaled",
+            "FK_fit_voltage_scaled_grad",
+            (VOLTAGE,),
+            [0.5, 23.5],
+        ),
+        (
+            "FK_fit_wavelength_scaled",
+            "FK_fit_wavelength_scaled_grad",
+            (WAVELENGTH,),
+            [0.5, 2.0],
+        ),
+    ],
+)
+def test_grad_matches_finite_differences(shared_fkfit, model, grad, x, params):
+    def func(*p):
+        return getattr(shared_fkfit, model)(*x, *p)
+
+    analytic = getattr(shared_fkfit, grad)(*x, *params)
+    if model == "FK_fit_alpha_array":
+        analytic = analytic[1]
+    numeric = finite_difference(func, params)
+    # Errors relative to the size of each parameter's gradient
+    scale = np.max(np.abs(numeric), axis=1, keepdims=True)
+    assert np.max(np.abs(analytic - numeric) / scale) < 1e-5
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from utilities import FitInput, batched_linear_fit, perform_fit
+
+
+def line(x, slope, intercept):
+    return slope * x + intercept
+
+
+@pytest.fixture
+def cube():
+    # Current vs. power lines of a (power, wavelength, voltage) cube
+    rng = np.random.default_rng(0)
+    power = np.linspace(1, 10, 12)[:, None, None]
+    slopes = rng.uniform(0.5, 2, (1, 3, 4))
+    sigma = rng.uniform(0.05, 0.2, (12, 3, 4))
+    current = slopes * power + 0.3 + sigma * rng.standard_normal((12, 3, 4))
+    return power, current, sigma
+
+
+def test_matches_minuit_fits(cube):
+    power, current, sigma = cube
+    table = batched_linear_fit(power, current, sigma)
+    assert len(table) == 12 and table.parameter_names == ["slope", "intercept"]
+    assert table.success.all() and np.all(table.ndof == 10)
+    for row, (i, j) in enumerate(np.ndindex(3, 4)):
+        expected = perform_fit(
+            FitInput(power[:, 0, 0], current[:, i, j], sigma[:, i, j], line, [1, 0])
+        )
+        np.testing.assert_allclose(
+            table.parameters[row], expected.parameters, rtol=1e-5
+        )
+        np.testing.assert_allclose(
+            table.parameter_errors[row], expected.parameter_errors, rtol=1e-3
+        )
+        np.testing.assert_allclose(
+            table.covariance[row], expected.covariance, rtol=1e-3, atol=1e-12
+        )
+        assert table.chi2[row] == pytest.approx(expected.chi2, rel=1e-6)
+
+
+def test_axis_and_exact_line():
+    x = np.arange(5.0)
+    Y = np.stack([2 * x + 1, -x + 4])  # points along axis 1
+    table = batched_linear_fit(x, Y, 0.1, axis=1)
+    np.testing.assert_allclose(table.get("slope"), [2, -1], atol=1e-12)
+    np.testing.assert_allclose(table.get("intercept"), [1, 4], atol=1e-12)
+    np.testing.assert_allclose(table.chi2, 0, atol=1e-20)
+
+
+def test_failing_columns_fall_back_to_minuit(cube):
+    power, current, sigma = cube
+    current = current.copy()
+    current[3, 0, 0] = np.nan  # refitted on its finite points
+    current[:, 1, 1] = np.nan  # nothing to fit
+    table = batched_linear_fit(power, current, sigma)
+
+    mask = np.arange(12) != 3
+    x, y, err = power[mask, 0, 0], current[mask, 0, 0], sigma[mask, 0, 0]
+    expected = perform_fit(FitInput(x, y, err, line, [1, 0]))
+    np.testing.assert_allclose(table.parameters[0], expected.parameters, rtol=1e-4)
+    assert table.ndof[0] == 9 and table.success[0]
+
+    assert not table.success[5] and np.isnan(table.parameters[5]).all()
+    assert table.success.sum() == 11
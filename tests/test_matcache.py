@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pytest
+from scipy.io import savemat
+
+from analysistools import matcache
+from analysistools.matcache import read_mat_cached
+
+
+@pytest.fixture
+def conversions(monkeypatch):
+    # Paths converted by read_mat_cached, in order
+    converted = []
+    write_cache = matcache._write_cache
+
+    def counting_write_cache(path, cache_path, source):
+        converted.append(path)
+        write_cache(path, cache_path, source)
+
+    monkeypatch.setattr(matcache, "_write_cache", counting_write_cache)
+    return converted
+
+
+def write_sweep(path, counts):
+    savemat(path, {"Data": {"MeasureCounts": counts, "Resistance": 50.0}})
+
+
+def test_converted_once(tmp_path, conversions):
+    path = str(tmp_path / "sweep.mat")
+    write_sweep(path, np.arange(6.0).reshape(2, 3))
+    cache_dir = str(tmp_path / "cache")
+    for _ in range(2):
+        data = read_mat_cached(path, cache_dir)["Data"]
+        np.testing.assert_array_equal(data["MeasureCounts"], [[0, 1, 2], [3, 4, 5]])
+        assert data["Resistance"] == 50.0
+        assert isinstance(data["MeasureCounts"], np.memmap)
+        assert not data["MeasureCounts"].flags.writeable
+    assert len(conversions) == 1
+
+
+def test_mtime_change_invalidates(tmp_path, conversions):
+    path = str(tmp_path / "sweep.mat")
+    write_sweep(path, np.zeros(4))
+    cache_dir = str(tmp_path / "cache")
+    read_mat_cached(path, cache_dir)
+
+    # Touched but unchanged: the SHA1 matches, nothing is converted
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    read_mat_cached(path, cache_dir)
+    assert len(conversions) == 1
+
+    # Same size, new content and mtime: converted again
+    write_sweep(path, np.ones(4))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    data = read_mat_cached(path, cache_dir)["Data"]
+    assert len(conversions) == 2
+    np.testing.assert_array_equal(data["MeasureCounts"], np.ones(4))
+    # The refreshed mtime is valid again without hashing
+    read_mat_cached(path, cache_dir)
+    assert len(conversions) == 2
+
+
+def test_default_cache_is_outside_the_package():
+    package_dir = os.path.dirname(os.path.abspath(matcache.__file__))
+    assert not os.path.abspath(matcache.CACHEDIR).startswith(package_dir)
@@ -0,0 +1,58 @@
+import numpy as np
+
+from utilities import FitResult, FitResultTable, nl_coefficients
+
+
+def gaussian(x, a, c):
+    # The second derivative a ((x - c)**2 - 1) exp(-(x - c)**2 / 2) has its
+    # maximum 2 a exp(-3/2) at x = c + sqrt(3)
+    return a * np.exp(-((x - c) ** 2) / 2)
+
+
+def make_table(a, c, a_err, c_err):
+    covariance = np.zeros((len(a), 2, 2))
+    covariance[:, 0, 0] = a_err**2
+    covariance[:, 1, 1] = c_err**2
+    n_fits = len(a)
+    return FitResultTable(
+        np.stack([a, c], axis=1),
+        np.stack([a_err, c_err], axis=1),
+        np.ones(n_fits),
+        np.ones(n_fits),
+        np.ones(n_fits),
+        np.ones(n_fits, dtype=bool),
+        covariance,
+    )
+
+
+def test_matches_analytic_maxima():
+    a = np.array([1.0, 2.0, 0.5])
+    c = np.array([0.0, 0.4, 1.0])
+    a_err = np.array([0.1, 0.05, 0.02])
+    c_err = np.array([0.01, 0.02, 0.03])
+    result = nl_coefficients(make_table(a, c, a_err, c_err), gaussian, (1.0, 6.0))
+
+    np.testing.assert_allclose(result.coeff, 2 * a * np.exp(-1.5), rtol=1e-4)
+    np.testing.assert_allclose(result.coeff_pow, c + np.sqrt(3), atol=1e-3)
+    np.testing.assert_allclose(result.coeff_error, 2 * a_err * np.exp(-1.5), rtol=1e-3)
+    np.testing.assert_allclose(result.coeff_pow_error, c_err, rtol=1e-2)
+    assert result.deriv2.shape == (3, 1000)
+
+
+def test_list_of_models_and_results():
+    a, c = np.array([1.0, 2.0]), np.array([0.0, 0.4])
+    errors = np.array([0.1, 0.1])
+    table = make_table(a, c, errors, errors)
+    shared = nl_coefficients(table, gaussian, (1.0, 6.0), n_points=200)
+    per_fit = nl_coefficients(list(table), [gaussian, gaussian], (1.0, 6.0), 200)
+    np.testing.assert_allclose(per_fit.coeff, shared.coeff)
+    np.testing.assert_allclose(per_fit.coeff_error, shared.coeff_error)
+
+
+def test_maximum_at_lower_end_is_zero():
+    def decaying(x, a):
+        return a * np.exp(-x)
+
+    results = [FitResult([2.0], [0.1], None, None, None, True, np.array([[0.01]]))]
+    result = nl_coefficients(results, decaying, (0.0, 5.0))
+    assert result.coeff[0] == 0 and result.coeff_pow[0] == 0
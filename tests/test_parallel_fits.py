@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from utilities import (
+    FitInput,
+    FitResult,
+    FitResultTable,
+    perform_fit,
+    perform_fits_parallel,
+)
+
+
+def line(x, a, b):
+    return a * x + b
+
+
+def broken(x, a, b):
+    raise RuntimeError("model failed")
+
+
+@pytest.fixture
+def fit_inputs():
+    x = np.linspace(0, 1, 20)
+    noise = 0.01 * np.random.default_rng(0).standard_normal((4, 20))
+    return [
+        FitInput(x, slope * x + 1 + noise[idx], 0.01, line, [1.0, 0.0])
+        for idx, slope in enumerate([1.0, 2.0, 3.0, 4.0])
+    ]
+
+
+def test_matches_sequential_fits_in_order(fit_inputs):
+    outliers = [None, [3], None, [0, 1]]
+    bounds = [None, {"a": (0, 10)}, None, None]
+    table = perform_fits_parallel(fit_inputs, bounds, outliers, n_workers=2)
+    assert isinstance(table, FitResultTable) and len(table) == len(fit_inputs)
+    results = list(table)
+    assert all(isinstance(result, FitResult) for result in results)
+    for fit_input, bound, outlier, result in zip(fit_inputs, bounds, outliers, results):
+        expected = perform_fit(fit_input, bound, outlier)
+        np.testing.assert_allclose(result.parameters, expected.parameters)
+        assert result.ndof == expected.ndof
+    np.testing.assert_allclose(table.parameters[:, 0], [1, 2, 3, 4], atol=0.05)
+
+
+def test_failed_fit_does_not_stop_the_batch(fit_inputs):
+    fit_inputs[1].fit_func = broken
+    with pytest.warns(UserWarning, match="Fit 1 failed with RuntimeError"):
+        table = perform_fits_parallel(fit_inputs, n_workers=2)
+    assert list(table.success) == [True, False, True, True]
+    assert np.all(np.isnan(table[1].parameters)) and table[1].chi2 is None
+
+
+def test_per_fit_options_must_match(fit_inputs):
+    with pytest.raises(ValueError):
+        perform_fits_parallel(fit_inputs, outliers=[None], n_workers=1)
@@ -0,0 +1,79 @@
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from analysistools.parameter_sweep import SweepCache, model_key, sweep
+
+OFFSET = 1.0
+
+
+def model_with_global(x):
+    return x + OFFSET
+
+
+def make_scaled(scale):
+    def model(x):
+        return scale * x
+
+    return model
+
+
+def make_counting(calls):
+    def model(x):
+        calls(x)
+        return 2 * x
+
+    return model
+
+
+def test_closures_are_keyed_on_their_variables():
+    cache = SweepCache()
+    grid = {"x": [1.0, 2.0]}
+    assert model_key(make_scaled(2.0)) == model_key(make_scaled(2.0))
+    assert sweep(make_scaled(2.0), grid, n_workers=1, cache=cache).values.tolist() == [
+        2.0,
+        4.0,
+    ]
+    assert sweep(make_scaled(3.0), grid, n_workers=1, cache=cache).values.tolist() == [
+        3.0,
+        6.0,
+    ]
+
+
+def test_changed_globals_are_evaluated_again(monkeypatch):
+    cache = SweepCache()
+    grid = {"x": np.array([1.0, 2.0])}
+    assert sweep(model_with_global, grid, n_workers=1, cache=cache).values[0] == 2.0
+    monkeypatch.setitem(model_with_global.__globals__, "OFFSET", 5.0)
+    assert sweep(model_with_global, grid, n_workers=1, cache=cache).values[0] == 6.0
+
+
+def test_cache_reuses_points_and_is_bounded():
+    cache = SweepCache(maxsize=3)
+    calls = Mock()
+    model = make_counting(calls)
+    sweep(model, {"x": [1.0, 2.0, 2.0]}, n_workers=1, cache=cache)
+    assert calls.call_count == 2
+    result = sweep(model, {"x": [1.0, 2.0, 3.0, 4.0]}, n_workers=1, cache=cache)
+    assert calls.call_count == 4
+    assert result.values.tolist() == [2.0, 4.0, 6.0, 8.0]
+    assert len(cache) == 3
+
+
+def test_cache_lru_eviction():
+    cache = SweepCache(maxsize=2)
+    cache.put("a", np.array(1))
+    cache.put("b", np.array(2))
+    cache.get("a")
+    cache.put("c", np.array(3))
+    assert "a" in cache and "c" in cache and "b" not in cache
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_sweep_matches_direct_evaluation(n_workers):
+    grid = {"x": [1.0, 2.0, 3.0], "y": [0.0, 10.0]}
+    result = sweep(lambda x, y: [x + y, x * y], grid, n_workers=n_workers)
+    assert result.dims == ("x", "y", "dim_0")
+    expected = [[[x + y, x * y] for y in grid["y"]] for x in grid["x"]]
+    np.testing.assert_array_equal(result.values, expected)
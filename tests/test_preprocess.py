@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+import pytest
+from scipy.io import savemat
+
+from analysistools.preprocess import C_NM_THZ, SweepPipeline
+from analysistools.sweeps import SweepCollection
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    return {
+        "MeasureCounts": rng.uniform(10, 20, (3, 12)),
+        "MeasureCurrent": rng.uniform(0, 1e-6, (3, 12)),
+        "DarkCounts": 2.0,
+        "MeasuredPower": np.array([1.0, 2.0, 4.0]),
+        "FreqList": np.array([340.0, 350.0]),
+    }
+
+
+def pipeline():
+    return (
+        SweepPipeline()
+        .select(np.s_[:, :-2:5], "MeasureCounts", "MeasureCurrent")
+        .subtract_dark("MeasureCounts", "DarkCounts")
+        .normalize_power("MeasureCounts", "MeasuredPower", axis=0)
+        .scale("MeasureCurrent", 1e6)
+        .to_wavelength("FreqList")
+    )
+
+
+def test_stages(data):
+    fields = pipeline()(data)
+    counts = (data["MeasureCounts"][:, :-2:5] - 2.0) / data["MeasuredPower"][:, None]
+    np.testing.assert_allclose(fields["MeasureCounts"], counts)
+    np.testing.assert_allclose(
+        fields["MeasureCurrent"], 1e6 * data["MeasureCurrent"][:, :-2:5]
+    )
+    np.testing.assert_allclose(fields["wavelength"], C_NM_THZ / data["FreqList"])
+    # The input is left untouched
+    assert data["MeasureCounts"].shape == (3, 12)
+
+
+def test_pipelines_are_lazy_and_immutable(data):
+    base = SweepPipeline().select(np.s_[:2], "MeasureCounts")
+    extended = base.scale("MeasureCounts", 2.0)
+    assert len(base.stages) == 1 and len(extended.stages) == 2
+    assert extended.fields == ["MeasureCounts"]
+    selected = base(data)["MeasureCounts"]
+    np.testing.assert_array_equal(selected, data["MeasureCounts"][:2])
+
+
+def test_one_buffer_per_field(data, tmp_path):
+    fields = pipeline()(data, out_dir=str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == [
+        "MeasureCounts.npy",
+        "MeasureCurrent.npy",
+        "wavelength.npy",
+    ]
+    assert isinstance(fields["MeasureCounts"], np.memmap)
+    np.testing.assert_allclose(
+        np.load(tmp_path / "MeasureCounts.npy"), pipeline()(data)["MeasureCounts"]
+    )
+
+
+def test_missing_field(data):
+    del data["DarkCounts"]
+    with pytest.raises(KeyError, match="DarkCounts"):
+        pipeline()(data)
+
+
+def test_iter_collection(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp("data")
+    for resistance in (50, 1e4):
+        sweep = {
+            "Resistance": resistance,
+            "M_freq": np.full(3, 340.0),
+            "PowerList": np.array([1e-6, 5e-6]),
+            "VoltageList": np.array([-4.0, 1.0]),
+            "MeasureCounts": np.full((2, 5), resistance),
+        }
+        savemat(data_dir / f"sweep_{int(resistance)}.mat", {"Data": sweep})
+    cache_dir = tmp_path_factory.mktemp("cache")
+    collection = SweepCollection(str(data_dir), str(cache_dir))
+    out_dir = tmp_path_factory.mktemp("out")
+
+    scaled = SweepPipeline().scale("MeasureCounts", 0.5)
+    results = list(scaled.iter_collection(collection, str(out_dir)))
+    assert len(results) == 2
+    for sweep_file, fields in results:
+        np.testing.assert_allclose(fields["MeasureCounts"], sweep_file.resistance / 2)
+    assert sorted(os.listdir(out_dir)) == ["sweep_10000", "sweep_50"]
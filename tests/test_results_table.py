@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from utilities import (
+    FitResult,
+    num_err_to_latex_str,
+    nums_errs_to_latex_strs,
+    results_table,
+)
+
+
+@pytest.fixture
+def values_errors():
+    rng = np.random.default_rng(0)
+    exponents = rng.integers(-8, 9, size=(40, 3))
+    values = rng.uniform(-9, 9, size=(40, 3)) * 10.0**exponents
+    errors = np.abs(values) * 10.0 ** rng.uniform(-5, -3, size=(40, 3))
+    return values, errors
+
+
+def test_matches_scalar_formatting(values_errors):
+    values, errors = values_errors
+    strings = nums_errs_to_latex_strs(values, errors)
+    assert strings.shape == values.shape
+    for idx in np.ndindex(values.shape):
+        assert strings[idx] == num_err_to_latex_str(values[idx], errors[idx])
+
+
+@pytest.mark.parametrize(
+    "value, error", [(4.65, 0.1), (0.8815, 0.001), (2.5, 1.0), (-0.125, 0.01)]
+)
+def test_decimal_ties_match_scalar_formatting(value, error):
+    # Python rounds the binary value, e.g. 4.65 is slightly above the tie
+    string = nums_errs_to_latex_strs([value], [error])[0]
+    assert string == num_err_to_latex_str(value, error)
+
+
+def test_many_ties_match_scalar_formatting():
+    rng = np.random.default_rng(1)
+    values = rng.integers(-(10**5), 10**5, 2000) / 2000
+    values = values[values != 0]
+    errors = 10.0 ** -rng.integers(0, 4, len(values))
+    strings = nums_errs_to_latex_strs(values, errors)
+    for string, value, error in zip(strings, values, errors):
+        assert string == num_err_to_latex_str(value, error)
+
+
+def test_values_without_errors():
+    strings = nums_errs_to_latex_strs(np.array([1.2345, 0.0, 3.5e-3, -12345.6]))
+    assert list(strings) == [
+        "$1.23$",
+        "$0.00$",
+        r"$3.50\times 10^{-3}$",
+        r"$-1.23\times 10^{4}$",
+    ]
+
+
+def test_results_table_array_without_errors():
+    table = results_table(np.array([[1.0, 2.5e-5]]), columns=["a", "b"], fmt="markdown")
+    assert table.splitlines()[-1] == r"| $1.00$ | $2.50\times 10^{-5}$ |"
+
+
+def test_results_table_fit_results(values_errors):
+    values, errors = values_errors
+    results = [
+        FitResult(value, error, None, None, None, True)
+        for value, error in zip(values, errors)
+    ]
+    assert results_table(results) == results_table(values, errors)
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+from scipy.optimize import fsolve
+
+from fkphysics import (
+    FK_fit,
+    follow_branch,
+    selfconsistent,
+    solve_FK_alpha,
+    solve_FK_alpha_continuation,
+)
+
+L, X, T = 3.5e-3, 0, 298
+ETA, GAMMA, ALPHA_0 = 0.5, 0.44, 23.5
+
+
+def fsolve_alphas(power: np.ndarray, lam: float, V_app: float, R: float) -> list:
+    # Per-point reference as the scalar FKFit models, each point warm started
+    # from the previous one
+    alphas = []
+    for p in power:
+
+        def func(alpha: float) -> float:
+            absorbed = 1 - np.exp(-(GAMMA * alpha + ALPHA_0) * L)
+            V_d = V_app + p * ETA / 1.24 * (lam / 1000) * R * absorbed
+            return FK_fit(lam, X, T, min(V_d, 1.4 - 1e-6)) - alpha
+
+        alphas.append(fsolve(func, alphas[-1] if alphas else 1000, xtol=1e-12)[0])
+    return alphas
+
+
+@pytest.mark.parametrize(
+    "lam, V_app, R", [(930, -4, 1), (960, -1, 1), (910, -2, 1), (930, -4, 0.1)]
+)
+def test_zero_power_is_zero_field_absorption(lam, V_app, R):
+    alpha = solve_FK_alpha([0.0], lam, V_app, R, ETA, GAMMA, ALPHA_0, L, X, T)
+    assert alpha[0] == pytest.approx(FK_fit(lam, X, T, V_app), rel=1e-12)
+
+
+# fsolve warns about slow progress at the kink where the diode gets forward
+# biased, the reference is still within tolerance there
+@pytest.mark.filterwarnings("ignore:The iteration is not making good progress")
+@pytest.mark.parametrize(
+    "lam, V_app, R", [(930, -4, 1), (930, -1, 1), (960, -2, 0.5), (910, -3, 2)]
+)
+def test_matches_fsolve(lam, V_app, R):
+    power = np.linspace(0, 100, 51)
+    alpha = solve_FK_alpha(power, lam, V_app, R, ETA, GAMMA, ALPHA_0, L, X, T)
+    reference = fsolve_alphas(power, lam, V_app, R)
+    np.testing.assert_allclose(alpha, reference, rtol=1e-8, atol=1e-8)
+
+
+def test_warm_start_does_not_change_root():
+    power = np.linspace(0, 100, 51)
+    args = (930, -4, 1, ETA, GAMMA, ALPHA_0, L, X, T)
+    cold = solve_FK_alpha(power, *args)
+    # Exact roots of other parameters (and arbitrary guesses) as warm start
+    other = solve_FK_alpha(power, 930, -4, 1, 0.2, GAMMA, ALPHA_0, L, X, T)
+    for alpha_init in (other, cold, 0.0, 1e5):
+        np.testing.assert_allclose(
+            solve_FK_alpha(power, *args, alpha_init=alpha_init), cold, rtol=1e-9
+        )
+
+
+def s_curve(theta: np.ndarray, alpha: np.ndarray) -> np.ndarray:
+    # theta = v**3 - 3 v with v = log(alpha): bistable for -2 < theta < 2,
+    # with folds at v = 1 (theta = -2) and v = -1 (theta = 2)
+    v = np.log(alpha)
+    return theta - (v**3 - 3 * v)
+
+
+def test_follow_branch_keeps_hysteresis():
+    thetas = np.linspace(-4, 4, 81)
+    alphas, fold_thetas = follow_branch(s_curve, thetas, np.exp(-2.2))
+    v = np.log(alphas)
+    np.testing.assert_allclose(s_curve(thetas, alphas), 0, atol=1e-9)
+    # Lower branch up to the fold at theta = 2, upper branch after it
+    assert np.all(v[thetas < 2] < -1)
+    assert np.all(v[thetas > 2] > 1)
+    np.testing.assert_allclose(np.sort(fold_thetas), [-2, 2], atol=0.05)
+
+    shuffled = np.random.default_rng(0).permutation(len(thetas))
+    np.testing.assert_array_equal(
+        follow_branch(s_curve, thetas[shuffled], np.exp(-2.2))[0], alphas[shuffled]
+    )
+
+
+def test_follow_branch_without_forward_segment(monkeypatch):
+    monkeypatch.setattr(
+        selfconsistent,
+        "trace_branch",
+        lambda *args: (np.array([0.0]), np.array([1.0]), np.array([], dtype=int)),
+    )
+    with pytest.raises(ValueError, match="cannot be followed"):
+        follow_branch(s_curve, np.array([0.0, 1.0]), 1.0)
+
+
+def test_continuation_matches_bracketed_solver_off_folds():
+    power = np.linspace(0, 100, 25)
+    lam = np.array([910.0, 930.0, 960.0])[:, None, None]
+    V_app = np.array([-4.0, -1.0])[None, :, None]
+    args = (1.0, ETA, GAMMA, ALPHA_0, L, X, T)
+    alphas = solve_FK_alpha_continuation(power, lam, V_app, *args)
+    assert alphas.shape == (3, 2, 25)
+    np.testing.assert_allclose(
+        alphas, solve_FK_alpha(power, lam, V_app, *args), rtol=1e-9, atol=1e-9
+    )
+
+    # Independent of the order of the operating points
+    power, lam, V_app = np.broadcast_arrays(power, lam, V_app)
+    order = np.random.default_rng(0).permutation(power.size)
+    shuffled = solve_FK_alpha_continuation(
+        power.ravel()[order], lam.ravel()[order], V_app.ravel()[order], *args
+    )
+    np.testing.assert_allclose(shuffled, alphas.ravel()[order], rtol=1e-12)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from scipy.interpolate import make_smoothing_spline
+
+from analysistools.smoothing import SmoothingSplineBank
+
+
+@pytest.fixture
+def curves():
+    rng = np.random.default_rng(0)
+    x = np.sort(rng.uniform(0, 10, 40))
+    Y = np.sin(x) + 0.1 * rng.standard_normal((5, len(x)))
+    return x, Y
+
+
+@pytest.mark.parametrize("lam", [1e-3, 0.1, 10.0])
+def test_matches_make_smoothing_spline(curves, lam):
+    x, Y = curves
+    w = np.random.default_rng(1).uniform(0.5, 2, len(x))
+    # Including extrapolation beyond both ends
+    x_new = np.linspace(x[0] - 1, x[-1] + 1, 200)
+    bank = SmoothingSplineBank(x, w).fit(Y, lam)
+    expected = [make_smoothing_spline(x, y, w=w, lam=lam)(x_new) for y in Y]
+    np.testing.assert_allclose(bank(x_new), expected, rtol=0, atol=1e-8)
+
+
+def test_decreasing_grid(curves):
+    x, Y = curves
+    bank = SmoothingSplineBank(x[::-1]).fit(Y[:, ::-1], 0.1)
+    expected = [make_smoothing_spline(x, y, lam=0.1)(x) for y in Y]
+    np.testing.assert_allclose(bank(x), expected, rtol=0, atol=1e-8)
+
+
+def test_gcv_matches_make_smoothing_spline(curves):
+    x, Y = curves
+    x_new = np.linspace(x[0], x[-1], 200)
+    bank = SmoothingSplineBank(x).fit(Y)
+    expected = [make_smoothing_spline(x, y)(x_new) for y in Y]
+    # Both minimize the same GCV criterion, with different searches
+    np.testing.assert_allclose(bank(x_new), expected, rtol=0, atol=5e-3)
@@ -0,0 +1,47 @@
+import os
+
+import numpy as np
+import pytest
+from scipy.io import savemat
+
+from analysistools.sweeps import SweepCollection
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for resistance, frequency in [(50, 340.0), (1e4, 330.0)]:
+        data = {
+            "Resistance": resistance,
+            "M_freq": np.full(3, frequency),
+            "PowerList": np.array([1e-6, 5e-6]),
+            "VoltageList": np.array([-4.0, 1.0]),
+            "MeasureCounts": np.ones((2, 5)),
+        }
+        savemat(tmp_path / f"sweep_{int(resistance)}.mat", {"Data": data})
+    savemat(tmp_path / "iv_curve.mat", {"V": np.arange(3.0), "I": np.zeros(3)})
+    return tmp_path
+
+
+def test_non_sweep_files_are_skipped(data_dir, tmp_path_factory):
+    cache_dir = tmp_path_factory.mktemp("cache")
+    with pytest.warns(UserWarning, match="iv_curve.mat"):
+        collection = SweepCollection(str(data_dir), str(cache_dir))
+    assert len(collection) == 2
+    assert collection.skipped == [str(data_dir / "iv_curve.mat")]
+
+
+def test_headers_are_converted_on_first_access(data_dir, tmp_path_factory):
+    cache_dir = tmp_path_factory.mktemp("cache")
+    with pytest.warns(UserWarning):
+        collection = SweepCollection(str(data_dir), str(cache_dir))
+    assert os.listdir(cache_dir) == []
+
+    sweep_file = collection[0]
+    assert sweep_file.header_read
+    assert sweep_file.resistance == 1e4
+    assert sweep_file.power_range == (1.0, 5.0)
+    assert len(os.listdir(cache_dir)) > 0
+    assert not collection.sweep_files[1].header_read
+
+    selected = collection.select(resistance=50)
+    assert [sf.frequency for sf in selected] == [340.0]
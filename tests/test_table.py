@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from fkphysics import FK_absorption, table
+from fkphysics.table import FKAbsorptionTable
+
+X, T = 0.0, 300.0
+GRID = {
+    "lam_range": (900, 950),
+    "field_range": (1e4, 1e6),
+    "n_lam": 21,
+    "n_field": 21,
+}
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(table, "CACHEDIR", str(tmp_path / "fk_tables"))
+    return tmp_path / "fk_tables"
+
+
+def test_interpolation_error_bound():
+    fk_table = FKAbsorptionTable(X, T, **GRID, cache=False)
+    rng = np.random.default_rng(0)
+    lam = rng.uniform(*GRID["lam_range"], 2000)
+    F = 10 ** rng.uniform(4, 6, 2000)
+    exact = FK_absorption(lam, X, T, F)
+    error = np.abs(fk_table.FK_absorption(lam, X, T, F) - exact)
+    assert np.all(error <= fk_table.atol + fk_table.rtol * np.abs(exact))
+
+    # Outside the grid the exact model is used
+    outside = fk_table.FK_absorption(990.0, X, T, 1e5)
+    assert outside == pytest.approx(FK_absorption(990.0, X, T, 1e5), rel=1e-12)
+
+
+def test_table_is_cached(cache_dir):
+    built = FKAbsorptionTable(X, T, **GRID)
+    assert len(list(cache_dir.iterdir())) == 1
+    loaded = FKAbsorptionTable(X, T, **GRID)
+    np.testing.assert_array_equal(loaded.alpha_grid, built.alpha_grid)
+
+
+def test_cache_dir_override(monkeypatch, tmp_path):
+    from analysistools.cache import CACHE_ENV, user_cache_dir
+
+    monkeypatch.setenv(CACHE_ENV, str(tmp_path))
+    assert user_cache_dir("fk_tables") == str(tmp_path / "fk_tables")
+    monkeypatch.delenv(CACHE_ENV)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert user_cache_dir() == str(tmp_path / "xdg" / "fkphysics")